@@ -0,0 +1,294 @@
+"""
+Offline throughput benchmarks of ``SoundCloudDownloader.download_playlist``.
+
+A local stand-in server (see :mod:`benchmarks.server`) serves a synthetic
+playlist, so no network access is needed. Every combination of the swept
+settings runs in a fresh process and reports tracks/s, MB/s, CPU time and peak
+RSS. Example::
+
+    python -m benchmarks.bench_download --workers 1 4 8 --latency-ms 0 50 --zip off on
+
+With ``--proxies``, tracks are downloaded through a pool of local stand-in
+proxies, each with its own ``--rates`` budget and ``--workers`` downloads.
+
+Use ``--quick`` for a small sweep suitable for CI.
+"""
+import argparse, itertools, json, resource, sys, tempfile, time
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from benchmarks.server import StandInServer, StandInProxy, ffmpeg_available
+
+# Policies that never run FFmpeg
+FFMPEG_FREE_POLICIES = ("native",)
+
+
+@dataclass
+class BenchConfig:
+    workers: int
+    rate: float
+    latency_ms: int
+    policy: str
+    codec: str
+    zip: bool
+    flat: bool = False
+    # Stand-in proxies of a proxy pool; ``workers`` and ``rate`` then apply per proxy
+    proxies: int = 0
+
+
+def _peak_rss_mb(maxrss: int) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return maxrss / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+def run_config(
+    config: BenchConfig,
+    playlist_url: str,
+    output_dir: Path,
+    proxy_urls: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Download the stand-in playlist once with the given settings.
+
+    Args:
+        config (BenchConfig): The settings.
+        playlist_url (str): The stand-in playlist URL.
+        output_dir (Path): A fresh output directory.
+        proxy_urls (Optional[List[str]]): Stand-in proxies to download through.
+
+    Returns:
+        Dict[str, Any]: The measurements.
+    """
+    from loguru import logger
+    from soundclouddownloader.main import SoundCloudDownloader
+    from soundclouddownloader.proxies import ProxyPool
+
+    # Silence the downloader for this run only, the caller's handlers stay in place
+    logger.disable("soundclouddownloader")
+    try:
+        downloader = SoundCloudDownloader(
+            requests_per_second=config.rate,
+            burst=max(1, config.workers),
+            output_policy=config.policy,
+            codec=config.codec,
+            proxies=(
+                ProxyPool(
+                    proxy_urls,
+                    max_per_proxy=config.workers,
+                    requests_per_second=config.rate,
+                    burst=max(1, config.workers),
+                )
+                if proxy_urls
+                else None
+            ),
+        )
+        downloader.ydl_opts["noprogress"] = True
+
+        before = resource.getrusage(resource.RUSAGE_SELF)
+        before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        try:
+            downloader.download_playlist(
+                playlist_url,
+                output_dir,
+                max_workers=config.workers,
+                should_zip=config.zip,
+                flat=config.flat,
+                resume=False,
+            )
+        finally:
+            downloader.close()
+        wall = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        cpu = sum(
+            getattr(a, field) - getattr(b, field)
+            for a, b in ((after, before), (after_children, before_children))
+            for field in ("ru_utime", "ru_stime")
+        )
+        summary = downloader.last_report.to_dict()["summary"]
+        return {
+            **asdict(config),
+            "completed": summary["completed"],
+            "failed": summary["failed"],
+            "wall_seconds": wall,
+            "tracks_per_second": summary["completed"] / wall,
+            "mb_per_second": summary["bytes_downloaded"] / wall / 1e6,
+            "cpu_seconds": cpu,
+            "cpu_utilisation": cpu / wall,
+            "peak_rss_mb": _peak_rss_mb(after.ru_maxrss),
+            "stage_seconds": summary["stage_seconds"],
+        }
+    finally:
+        logger.enable("soundclouddownloader")
+
+
+def _run_isolated(
+    config: BenchConfig,
+    playlist_url: str,
+    output_dir: Path,
+    proxy_urls: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    # A fresh process per run keeps peak RSS and CPU figures independent
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(run_config, config, playlist_url, output_dir, proxy_urls).result()
+
+
+def sweep(
+    configs: List[BenchConfig],
+    tracks: int,
+    track_size: int,
+    bandwidth: Optional[int] = None,
+    proxy_bandwidth: Optional[int] = None,
+    isolated: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Run every config against a stand-in server.
+
+    Args:
+        configs (List[BenchConfig]): The settings to measure.
+        tracks (int): Number of tracks of the playlist.
+        track_size (int): Approximate size of each track in bytes.
+        bandwidth (Optional[int]): Bytes per second of each connection. Defaults to unlimited.
+        proxy_bandwidth (Optional[int]): Bytes per second of each connection through a
+            stand-in proxy. Defaults to unlimited.
+        isolated (bool): Run each config in a fresh process. Defaults to True.
+
+    Returns:
+        List[Dict[str, Any]]: The measurements of every config.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="scdl-bench-") as tmp:
+        tmp = Path(tmp)
+        for latency_ms in sorted({config.latency_ms for config in configs}):
+            server = StandInServer(
+                tmp / f"server-{latency_ms}",
+                tracks=tracks,
+                track_size=track_size,
+                latency=latency_ms / 1000,
+                bandwidth=bandwidth,
+            )
+            with server:
+                for n, config in enumerate(c for c in configs if c.latency_ms == latency_ms):
+                    output_dir = tmp / f"output-{latency_ms}-{n}"
+                    run = _run_isolated if isolated else run_config
+                    with ExitStack() as stack:
+                        proxies = [
+                            stack.enter_context(StandInProxy(bandwidth=proxy_bandwidth))
+                            for _ in range(config.proxies)
+                        ]
+                        proxy_urls = [proxy.url for proxy in proxies]
+                        results.append(run(config, server.playlist_url, output_dir, proxy_urls))
+    return results
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    """Print the measurements as a table."""
+    columns = (
+        ("workers", "workers", "{}"),
+        ("rate", "rate", "{:g}"),
+        ("latency_ms", "latency", "{}ms"),
+        ("proxies", "proxies", "{}"),
+        ("policy", "policy", "{}"),
+        ("zip", "zip", "{}"),
+        ("completed", "tracks", "{}"),
+        ("tracks_per_second", "tracks/s", "{:.2f}"),
+        ("mb_per_second", "MB/s", "{:.2f}"),
+        ("cpu_utilisation", "CPU", "{:.0%}"),
+        ("peak_rss_mb", "RSS MB", "{:.1f}"),
+    )
+    rows = [[label for _, label, _ in columns]]
+    for result in results:
+        rows.append([fmt.format(result[key]) for key, _, fmt in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(columns))]
+    for row in rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline download benchmarks")
+    parser.add_argument("--tracks", type=int, default=20, help="Tracks in the playlist")
+    parser.add_argument("--track-size-kb", type=int, default=256, help="Size of each track")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument(
+        "--rates", type=float, nargs="+", default=[1000.0], help="Client requests per second"
+    )
+    parser.add_argument(
+        "--latency-ms", type=int, nargs="+", default=[0], help="Server delay per request"
+    )
+    parser.add_argument("--bandwidth-kbps", type=int, help="Server bandwidth per connection")
+    parser.add_argument(
+        "--proxies",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="Stand-in proxies to download through (0: none); workers and rate apply per proxy",
+    )
+    parser.add_argument(
+        "--proxy-bandwidth-kbps", type=int, help="Bandwidth per connection through a proxy"
+    )
+    parser.add_argument("--policies", nargs="+", default=["native", "transcode"])
+    parser.add_argument(
+        "--codec",
+        default="opus",
+        help="Target codec; the synthetic tracks are MP3, so any other codec forces a real transcode",
+    )
+    parser.add_argument("--zip", nargs="+", choices=["off", "on"], default=["off", "on"])
+    parser.add_argument("--flat", action="store_true", help="Enumerate the playlist flat")
+    parser.add_argument("--quick", action="store_true", help="Small sweep for CI")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    parser.add_argument(
+        "--min-tracks-per-second",
+        type=float,
+        help="Exit with an error if any run is slower, to catch regressions in CI",
+    )
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.tracks, args.track_size_kb = 5, 64
+        args.workers, args.policies = [1, 4], ["native"]
+
+    policies = args.policies
+    if not ffmpeg_available():
+        skipped = [policy for policy in policies if policy not in FFMPEG_FREE_POLICIES]
+        if skipped:
+            print(f"FFmpeg not found, skipping policies: {', '.join(skipped)}", file=sys.stderr)
+        policies = [policy for policy in policies if policy in FFMPEG_FREE_POLICIES]
+
+    configs = [
+        BenchConfig(
+            workers, rate, latency_ms, policy, args.codec, zip_mode == "on", args.flat, proxies
+        )
+        for workers, rate, latency_ms, policy, zip_mode, proxies in itertools.product(
+            args.workers, args.rates, args.latency_ms, policies, args.zip, args.proxies
+        )
+    ]
+    results = sweep(
+        configs,
+        tracks=args.tracks,
+        track_size=args.track_size_kb * 1024,
+        bandwidth=args.bandwidth_kbps * 1024 if args.bandwidth_kbps else None,
+        proxy_bandwidth=args.proxy_bandwidth_kbps * 1024 if args.proxy_bandwidth_kbps else None,
+    )
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    failed = [result for result in results if result["failed"] or not result["completed"]]
+    if failed:
+        print(f"{len(failed)} run(s) had failed tracks", file=sys.stderr)
+        return 1
+    if args.min_tracks_per_second and any(
+        result["tracks_per_second"] < args.min_tracks_per_second for result in results
+    ):
+        print("Throughput below --min-tracks-per-second", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
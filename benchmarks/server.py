@@ -0,0 +1,238 @@
+import shutil, subprocess, threading, time, urllib.error, urllib.request
+from functools import partial
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from xml.sax.saxutils import escape
+
+
+def ffmpeg_available() -> bool:
+    """Check whether FFmpeg is installed, which transcoding benchmarks need."""
+    return shutil.which("ffmpeg") is not None
+
+
+def make_audio(path: Path, size: int) -> None:
+    """
+    Write a synthetic MP3 track of roughly ``size`` bytes.
+
+    With FFmpeg a real, decodable tone is encoded so that transcodes do real
+    work; without it the file is random bytes, which is enough for the
+    policies that keep downloads as served.
+    """
+    if ffmpeg_available():
+        # 128 kbps, so 16000 bytes per second of audio
+        seconds = max(1, size // 16000)
+        subprocess.run(
+            [
+                "ffmpeg", "-v", "error", "-y",
+                "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                "-b:a", "128k", str(path),
+            ],
+            check=True,
+        )
+    else:
+        with open(path, "wb") as f:
+            f.write(bytes(range(256)) * (size // 256))
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    latency = 0.0
+    bandwidth: Optional[int] = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return super().send_head()
+
+    def copyfile(self, source, outputfile):
+        if not self.bandwidth:
+            return super().copyfile(source, outputfile)
+        # Pace every connection to the configured bandwidth
+        chunk = max(1, self.bandwidth // 20)
+        while True:
+            data = source.read(chunk)
+            if not data:
+                return
+            outputfile.write(data)
+            time.sleep(len(data) / self.bandwidth)
+
+
+class StandInServer:
+    """
+    A local HTTP stand-in for SoundCloud serving a synthetic playlist.
+
+    The playlist is an RSS feed whose items enclose the track files, which
+    yt-dlp's generic extractor resolves through the same code path as any
+    other playlist: the downloader under test runs unmodified, only the
+    extractor differs. Every request can be delayed and every connection
+    throttled to emulate a remote server.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        tracks: int = 20,
+        track_size: int = 256 * 1024,
+        latency: float = 0.0,
+        bandwidth: Optional[int] = None,
+    ):
+        """
+        Generate the playlist files.
+
+        Args:
+            root (Path): Directory the files are generated in and served from.
+            tracks (int): Number of tracks of the playlist. Defaults to 20.
+            track_size (int): Approximate size of each track in bytes. Defaults to 256 KiB.
+            latency (float): Seconds every request is delayed. Defaults to 0.
+            bandwidth (Optional[int]): Bytes per second of each connection. Defaults to unlimited.
+        """
+        self.root = Path(root)
+        self.tracks = tracks
+        self.latency = latency
+        self.bandwidth = bandwidth
+        (self.root / "tracks").mkdir(parents=True, exist_ok=True)
+        template = self.root / "template.mp3"
+        make_audio(template, track_size)
+        for n in range(tracks):
+            shutil.copyfile(template, self.root / "tracks" / f"{n}.mp3")
+        self.track_size = template.stat().st_size
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def playlist_url(self) -> str:
+        return f"{self.base_url}/playlist.xml"
+
+    def _write_feed(self) -> None:
+        items = "".join(
+            f"<item><title>Track {n}</title><guid>{n}</guid>"
+            f'<enclosure url="{escape(self.base_url)}/tracks/{n}.mp3" type="audio/mpeg"/></item>'
+            for n in range(self.tracks)
+        )
+        (self.root / "playlist.xml").write_text(
+            '<?xml version="1.0"?><rss version="2.0"><channel>'
+            f"<title>Benchmark Playlist</title>{items}</channel></rss>"
+        )
+
+    def start(self) -> "StandInServer":
+        """Start serving on a free local port."""
+        handler = type(
+            "Handler", (_Handler,), {"latency": self.latency, "bandwidth": self.bandwidth}
+        )
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), partial(handler, directory=str(self.root))
+        )
+        self._server.daemon_threads = True
+        host, port = self._server.server_address[:2]
+        self.base_url = f"http://{host}:{port}"
+        self._write_feed()
+        threading.Thread(target=self._server.serve_forever, name="stand-in", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    proxy: "StandInProxy"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.proxy.requests += 1
+        if self.proxy.latency:
+            time.sleep(self.proxy.latency)
+        if self.proxy.failing:
+            self.send_error(502, "Bad Gateway")
+            return
+        headers = {
+            name: value
+            for name, value in self.headers.items()
+            if name.lower() not in ("host", "proxy-connection", "connection")
+        }
+        # Forward directly, whatever proxies the environment configures
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        try:
+            upstream = opener.open(urllib.request.Request(self.path, headers=headers))
+        except urllib.error.HTTPError as e:
+            upstream = e
+        with upstream:
+            self.send_response(upstream.status)
+            for name, value in upstream.headers.items():
+                if name.lower() not in ("connection", "transfer-encoding"):
+                    self.send_header(name, value)
+            self.end_headers()
+            bandwidth = self.proxy.bandwidth
+            chunk = max(1, bandwidth // 20) if bandwidth else 64 * 1024
+            while True:
+                data = upstream.read(chunk)
+                if not data:
+                    return
+                self.wfile.write(data)
+                if bandwidth:
+                    time.sleep(len(data) / bandwidth)
+
+
+class StandInProxy:
+    """
+    A local HTTP forward proxy standing in for an egress proxy.
+
+    Every proxy can add latency, cap the bandwidth of its connections, like
+    a remote proxy would, or fail every request with HTTP 502 to emulate a
+    broken proxy. ``requests`` counts the requests it received.
+    """
+
+    def __init__(
+        self, latency: float = 0.0, bandwidth: Optional[int] = None, failing: bool = False
+    ):
+        """
+        Configure the proxy.
+
+        Args:
+            latency (float): Seconds every request is delayed. Defaults to 0.
+            bandwidth (Optional[int]): Bytes per second of each connection. Defaults to unlimited.
+            failing (bool): Answer every request with HTTP 502. Defaults to False.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.failing = failing
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> "StandInProxy":
+        """Start proxying on a free local port."""
+        handler = type("ProxyHandler", (_ProxyHandler,), {"proxy": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        threading.Thread(
+            target=self._server.serve_forever, name="stand-in-proxy", daemon=True
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        """Stop proxying."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StandInProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -1,3 +1,22 @@
 from .main import *
 from .dataclass import *
 from .utils import *
+from .manifest import *
+from .ratelimit import *
+from .pipeline import *
+from .policy import *
+from .archive import *
+from .sessions import *
+from .run import *
+from .async_downloader import *
+from .store import *
+from .cache import *
+from .metrics import *
+from .connections import *
+from .workqueue import *
+from .concurrency import *
+from .retry import *
+from .proxies import *
+from .bandwidth import *
+from .daemon import *
+from .renditions import *
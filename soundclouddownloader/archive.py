@@ -0,0 +1,141 @@
+import queue, threading, time, zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+
+ZIP_COMPRESSIONS = {
+    "stored": zipfile.ZIP_STORED,
+    "deflated": zipfile.ZIP_DEFLATED,
+    "bzip2": zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+}
+
+
+def archived_members(zip_filename: Path) -> Dict[str, int]:
+    """
+    List the members of an existing zip file.
+
+    Args:
+        zip_filename (Path): The zip file.
+
+    Returns:
+        Dict[str, int]: The uncompressed size of every member by name, or an
+        empty dict if the file is missing or not a valid zip file (e.g. left
+        unfinished by an interrupted run).
+    """
+    try:
+        with zipfile.ZipFile(zip_filename) as zipf:
+            return {info.filename: info.file_size for info in zipf.infolist()}
+    except (OSError, zipfile.BadZipFile):
+        return {}
+
+
+class StreamingZipWriter:
+    """
+    Build a zip archive incrementally while a playlist is downloading.
+
+    Finished tracks are queued with :meth:`add` and written by a single writer
+    thread, so the archive grows as tracks complete instead of re-reading the
+    whole playlist at the end. Each source file is deleted as soon as it has
+    been archived, which keeps the peak disk footprint close to the size of the
+    archive itself. ZIP64 extensions are enabled for very large playlists.
+    """
+
+    def __init__(
+        self,
+        zip_filename: Path,
+        source_dir: Path,
+        compression: str = "stored",
+        delete_sources: bool = True,
+        on_archived: Optional[Callable[[Path, float], None]] = None,
+        append: bool = False,
+    ):
+        """
+        Open the archive and start the writer thread.
+
+        Args:
+            zip_filename (Path): Path where the zip file will be created.
+            source_dir (Path): Directory the archived paths are relative to.
+            compression (str): One of ``ZIP_COMPRESSIONS``. Defaults to "stored",
+                since compressed audio does not shrink any further.
+            delete_sources (bool): Delete each file once it is archived. Defaults to True.
+            on_archived (Optional[Callable[[Path, float], None]]): Called from the writer
+                thread with each archived source path and the seconds it took to write.
+            append (bool): Add to the existing zip file instead of replacing it.
+                Defaults to False.
+        """
+        if compression not in ZIP_COMPRESSIONS:
+            raise ValueError(
+                f"Unknown zip compression '{compression}', "
+                f"expected one of: {', '.join(ZIP_COMPRESSIONS)}"
+            )
+        self.zip_filename = Path(zip_filename)
+        self.source_dir = Path(source_dir)
+        self.delete_sources = delete_sources
+        self.on_archived = on_archived
+        self.archived: List[Path] = []
+        self._zipf = zipfile.ZipFile(
+            self.zip_filename,
+            "a" if append else "w",
+            compression=ZIP_COMPRESSIONS[compression],
+            allowZip64=True,
+        )
+        self._queue: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name="zip-writer", daemon=True)
+        self._thread.start()
+        self._closed = False
+        logger.debug(f"Streaming tracks into zip file: {self.zip_filename}")
+
+    def _write_loop(self) -> None:
+        while True:
+            file = self._queue.get()
+            if file is None:
+                return
+            if not file.exists():
+                logger.warning(f"File not found when creating zip: {file}")
+                continue
+            start = time.perf_counter()
+            try:
+                logger.debug(f"Adding file to zip: {file}")
+                self._zipf.write(file, self.member_name(file))
+            except Exception as e:
+                logger.error(f"Failed to add '{file}' to zip: {str(e)}")
+                continue
+            self.archived.append(file)
+            if self.delete_sources:
+                file.unlink()
+            if self.on_archived:
+                self.on_archived(file, time.perf_counter() - start)
+
+    def member_name(self, file: Path) -> str:
+        """Get the name a file inside ``source_dir`` is archived under."""
+        return Path(file).relative_to(self.source_dir).as_posix()
+
+    def add(self, file: Path) -> None:
+        """
+        Queue a finished file for archiving.
+
+        Args:
+            file (Path): The file to add, inside ``source_dir``.
+        """
+        self._queue.put(Path(file))
+
+    def close(self) -> List[Path]:
+        """
+        Archive the remaining queued files and finalize the zip file.
+
+        Returns:
+            List[Path]: The source paths that were archived.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            self._zipf.close()
+        return self.archived
+
+    def __enter__(self) -> "StreamingZipWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
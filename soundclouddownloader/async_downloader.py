@@ -0,0 +1,304 @@
+import asyncio, os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+from loguru import logger
+from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.dataclass import Track, Playlist
+from soundclouddownloader.run import PlaylistRun
+from soundclouddownloader.retry import RetryQueue
+
+# Marks the end of the playlist enumeration on the results queue
+_ENUMERATED = object()
+
+
+class AsyncSoundCloudDownloader:
+    """
+    An asyncio front-end to :class:`SoundCloudDownloader`.
+
+    Every track is a cheap coroutine rather than a thread: the number of tracks
+    in flight is bounded by a semaphore, while the blocking yt-dlp downloads and
+    FFmpeg transcodes run in two bounded executors whose threads (and their
+    yt-dlp sessions) are reused for the lifetime of the downloader. Cancelling a
+    download cancels every track that has not started yet; a fetch or transcode
+    already running in an executor thread finishes on its own, but its result is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        downloader: Optional[SoundCloudDownloader] = None,
+        max_concurrency: int = 5,
+        fetch_workers: Optional[int] = None,
+        transcode_workers: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the asynchronous downloader.
+
+        Args:
+            downloader (Optional[SoundCloudDownloader]): The downloader doing the work.
+                Defaults to a new one built from ``kwargs``, closed with this one.
+            max_concurrency (int): Maximum number of tracks in flight. Defaults to 5.
+            fetch_workers (Optional[int]): Threads running blocking yt-dlp work.
+                Defaults to ``max_concurrency``.
+            transcode_workers (Optional[int]): Threads running FFmpeg transcodes.
+                Defaults to the number of CPU cores.
+            **kwargs: Passed to :class:`SoundCloudDownloader` when ``downloader`` is not given.
+        """
+        self._owns_downloader = downloader is None
+        self.downloader = downloader or SoundCloudDownloader(**kwargs)
+        self.max_concurrency = max_concurrency
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=fetch_workers or max_concurrency, thread_name_prefix="async-fetch"
+        )
+        self._transcode_executor = ThreadPoolExecutor(
+            max_workers=transcode_workers or os.cpu_count() or 1,
+            thread_name_prefix="async-transcode",
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so that it binds to the loop the downloader is used on
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run_in(
+        self, executor: Optional[ThreadPoolExecutor], func: Callable[..., Any], *args: Any
+    ) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+    async def get_playlist_info(self, playlist_url: str) -> Playlist:
+        """
+        Get information about a SoundCloud playlist.
+
+        Args:
+            playlist_url (str): The URL of the playlist.
+
+        Returns:
+            Playlist: A Playlist object containing information about the playlist and its tracks.
+        """
+        return await self._run_in(
+            self._fetch_executor, self.downloader.get_playlist_info, playlist_url
+        )
+
+    async def _download_track(self, track: Track, output_dir: Path) -> Optional[Path]:
+        fetched = await self._run_in(
+            self._fetch_executor, self.downloader.fetch_track, track, output_dir
+        )
+        if fetched is None:
+            return None
+        return await self._run_in(
+            self._transcode_executor, self.downloader.transcode_track, fetched
+        )
+
+    async def download_track(self, track: Track, output_dir: Path) -> Optional[Path]:
+        """
+        Download a single track, waiting for a free slot first.
+
+        Args:
+            track (Track): The track to download.
+            output_dir (Path): The directory to save the downloaded track.
+
+        Returns:
+            Optional[Path]: The path to the downloaded file, or None if download failed.
+        """
+        filepath = None
+        try:
+            async with self.semaphore:
+                filepath = await self._download_track(track, output_dir)
+            return filepath
+        finally:
+            # Outside of a run, nothing else collects the track's metrics
+            self.downloader.metrics.finish(track, filepath)
+
+    async def _iter_tracks(
+        self, playlist_url: str, flat: bool
+    ) -> Tuple[Playlist, AsyncIterator[Track]]:
+        if not flat:
+            playlist = await self.get_playlist_info(playlist_url)
+
+            async def listed() -> AsyncIterator[Track]:
+                for track in playlist.tracks:
+                    yield track
+
+            return playlist, listed()
+
+        playlist, tracks = await self._run_in(
+            self._fetch_executor, self.downloader.iter_playlist_tracks, playlist_url
+        )
+
+        async def enumerated() -> AsyncIterator[Track]:
+            # The flat enumeration pages through the playlist with blocking requests
+            try:
+                while True:
+                    track = await self._run_in(self._fetch_executor, next, tracks, None)
+                    if track is None:
+                        return
+                    yield track
+            finally:
+                await self._run_in(self._fetch_executor, tracks.close)
+
+        return playlist, enumerated()
+
+    async def _download_run(
+        self, run: PlaylistRun, tracks: AsyncIterator[Track]
+    ) -> AsyncIterator[Tuple[Track, Optional[Path]]]:
+        results: asyncio.Queue = asyncio.Queue()
+        pending = set()
+        retries = RetryQueue(self.downloader.retry_policy)
+
+        async def download(track: Track) -> None:
+            holding = True
+            try:
+                while True:
+                    try:
+                        filepath = await self._download_track(track, run.playlist_dir)
+                    except Exception as e:
+                        logger.error(f"Failed to download track '{track.title}': {str(e)}")
+                        filepath = None
+                    delay = None
+                    if filepath is None:
+                        delay = retries.backoff(track, self.downloader.metrics.get(track))
+                    if delay is None:
+                        break
+                    # Other tracks may use the slot while this one waits to retry
+                    self.semaphore.release()
+                    holding = False
+                    await asyncio.sleep(delay)
+                    await self.semaphore.acquire()
+                    holding = True
+            finally:
+                if holding:
+                    self.semaphore.release()
+            results.put_nowait((track, filepath))
+
+        async def enumerate_tracks() -> None:
+            try:
+                async for track in tracks:
+                    scheduled = run.schedule(track)
+                    if scheduled is None:
+                        continue
+                    # Waiting for a slot here throttles the enumeration as well
+                    await self.semaphore.acquire()
+                    task = asyncio.create_task(download(scheduled))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            except Exception as e:
+                logger.error(f"Playlist enumeration stopped early: {str(e)}")
+            finally:
+                results.put_nowait(_ENUMERATED)
+
+        enumerator = asyncio.create_task(enumerate_tracks())
+        enumerated = False
+        collected = 0
+        try:
+            while not enumerated or collected < run.scheduled:
+                result = await results.get()
+                if result is _ENUMERATED:
+                    enumerated = True
+                    continue
+                collected += 1
+                track, filepath = result
+                run.record(track, filepath)
+                yield track, filepath
+        finally:
+            tasks = [enumerator, *pending]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def iter_download_playlist(
+        self,
+        playlist_url: str,
+        output_dir: Path,
+        flat: bool = False,
+        resume: bool = True,
+    ) -> AsyncIterator[Tuple[Track, Optional[Path]]]:
+        """
+        Download a playlist, yielding the outcome of every track as it completes.
+
+        Tracks that a previous run already completed are skipped and not yielded.
+        Leaving the loop early cancels the tracks that are still pending.
+
+        Args:
+            playlist_url (str): The URL of the playlist to download.
+            output_dir (Path): The directory to save the downloaded tracks.
+            flat (bool, optional): Enumerate the playlist flat and start downloading
+                tracks as they are discovered. Defaults to False.
+            resume (bool, optional): Skip tracks completed by a previous run. Defaults to True.
+
+        Yields:
+            Tuple[Track, Optional[Path]]: The track and its final path, or None if it failed.
+        """
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        playlist, tracks = await self._iter_tracks(playlist_url, flat)
+        run = self.downloader.open_run(playlist, output_dir, resume=resume)
+        try:
+            async for result in self._download_run(run, tracks):
+                yield result
+        finally:
+            await self._run_in(None, run.finish)
+
+    async def download_playlist(
+        self,
+        playlist_url: str,
+        output_dir: Path,
+        should_zip: bool = False,
+        flat: bool = False,
+        resume: bool = True,
+        zip_compression: str = "stored",
+    ) -> Optional[Path]:
+        """
+        Download an entire playlist from SoundCloud.
+
+        Args:
+            playlist_url (str): The URL of the playlist to download.
+            output_dir (Path): The directory to save the downloaded tracks.
+            should_zip (bool, optional): Whether to zip the downloaded files. Defaults to False.
+            flat (bool, optional): Enumerate the playlist flat and start downloading
+                tracks as they are discovered. Defaults to False.
+            resume (bool, optional): Skip tracks completed by a previous run. Defaults to True.
+            zip_compression (str, optional): Compression of the zip archive. Defaults to "stored".
+
+        Returns:
+            Optional[Path]: The path to the zipped playlist or playlist directory, or None if download failed.
+        """
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        logger.debug(f"Downloading to directory: {output_dir}")
+
+        playlist, tracks = await self._iter_tracks(playlist_url, flat)
+        run = self.downloader.open_run(
+            playlist,
+            output_dir,
+            should_zip=should_zip,
+            zip_compression=zip_compression,
+            resume=resume,
+        )
+        try:
+            async for _ in self._download_run(run, tracks):
+                pass
+        finally:
+            # Finalizing the archive waits for its writer thread
+            await self._run_in(None, run.close)
+
+        return await self._run_in(None, run.finish)
+
+    async def aclose(self) -> None:
+        """Stop the executors and close the underlying downloader if it is owned."""
+        await self._run_in(None, self._fetch_executor.shutdown, True)
+        await self._run_in(None, self._transcode_executor.shutdown, True)
+        if self._owns_downloader:
+            self.downloader.close()
+
+    async def __aenter__(self) -> "AsyncSoundCloudDownloader":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -0,0 +1,131 @@
+import collections, itertools, threading, time
+from typing import Any, Dict, Optional
+from loguru import logger
+
+
+class BandwidthLimiter:
+    """
+    A thread-safe cap on the bytes per second downloaded by all workers together.
+
+    Downloads report the bytes they read through :meth:`progress_hook`, which
+    yt-dlp calls from the downloading thread after every block, and are
+    paused there while they are over budget. The budget is a token bucket
+    holding up to ``burst`` seconds of traffic; a block may overdraw it, and
+    the worker then waits until the debt is repaid. Waiting workers are served
+    first come, first served, so concurrent downloads share the cap evenly.
+
+    The cap can be changed or lifted while downloads are running (:attr:`limit`).
+    """
+
+    def __init__(self, limit: Optional[int] = None, burst: float = 1.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            limit (Optional[int]): Bytes per second shared by all downloads.
+                Defaults to None (unlimited).
+            burst (float): Seconds of traffic that may be downloaded back to back
+                after an idle period. Defaults to 1.
+        """
+        if burst <= 0:
+            raise ValueError("burst must be positive")
+        self.burst = burst
+        self._cond = threading.Condition()
+        self._limit: Optional[int] = None
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._queue: collections.deque = collections.deque()
+        self._tickets = itertools.count()
+        # Bytes already reported by each download in progress
+        self._reported: Dict[str, int] = {}
+        self.bytes = 0
+        self.waited = 0.0
+        self.limit = limit
+
+    @property
+    def limit(self) -> Optional[int]:
+        """Bytes per second shared by all downloads, or None if unlimited."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: Optional[int]) -> None:
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be positive")
+        with self._cond:
+            if limit == self._limit:
+                return
+            self._refill(time.monotonic())
+            self._limit = limit
+            self._tokens = min(self._tokens, limit * self.burst) if limit else 0.0
+            # Waiting downloads recompute their wait under the new limit
+            self._cond.notify_all()
+        if limit:
+            logger.info(f"Bandwidth limited to {limit / 1024**2:.2f} MB/s")
+        else:
+            logger.info("Bandwidth unlimited")
+
+    def _refill(self, now: float) -> None:
+        if self._limit:
+            self._tokens = min(
+                self._limit * self.burst, self._tokens + (now - self._updated) * self._limit
+            )
+        self._updated = now
+
+    def consume(self, nbytes: int) -> float:
+        """
+        Account for downloaded bytes, blocking while the downloads are over the cap.
+
+        Args:
+            nbytes (int): Bytes just downloaded.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        if nbytes <= 0:
+            return 0.0
+        with self._cond:
+            self.bytes += nbytes
+            if not self._limit:
+                return 0.0
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            start = time.monotonic()
+            try:
+                while self._limit:
+                    self._refill(time.monotonic())
+                    if self._queue[0] == ticket and self._tokens >= 0:
+                        break
+                    # Only the first in line waits for the bucket, the rest for their turn
+                    self._cond.wait(
+                        -self._tokens / self._limit if self._queue[0] == ticket else None
+                    )
+                if self._limit:
+                    self._tokens -= nbytes
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+            waited = time.monotonic() - start
+            self.waited += waited
+            return waited
+
+    def progress_hook(self, status: Dict[str, Any]) -> None:
+        """
+        A yt-dlp progress hook pacing the download it is called for.
+
+        Args:
+            status (Dict[str, Any]): The progress status passed by yt-dlp.
+        """
+        key = status.get("tmpfilename") or status.get("filename")
+        if key is None:
+            return
+        downloaded = status.get("downloaded_bytes") or 0
+        with self._cond:
+            downloading = status.get("status") == "downloading"
+            # Files found complete on disk finish without downloading
+            if key not in self._reported and not downloading:
+                return
+            # A restarted download reports fewer bytes than before
+            previous = self._reported.pop(key, 0)
+            if downloading:
+                self._reported[key] = downloaded
+        self.consume(downloaded - previous)
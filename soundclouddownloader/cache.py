@@ -0,0 +1,158 @@
+import json, sqlite3, threading, time
+from pathlib import Path
+from typing import List, Optional
+from loguru import logger
+from soundclouddownloader.dataclass import Track, Playlist
+
+# One hour
+DEFAULT_PLAYLIST_TTL = 3600.0
+
+
+class PlaylistCache:
+    """
+    A persistent cache of resolved playlist metadata, keyed by playlist URL.
+
+    Resolving a playlist asks SoundCloud about every one of its tracks, so a
+    warm cache lets reruns (e.g. retried CI jobs) skip the enumeration phase.
+    Entries younger than ``ttl`` are used as they are. Older entries are
+    revalidated cheaply: the caller lists the playlist's track ids with a flat
+    enumeration and the entry is reused as long as they have not changed.
+
+    Only the playlist and track metadata is cached. yt-dlp info dicts hold
+    signed stream URLs that expire, so cached tracks are resolved when they are
+    downloaded.
+    """
+
+    def __init__(self, path: Path, ttl: float = DEFAULT_PLAYLIST_TTL, refresh: bool = False):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (Path): Path of the SQLite file.
+            ttl (float): Seconds during which an entry is used without revalidation.
+                Defaults to one hour.
+            refresh (bool): Bypass the cache: entries are never read, but freshly
+                resolved playlists are still written. Defaults to False.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS playlists (
+                    url TEXT PRIMARY KEY,
+                    playlist TEXT NOT NULL,
+                    listed INTEGER NOT NULL,
+                    validated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, url: str) -> Optional[Playlist]:
+        """
+        Get a cached playlist, regardless of its age.
+
+        Args:
+            url (str): The playlist URL.
+
+        Returns:
+            Optional[Playlist]: The cached playlist, or None if it is not cached
+            or the cache is bypassed.
+        """
+        row = self._row(url)
+        return self._decode(row[0]) if row else None
+
+    def is_fresh(self, url: str) -> bool:
+        """Check whether a cached playlist may be used without revalidation."""
+        row = self._row(url)
+        return bool(row) and time.time() - row[2] < self.ttl
+
+    def _row(self, url: str):
+        if self.refresh:
+            return None
+        with self._lock:
+            return self._conn.execute(
+                "SELECT playlist, listed, validated_at FROM playlists WHERE url = ?", (url,)
+            ).fetchone()
+
+    def revalidate(self, url: str, track_ids: List[str]) -> Optional[Playlist]:
+        """
+        Reuse a cached playlist if its tracks are unchanged.
+
+        The playlist is unchanged if it still lists as many tracks as when it was
+        resolved and every cached track is among them. Tracks that could not be
+        resolved are counted but not cached, so they do not invalidate the entry.
+
+        Args:
+            url (str): The playlist URL.
+            track_ids (List[str]): The ids currently listed by the playlist.
+
+        Returns:
+            Optional[Playlist]: The cached playlist, now valid for another ``ttl``,
+            or None if the playlist changed.
+        """
+        row = self._row(url)
+        playlist = self._decode(row[0]) if row else None
+        if (
+            playlist is None
+            or len(track_ids) != row[1]
+            or not {track.id for track in playlist.tracks} <= set(track_ids)
+        ):
+            logger.debug(f"Cached playlist changed: {url}")
+            return None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE playlists SET validated_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return playlist
+
+    def put(self, url: str, playlist: Playlist, listed: Optional[int] = None) -> None:
+        """
+        Store a freshly resolved playlist.
+
+        Args:
+            url (str): The playlist URL.
+            playlist (Playlist): The resolved playlist.
+            listed (Optional[int]): Number of tracks the playlist lists, including
+                any that could not be resolved. Defaults to the number of tracks.
+        """
+        data = {
+            "id": playlist.id,
+            "title": playlist.title,
+            "tracks": [
+                {
+                    "id": track.id,
+                    "title": track.title,
+                    "artist": track.artist,
+                    "url": track.url,
+                }
+                for track in playlist.tracks
+            ],
+        }
+        if listed is None:
+            listed = len(playlist.tracks)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO playlists (url, playlist, listed, validated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (url, json.dumps(data), listed, time.time()),
+            )
+
+    @staticmethod
+    def _decode(data: str) -> Playlist:
+        playlist = json.loads(data)
+        return Playlist(
+            id=playlist["id"],
+            title=playlist["title"],
+            tracks=[Track(**track) for track in playlist["tracks"]],
+        )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
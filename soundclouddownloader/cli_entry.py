@@ -1,34 +1,445 @@
 import argparse
 from pathlib import Path
+from typing import List, Union
 from loguru import logger
 from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.policy import OUTPUT_POLICIES, POLICY_TRANSCODE
+from soundclouddownloader.archive import ZIP_COMPRESSIONS
+from soundclouddownloader.utils import read_url_file, setup_logging
+from soundclouddownloader.store import TrackStore, DEFAULT_STORE_MAX_SIZE
+from soundclouddownloader.cache import PlaylistCache, DEFAULT_PLAYLIST_TTL
+from soundclouddownloader.workqueue import WorkQueue, DEFAULT_LEASE_TIMEOUT
+from soundclouddownloader.concurrency import ConcurrencyController
+from soundclouddownloader.retry import RetryPolicy, DEFAULT_RETRY_BUDGET
+from soundclouddownloader.proxies import ProxyPool
+from soundclouddownloader.daemon import DownloadDaemon, DEFAULT_DAEMON_PORT
+from soundclouddownloader.renditions import parse_renditions
 
 
-def run(playlist_url: str, output_dir: Path, should_zip: bool = False, proxy: str = None):
+def run(
+    playlist_url: Union[str, List[str]],
+    output_dir: Path,
+    should_zip: bool = False,
+    proxy: str = None,
+    *,
+    flat: bool = False,
+    resume: bool = True,
+    requests_per_second: float = 1.0,
+    burst: int = 3,
+    transcode_workers: int = None,
+    output_policy: str = POLICY_TRANSCODE,
+    zip_compression: str = "stored",
+    store_dir: Path = None,
+    store_max_size: int = DEFAULT_STORE_MAX_SIZE,
+    playlist_cache_path: Path = None,
+    playlist_ttl: float = DEFAULT_PLAYLIST_TTL,
+    refresh_playlists: bool = False,
+    report_dir: Path = None,
+    fragment_connections: int = 4,
+    connection_budget: int = 8,
+    queue_path: Path = None,
+    worker: bool = False,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    max_workers: int = 3,
+    adaptive_max_workers: int = None,
+    max_retries: int = 3,
+    retry_budget: int = DEFAULT_RETRY_BUDGET,
+    proxy_pool: List[str] = None,
+    per_proxy_workers: int = 2,
+    max_bandwidth: int = None,
+    serve: bool = False,
+    listen: str = f"127.0.0.1:{DEFAULT_DAEMON_PORT}",
+    socket_path: Path = None,
+    renditions: List[str] = None,
+):
     """
     Run the download using non-interactive input (for CLI or GitHub Actions).
 
     Args:
-        playlist_url (str): The URL of the SoundCloud playlist
+        playlist_url (Union[str, List[str]]): The URL of the SoundCloud playlist, or
+            several URLs to download as one batch with shared tracks downloaded once
         output_dir (Path): The directory to save downloads
         should_zip (bool): Whether to zip the downloaded files
         proxy (str): Optional proxy URL to use for downloads
+        flat (bool): Stream the playlist and download tracks as they are discovered
+        resume (bool): Skip tracks already completed by a previous run
+        requests_per_second (float): Request budget shared by all download workers
+        burst (int): Number of requests that may be issued back to back
+        transcode_workers (int): Number of concurrent FFmpeg transcodes (default: CPU count)
+        output_policy (str): How downloaded audio is turned into output files
+        zip_compression (str): Compression of the zip archive
+        store_dir (Path): Optional track store shared across playlists and runs
+        store_max_size (int): Size limit of the track store in bytes
+        playlist_cache_path (Path): Optional file caching resolved playlists between runs
+        playlist_ttl (float): Seconds a cached playlist is used without revalidation
+        refresh_playlists (bool): Resolve playlists again even if they are cached
+        report_dir (Path): Optional directory for per-run JSON and Prometheus reports
+        fragment_connections (int): Connections a single long track may be fetched over
+        connection_budget (int): Extra connections shared by all long tracks
+        queue_path (Path): Optional work queue shared with other processes; the playlists
+            are queued instead of downloaded directly
+        worker (bool): Download tracks from the work queue until none is left
+        lease_timeout (float): Seconds after which tracks of an unresponsive worker are reissued
+        max_workers (int): Number of concurrent downloads, or the initial number when adaptive
+        adaptive_max_workers (int): Optional upper bound of downloads in flight; the number
+            then adapts to throughput and throttling, starting at ``max_workers``
+        max_retries (int): Retries of a track that failed with a transient error or throttling
+        retry_budget (int): Retries of all tracks of a playlist run together
+        proxy_pool (List[str]): Optional proxy URLs tracks are spread across, each with
+            its own request budget of ``requests_per_second``
+        per_proxy_workers (int): Concurrent downloads carried by one proxy of the pool
+        max_bandwidth (int): Optional cap on the bytes per second of all downloads together
+        serve (bool): Keep running and accept playlist jobs over a local API; the given
+            playlists are queued as the first jobs
+        listen (str): ``host:port`` the job API listens on
+        socket_path (Path): Optional Unix socket the job API listens on instead
+        renditions (List[str]): Optional output formats such as ``mp3@192``, all encoded
+            from one download and one decode of every track
     """
-    downloader = SoundCloudDownloader(proxy=proxy)
-    result = downloader.download_playlist(
-        playlist_url, output_dir, max_workers=3, should_zip=should_zip
+    store = TrackStore(store_dir, max_size=store_max_size) if store_dir else None
+    playlist_cache = (
+        PlaylistCache(playlist_cache_path, ttl=playlist_ttl, refresh=refresh_playlists)
+        if playlist_cache_path
+        else None
     )
+    downloader = SoundCloudDownloader(
+        proxy=proxy,
+        requests_per_second=requests_per_second,
+        burst=burst,
+        output_policy=output_policy,
+        store=store,
+        playlist_cache=playlist_cache,
+        report_dir=report_dir,
+        fragment_connections=fragment_connections,
+        connection_budget=connection_budget,
+        concurrency=(
+            ConcurrencyController(initial=max_workers, maximum=adaptive_max_workers)
+            if adaptive_max_workers
+            else None
+        ),
+        retry_policy=RetryPolicy(max_retries=max_retries, budget=retry_budget),
+        proxies=(
+            ProxyPool(
+                proxy_pool,
+                max_per_proxy=per_proxy_workers,
+                requests_per_second=requests_per_second,
+                burst=burst,
+            )
+            if proxy_pool
+            else None
+        ),
+        max_bandwidth=max_bandwidth,
+        renditions=renditions,
+    )
+    playlist_urls = [playlist_url] if isinstance(playlist_url, str) else list(playlist_url)
+    queue = WorkQueue(queue_path, lease_timeout=lease_timeout) if queue_path else None
+    try:
+        if serve:
+            daemon = DownloadDaemon(
+                downloader,
+                output_dir,
+                max_workers=max_workers,
+                transcode_workers=transcode_workers,
+                zip_compression=zip_compression,
+            ).start()
+            for url in dict.fromkeys(playlist_urls):
+                daemon.submit(url, should_zip=should_zip, flat=flat, resume=resume)
+            host, _, port = listen.rpartition(":")
+            daemon.serve(host or "127.0.0.1", int(port), socket_path)
+            return
+        if queue:
+            for url in dict.fromkeys(playlist_urls):
+                downloader.publish_playlist(url, queue)
+            if worker:
+                downloader.work(
+                    queue,
+                    output_dir,
+                    max_workers=max_workers,
+                    transcode_workers=transcode_workers,
+                )
+            return
+        if len(playlist_urls) > 1:
+            downloader.download_playlists(
+                playlist_urls,
+                output_dir,
+                max_workers=max_workers,
+                should_zip=should_zip,
+                flat=flat,
+                resume=resume,
+                transcode_workers=transcode_workers,
+                zip_compression=zip_compression,
+            )
+            return
+        result = downloader.download_playlist(
+            playlist_urls[0],
+            output_dir,
+            max_workers=max_workers,
+            should_zip=should_zip,
+            flat=flat,
+            resume=resume,
+            transcode_workers=transcode_workers,
+            zip_compression=zip_compression,
+        )
+    finally:
+        downloader.close()
+        if store:
+            store.close()
+        if playlist_cache:
+            playlist_cache.close()
+        if queue:
+            queue.close()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CLI for SoundCloud Downloader")
-    parser.add_argument("--url", required=True, help="SoundCloud playlist URL")
+    parser.add_argument(
+        "--url",
+        nargs="+",
+        default=[],
+        help="SoundCloud playlist URL. Several URLs are downloaded as one batch",
+    )
+    parser.add_argument(
+        "--url-file",
+        type=Path,
+        help="File with one playlist URL per line, downloaded as one batch",
+    )
     parser.add_argument("--output", default="output", help="Output directory")
     parser.add_argument("--proxy", help="Proxy URL (e.g., http://proxy.example.com:8080)")
+    parser.add_argument(
+        "--proxy-pool",
+        nargs="+",
+        default=[],
+        help="Proxy URLs to spread track downloads across; every proxy gets its own "
+        "--rate budget, and slow or failing proxies are drained for a while",
+    )
+    parser.add_argument(
+        "--proxy-file",
+        type=Path,
+        help="File with one proxy URL per line, added to --proxy-pool",
+    )
+    parser.add_argument(
+        "--per-proxy-workers",
+        type=int,
+        default=2,
+        help="Concurrent downloads carried by one proxy of the pool (default: 2)",
+    )
     parser.add_argument("--zip", action="store_true", help="Zip the downloaded files")
+    parser.add_argument(
+        "--flat",
+        action="store_true",
+        help="Enumerate the playlist flat and download tracks as they are discovered",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-download tracks already recorded as completed in the manifest",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=3,
+        help="Concurrent downloads, or the initial number with --max-workers (default: 3)",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        help="Adapt the number of concurrent downloads up to this limit, growing it "
+        "while throughput rises and cutting it on throttling or timeouts",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries of a track that failed with a timeout, a server error or "
+        "throttling, with exponential backoff (default: 3)",
+    )
+    parser.add_argument(
+        "--retry-budget",
+        type=int,
+        default=DEFAULT_RETRY_BUDGET,
+        help=f"Retries of all tracks of a playlist together (default: {DEFAULT_RETRY_BUDGET})",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=1.0,
+        help="Requests per second shared by all download workers (default: 1.0)",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=3,
+        help="Requests that may be issued back to back (default: 3)",
+    )
+    parser.add_argument(
+        "--max-bandwidth",
+        type=int,
+        help="Cap on the KB/s downloaded by all workers together, shared evenly "
+        "between the downloads in flight (default: unlimited)",
+    )
+    parser.add_argument(
+        "--transcode-workers",
+        type=int,
+        help="Concurrent FFmpeg transcodes, separate from the download workers "
+        "(default: number of CPU cores)",
+    )
+    parser.add_argument(
+        "--output-policy",
+        choices=OUTPUT_POLICIES,
+        default=POLICY_TRANSCODE,
+        help="How downloaded audio is turned into output files (default: transcode)",
+    )
+    parser.add_argument(
+        "--renditions",
+        nargs="+",
+        metavar="CODEC@KBPS",
+        help="Encode every track into several formats, e.g. mp3@192 mp3@320 opus@128, "
+        "from a single download and decode; each is saved in its own directory "
+        "(replaces --output-policy)",
+    )
+    parser.add_argument(
+        "--zip-compression",
+        choices=list(ZIP_COMPRESSIONS),
+        default="stored",
+        help="Compression of the zip archive (default: stored, audio does not compress)",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        help="Directory of a track store shared across playlists and runs; "
+        "stored tracks are linked into place instead of downloaded again",
+    )
+    parser.add_argument(
+        "--store-max-size",
+        type=int,
+        default=DEFAULT_STORE_MAX_SIZE // 1024**2,
+        help="Size limit of the track store in MB, least recently used tracks "
+        "are evicted first (default: 10240)",
+    )
+    parser.add_argument(
+        "--playlist-cache",
+        type=Path,
+        help="File caching resolved playlists, so reruns skip resolving unchanged playlists",
+    )
+    parser.add_argument(
+        "--playlist-ttl",
+        type=float,
+        default=DEFAULT_PLAYLIST_TTL,
+        help="Seconds a cached playlist is used without checking it for changes "
+        "(default: 3600)",
+    )
+    parser.add_argument(
+        "--refresh-playlists",
+        action="store_true",
+        help="Ignore cached playlists and resolve them again",
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=Path,
+        help="Write a JSON report and a Prometheus text file with per-stage timings "
+        "of every run to this directory",
+    )
+    parser.add_argument(
+        "--fragment-connections",
+        type=int,
+        default=4,
+        help="Connections a single long track is fetched over (default: 4, 1 disables)",
+    )
+    parser.add_argument(
+        "--connection-budget",
+        type=int,
+        default=8,
+        help="Extra connections shared by all long tracks, on top of one per "
+        "download worker (default: 8)",
+    )
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        help="Work queue file on storage shared by several processes or hosts; "
+        "playlists given with --url are queued instead of downloaded",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Download tracks from the --queue until none is left",
+    )
+    parser.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=DEFAULT_LEASE_TIMEOUT,
+        help="Seconds after which the tracks of an unresponsive worker are "
+        "issued to another worker (default: 300)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep running with warm workers and accept playlist jobs over a local "
+        "HTTP API; --url playlists are queued as the first jobs",
+    )
+    parser.add_argument(
+        "--listen",
+        default=f"127.0.0.1:{DEFAULT_DAEMON_PORT}",
+        help=f"host:port of the job API (default: 127.0.0.1:{DEFAULT_DAEMON_PORT})",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="Serve the job API on this Unix socket instead of --listen",
+    )
     args = parser.parse_args()
+    setup_logging()
+
+    playlist_urls = args.url + (read_url_file(args.url_file) if args.url_file else [])
+    proxy_pool = args.proxy_pool + (read_url_file(args.proxy_file) if args.proxy_file else [])
+    if args.worker and not args.queue:
+        parser.error("--worker requires --queue")
+    if args.renditions:
+        try:
+            parse_renditions(args.renditions)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.zip or args.store:
+            parser.error("--renditions cannot be combined with --zip or --store")
+    if args.serve and args.queue:
+        parser.error("--serve cannot be combined with --queue")
+    if not playlist_urls and not args.worker and not args.serve:
+        parser.error("at least one of --url or --url-file is required")
 
     output_path = Path(args.output).resolve()
     output_path.mkdir(parents=True, exist_ok=True)
 
-    run(args.url, output_path, args.zip, args.proxy)
+    run(
+        playlist_urls,
+        output_path,
+        should_zip=args.zip,
+        proxy=args.proxy,
+        flat=args.flat,
+        resume=not args.force,
+        requests_per_second=args.rate,
+        burst=args.burst,
+        transcode_workers=args.transcode_workers,
+        output_policy=args.output_policy,
+        zip_compression=args.zip_compression,
+        store_dir=args.store,
+        store_max_size=args.store_max_size * 1024**2,
+        playlist_cache_path=args.playlist_cache,
+        playlist_ttl=args.playlist_ttl,
+        refresh_playlists=args.refresh_playlists,
+        report_dir=args.report_dir,
+        fragment_connections=args.fragment_connections,
+        connection_budget=args.connection_budget,
+        queue_path=args.queue,
+        worker=args.worker,
+        lease_timeout=args.lease_timeout,
+        max_workers=args.workers,
+        adaptive_max_workers=args.max_workers,
+        max_retries=args.retries,
+        retry_budget=args.retry_budget,
+        proxy_pool=proxy_pool,
+        per_proxy_workers=args.per_proxy_workers,
+        max_bandwidth=args.max_bandwidth * 1024 if args.max_bandwidth else None,
+        serve=args.serve,
+        listen=args.listen,
+        socket_path=args.socket,
+        renditions=args.renditions,
+    )
@@ -0,0 +1,185 @@
+import socket, threading, time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from loguru import logger
+
+
+def is_timeout(error: BaseException) -> bool:
+    """
+    Check whether an error was caused by a connection or read timeout.
+
+    Like :func:`is_throttled`, the cause chain of yt-dlp's wrapped errors is
+    followed and the message is checked as a last resort.
+
+    Args:
+        error (BaseException): The error raised by a download.
+
+    Returns:
+        bool: True if a timeout caused the error.
+    """
+    message = str(error)
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (TimeoutError, socket.timeout)):
+            return True
+        exc_info = getattr(error, "exc_info", None)
+        error = (
+            getattr(error, "cause", None)
+            or (exc_info[1] if exc_info else None)
+            or error.__cause__
+        )
+    return "timed out" in message.lower()
+
+
+class ConcurrencyController:
+    """
+    An AIMD controller of the number of downloads in flight.
+
+    Workers hold a slot (:meth:`slot`) while they talk to SoundCloud and
+    report every outcome (:meth:`record`). Every ``interval`` seconds the
+    controller compares the bytes downloaded per second with the previous
+    interval: while throughput rises and errors stay below
+    ``error_threshold``, the limit grows by one; when throughput drops it
+    steps back by one. Throttling, timeouts or too many errors cut the limit
+    by ``backoff`` at once. The limit only grows while it is actually
+    reached, so an idle run does not inflate it, and changes are logged.
+    """
+
+    def __init__(
+        self,
+        initial: int = 3,
+        minimum: int = 1,
+        maximum: int = 16,
+        interval: float = 10.0,
+        error_threshold: float = 0.1,
+        backoff: float = 0.5,
+        tolerance: float = 0.05,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            initial (int): The initial limit. Defaults to 3.
+            minimum (int): The lowest limit. Defaults to 1.
+            maximum (int): The highest limit. Defaults to 16.
+            interval (float): Seconds between adjustments. Defaults to 10.
+            error_threshold (float): Share of failed downloads above which the limit is
+                cut. Defaults to 0.1.
+            backoff (float): Factor applied to the limit on congestion. Defaults to 0.5.
+            tolerance (float): Relative change of throughput considered noise. Defaults to 0.05.
+        """
+        if not 1 <= minimum <= maximum:
+            raise ValueError("limits must satisfy 1 <= minimum <= maximum")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = interval
+        self.error_threshold = error_threshold
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self._cond = threading.Condition()
+        self._limit = min(max(initial, minimum), maximum)
+        self._in_flight = 0
+        self._last_throughput: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._reset(time.monotonic())
+
+    @property
+    def limit(self) -> int:
+        with self._cond:
+            return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    def _reset(self, now: float) -> None:
+        self._window_start = now
+        self._bytes = 0
+        self._successes = 0
+        self._errors = 0
+        self._saturated = False
+
+    def acquire(self) -> None:
+        """Block until the number of downloads in flight is below the limit."""
+        with self._cond:
+            while self._in_flight >= self._limit:
+                self._saturated = True
+                self._cond.wait()
+            self._in_flight += 1
+            if self._in_flight >= self._limit:
+                self._saturated = True
+
+    def release(self) -> None:
+        """Free a slot taken with :meth:`acquire`."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot for the duration of a block."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, succeeded: bool, nbytes: int = 0, congested: bool = False) -> None:
+        """
+        Report the outcome of a download.
+
+        Args:
+            succeeded (bool): Whether the download succeeded.
+            nbytes (int): Bytes downloaded. Defaults to 0.
+            congested (bool): The download was throttled or timed out, which cuts
+                the limit right away. Defaults to False.
+        """
+        with self._cond:
+            now = time.monotonic()
+            if congested:
+                self._decrease(now, "throttled or timed out")
+                return
+            if succeeded:
+                self._successes += 1
+                self._bytes += nbytes
+            else:
+                self._errors += 1
+            if now - self._window_start >= self.interval:
+                self._adjust(now)
+
+    def _adjust(self, now: float) -> None:
+        samples = self._successes + self._errors
+        if not samples:
+            return
+        throughput = self._bytes / (now - self._window_start)
+        last = self._last_throughput
+        if self._errors / samples > self.error_threshold:
+            self._decrease(now, f"{self._errors}/{samples} downloads failed")
+            return
+        if last is None or throughput > last * (1 + self.tolerance):
+            if self._saturated:
+                self._set(self._limit + 1, "throughput rising")
+        elif throughput < last * (1 - self.tolerance):
+            self._set(self._limit - 1, "throughput dropping")
+        self._last_throughput = throughput
+        self._reset(now)
+
+    def _decrease(self, now: float, reason: str) -> None:
+        # Downloads started before the cut fail the same way, they must not cut again
+        if now - self._last_decrease >= self.interval:
+            self._last_decrease = now
+            self._set(int(self._limit * self.backoff), reason)
+        self._last_throughput = None
+        self._reset(now)
+
+    def _set(self, limit: int, reason: str) -> None:
+        limit = min(max(limit, self.minimum), self.maximum)
+        if limit == self._limit:
+            return
+        logger.info(f"Concurrency {self._limit} -> {limit} ({reason})")
+        self._limit = limit
+        self._cond.notify_all()
@@ -0,0 +1,112 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Tracks at least this long (in seconds) are fetched over several connections
+LONG_TRACK_SECONDS = 600.0
+
+
+def is_fragmented(info: Dict[str, Any]) -> bool:
+    """
+    Check whether a track is served as HLS fragments that can be fetched in parallel.
+
+    Args:
+        info (Dict[str, Any]): The track's info dict.
+
+    Returns:
+        bool: True if the selected format(s) use an HLS protocol. Formats
+        yt-dlp did not select are ignored.
+    """
+    formats = info.get("requested_formats") or [info]
+    return any(str(f.get("protocol") or "").startswith("m3u8") for f in formats)
+
+
+class ConnectionBudget:
+    """
+    A global budget of extra connections for fragment-level parallelism.
+
+    Every fetch worker downloads over its own connection. Long HLS tracks may
+    borrow extra connections from this budget to fetch several fragments at
+    once, so the total number of connections never exceeds the number of
+    workers plus ``limit``. Borrowing never blocks: a track gets whatever part
+    of its request is free when it starts, which may be nothing while the
+    whole budget is lent out.
+    """
+
+    def __init__(self, limit: int = 8):
+        """
+        Initialize the budget.
+
+        Args:
+            limit (int): Extra connections shared by all tracks. Defaults to 8.
+        """
+        self.limit = max(0, limit)
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+    @property
+    def in_use(self) -> int:
+        with self._lock:
+            return self._in_use
+
+    def acquire(self, wanted: int) -> int:
+        """
+        Borrow up to ``wanted`` extra connections.
+
+        Args:
+            wanted (int): The number of extra connections requested.
+
+        Returns:
+            int: The number of extra connections granted, possibly 0.
+        """
+        with self._lock:
+            granted = max(0, min(wanted, self.limit - self._in_use))
+            self._in_use += granted
+            return granted
+
+    def release(self, count: int) -> None:
+        """Return borrowed connections to the budget."""
+        with self._lock:
+            self._in_use = max(0, self._in_use - count)
+
+    @contextmanager
+    def lease(self, wanted: int) -> Iterator[int]:
+        """
+        Borrow extra connections for the duration of a block.
+
+        Args:
+            wanted (int): The number of extra connections requested.
+
+        Yields:
+            int: The number of extra connections granted.
+        """
+        granted = self.acquire(wanted)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+
+def connections_for(
+    info: Dict[str, Any],
+    max_connections: int,
+    long_track_seconds: Optional[float] = LONG_TRACK_SECONDS,
+) -> int:
+    """
+    Decide how many connections a track should be fetched over.
+
+    Args:
+        info (Dict[str, Any]): The track's info dict.
+        max_connections (int): Connections a single track may use.
+        long_track_seconds (Optional[float]): Minimum duration of a track fetched
+            in parallel. Defaults to ten minutes.
+
+    Returns:
+        int: 1 for ordinary tracks, up to ``max_connections`` for long HLS tracks.
+    """
+    duration = info.get("duration") or 0
+    if max_connections <= 1 or not is_fragmented(info):
+        return 1
+    if long_track_seconds is not None and duration < long_track_seconds:
+        return 1
+    return max_connections
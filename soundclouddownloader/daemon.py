@@ -0,0 +1,669 @@
+import heapq, itertools, json, queue, re, signal, socketserver, threading, time, uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+from loguru import logger
+from soundclouddownloader.dataclass import Track, FetchedTrack
+from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.pipeline import TrackPipeline
+from soundclouddownloader.retry import RetryQueue
+from soundclouddownloader.run import PlaylistRun
+from soundclouddownloader.utils import validate_url
+from soundclouddownloader.workqueue import JOB_QUEUED, JOB_COMPLETED, JOB_FAILED
+
+JOB_RUNNING = "running"
+JOB_CANCELLED = "cancelled"
+
+DEFAULT_DAEMON_PORT = 8765
+
+
+@dataclass(slots=True)
+class DaemonJob:
+    id: str
+    url: str
+    # Higher priorities are downloaded first, equal ones in submission order
+    priority: int = 0
+    should_zip: bool = False
+    flat: bool = False
+    resume: bool = True
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    playlist_title: Optional[str] = None
+    # Progress; the total is known once every track was scheduled
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    total: Optional[int] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the job as JSON-serializable data."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "priority": self.priority,
+            "zip": self.should_zip,
+            "flat": self.flat,
+            "resume": self.resume,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "playlist_title": self.playlist_title,
+            "progress": {
+                "completed": self.completed,
+                "failed": self.failed,
+                "in_flight": self.in_flight,
+                "total": self.total,
+            },
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+@dataclass(slots=True)
+class _JobTrack(Track):
+    """A track tagged with the job it is downloaded for."""
+
+    active: Optional["_ActiveJob"] = field(default=None, repr=False, compare=False)
+
+
+class _ActiveJob:
+    """A started job: its run, its remaining tracks and its deferred retries."""
+
+    def __init__(
+        self, job: DaemonJob, run: PlaylistRun, tracks: Iterator[Track], retries: RetryQueue
+    ):
+        self.job = job
+        self.run = run
+        self.tracks: Optional[Iterator[Track]] = tracks
+        self.retries = retries
+        self.cancelled = False
+        # Set once the job failed; its remaining tracks are dropped
+        self.error: Optional[str] = None
+
+    def next_track(self) -> Optional[_JobTrack]:
+        while self.tracks is not None:
+            track = next(self.tracks, None)
+            if track is None:
+                self.tracks = None
+                self.job.total = self.run.total_tracks
+            else:
+                scheduled = self.run.schedule(track)
+                if scheduled is not None:
+                    return _JobTrack(
+                        track.id, track.title, track.artist, track.url, track.info, scheduled.run, self
+                    )
+        return None
+
+
+class DownloadDaemon:
+    """
+    A long-running downloader serving playlist jobs from a priority queue.
+
+    All jobs share one :class:`TrackPipeline` whose fetch and transcode
+    workers live as long as the daemon, so the yt-dlp sessions of the workers
+    (HTTP connections, extractor state, SoundCloud's client_id) stay warm
+    from job to job and a job costs little more than resolving its playlist.
+    A scheduler thread starts jobs in priority order and keeps the pipeline
+    fed: once the tracks of the running jobs are all submitted, the next job
+    is started while their last tracks are still in flight, and a job of
+    higher priority is started right away and served first. Playlists are
+    resolved on a separate pool of threads, so a slow playlist does not hold
+    up the tracks of other jobs.
+
+    Jobs can be cancelled at any time; tracks of a cancelled job that have
+    not started are dropped and the tracks in flight are finished. Job state
+    is kept in memory only. :meth:`serve` exposes the daemon over a local
+    HTTP or Unix socket API.
+    """
+
+    def __init__(
+        self,
+        downloader: SoundCloudDownloader,
+        output_dir: Path,
+        max_workers: int = 5,
+        transcode_workers: Optional[int] = None,
+        zip_compression: str = "stored",
+        keep_finished: int = 1000,
+        resolve_workers: int = 2,
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            downloader (SoundCloudDownloader): The downloader, kept for the daemon's lifetime.
+            output_dir (Path): The directory receiving the playlist directories.
+            max_workers (int): Maximum number of concurrent downloads. Defaults to 5.
+            transcode_workers (Optional[int]): Number of concurrent FFmpeg transcodes.
+                Defaults to the number of CPU cores.
+            zip_compression (str): Compression of zipped jobs. Defaults to "stored".
+            keep_finished (int): Finished jobs remembered for status queries, the
+                oldest are forgotten first. Defaults to 1000.
+            resolve_workers (int): Number of playlists resolved at once. Defaults to 2.
+        """
+        self.downloader = downloader
+        self.output_dir = Path(output_dir).resolve()
+        self.max_workers = max_workers
+        self.transcode_workers = transcode_workers
+        self.zip_compression = zip_compression
+        self.keep_finished = keep_finished
+        self.resolve_workers = resolve_workers
+        self._cond = threading.Condition()
+        self._jobs: Dict[str, DaemonJob] = {}
+        self._queue: List[Tuple[int, int, str]] = []
+        self._order = itertools.count()
+        self._active: List[_ActiveJob] = []
+        # Running jobs whose playlist is being resolved, and those just resolved
+        self._resolving: Dict[str, DaemonJob] = {}
+        self._resolved: List[Tuple[DaemonJob, Future]] = []
+        self._resolver = ThreadPoolExecutor(
+            max_workers=resolve_workers, thread_name_prefix="daemon-resolve"
+        )
+        # Running jobs to cancel
+        self._cancelled: Set[str] = set()
+        self._stopping = False
+        # Set whenever the scheduler has something new to look at
+        self._changed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "DownloadDaemon":
+        """Start the workers and the scheduler."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._schedule, name="daemon-scheduler", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Download daemon started, saving to {self.output_dir}")
+        return self
+
+    def stop(self) -> None:
+        """Cancel all jobs, wait for the tracks in flight and stop the workers."""
+        with self._cond:
+            self._stopping = True
+            self._wake()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        # Playlists still being resolved belong to cancelled jobs
+        self._resolver.shutdown(wait=False, cancel_futures=True)
+        self.downloader.sessions.prune()
+        logger.info("Download daemon stopped")
+
+    def submit(
+        self,
+        url: str,
+        priority: int = 0,
+        should_zip: bool = False,
+        flat: bool = False,
+        resume: bool = True,
+    ) -> DaemonJob:
+        """
+        Queue a playlist.
+
+        Args:
+            url (str): The URL of the playlist.
+            priority (int): Jobs of higher priority are started first. Defaults to 0.
+            should_zip (bool): Zip the playlist. Defaults to False.
+            flat (bool): Enumerate the playlist flat. Defaults to False, so that the
+                playlist is resolved through the daemon's warm session.
+            resume (bool): Skip tracks completed by a previous run. Defaults to True.
+
+        Returns:
+            DaemonJob: The queued job.
+        """
+        job = DaemonJob(
+            id=uuid.uuid4().hex[:12],
+            url=url,
+            priority=priority,
+            should_zip=should_zip,
+            flat=flat,
+            resume=resume,
+        )
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("The daemon is stopping")
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (-priority, next(self._order), job.id))
+            self._wake()
+        logger.info(f"Queued job {job.id}: {url} (priority {priority})")
+        return job
+
+    def get(self, job_id: str) -> Optional[DaemonJob]:
+        """Get a job by id, or None if it is unknown."""
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[DaemonJob]:
+        """Get every job known to the daemon, oldest first."""
+        with self._cond:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[DaemonJob]:
+        """
+        Cancel a queued or running job.
+
+        Args:
+            job_id (str): The job.
+
+        Returns:
+            Optional[DaemonJob]: The job, or None if it is unknown. Finished jobs
+            are returned unchanged.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == JOB_QUEUED:
+                self._queue = [entry for entry in self._queue if entry[2] != job_id]
+                heapq.heapify(self._queue)
+                self._finish_job(job, JOB_CANCELLED)
+            elif job_id in self._resolving:
+                del self._resolving[job_id]
+                self._finish_job(job, JOB_CANCELLED)
+            elif job.status == JOB_RUNNING:
+                self._cancelled.add(job_id)
+            self._wake()
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[DaemonJob]:
+        """
+        Wait for a job to finish.
+
+        Args:
+            job_id (str): The job.
+            timeout (Optional[float]): Seconds to wait at most. Defaults to None (no limit).
+
+        Returns:
+            Optional[DaemonJob]: The job, or None if it is unknown.
+        """
+        with self._cond:
+            self._cond.wait_for(
+                lambda: job_id not in self._jobs
+                or self._jobs[job_id].status not in (JOB_QUEUED, JOB_RUNNING),
+                timeout,
+            )
+            return self._jobs.get(job_id)
+
+    def _wake(self) -> None:
+        # Called with the condition held
+        self._changed = True
+        self._cond.notify_all()
+
+    def _finish_job(self, job: DaemonJob, status: str, error: Optional[str] = None) -> None:
+        # Called with the condition held
+        job.status = status
+        job.error = error or job.error
+        job.finished_at = time.time()
+        self._cancelled.discard(job.id)
+        finished = [
+            other.id
+            for other in self._jobs.values()
+            if other.status not in (JOB_QUEUED, JOB_RUNNING)
+        ]
+        for old in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[old]
+        self._cond.notify_all()
+        logger.info(f"Job {job.id} {status}")
+
+    @contextmanager
+    def _guard(self, active: _ActiveJob) -> Iterator[None]:
+        """Fail only the given job if the block raises."""
+        try:
+            yield
+        except Exception as e:
+            logger.error(f"Job {active.job.id} failed: {str(e)}")
+            if active.error is None:
+                active.error = str(e)
+            # Like a cancellation, tracks not started are dropped
+            active.cancelled = True
+            active.tracks = None
+
+    def _fetch(self, track: _JobTrack) -> Optional[FetchedTrack]:
+        if track.active.cancelled:
+            self.downloader.metrics.fail(track, "cancelled")
+            return None
+        return self.downloader.fetch_track(track, track.active.run.playlist_dir)
+
+    def _open(self, job: DaemonJob) -> Tuple[PlaylistRun, Iterator[Track]]:
+        """Resolve the playlist of a job and start its run, on a resolver thread."""
+        if job.flat:
+            playlist, tracks = self.downloader.iter_playlist_tracks(job.url)
+        else:
+            playlist = self.downloader.get_playlist_info(job.url)
+            tracks = iter(playlist.tracks)
+            job.total = len(playlist.tracks)
+        job.playlist_title = playlist.title
+        run = self.downloader.open_run(
+            playlist,
+            self.output_dir,
+            should_zip=job.should_zip,
+            zip_compression=self.zip_compression,
+            resume=job.resume,
+            keep_tracks=False,
+        )
+        return run, tracks
+
+    def _opened(self, job: DaemonJob, future: Future) -> None:
+        with self._cond:
+            if self._resolving.pop(job.id, None) is not None:
+                self._resolved.append((job, future))
+                self._wake()
+                return
+        # The job was cancelled while its playlist was being resolved
+        if not future.cancelled() and future.exception() is None:
+            future.result()[0].close()
+
+    def _start_next(self) -> bool:
+        """Start resolving the queued job of highest priority, if it should start now."""
+        with self._cond:
+            if not self._queue or self._stopping:
+                return False
+            # Jobs that still have tracks to submit go first, unless outranked
+            busy = [active.job.priority for active in self._active if active.tracks is not None]
+            if busy and -self._queue[0][0] <= max(busy):
+                return False
+            # A slow playlist holds up one resolver, not the jobs queued behind it
+            if len(self._resolving) >= self.resolve_workers:
+                return False
+            job = self._jobs[heapq.heappop(self._queue)[2]]
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            self._resolving[job.id] = job
+        future = self._resolver.submit(self._open, job)
+        future.add_done_callback(lambda future: self._opened(job, future))
+        return True
+
+    def _activate(self, job: DaemonJob, future: Future) -> None:
+        # Called with the condition held
+        try:
+            run, tracks = future.result()
+        except Exception as e:
+            logger.error(f"Job {job.id} failed to resolve {job.url}: {str(e)}")
+            self._finish_job(job, JOB_FAILED, str(e))
+            return
+        active = _ActiveJob(job, run, tracks, RetryQueue(self.downloader.retry_policy))
+        self._active.append(active)
+        # Higher priorities first, then the order of submission
+        self._active.sort(key=lambda active: (-active.job.priority, active.job.created_at))
+
+    def _submit(self, pipeline: TrackPipeline, track: _JobTrack) -> None:
+        track.active.job.in_flight += 1
+        pipeline.submit(track)
+
+    def _collect(self, track: _JobTrack, filepath: Optional[Path]) -> None:
+        active = track.active
+        if filepath is None and not active.cancelled:
+            with self._guard(active):
+                if active.retries.defer(track, self.downloader.metrics.get(track)):
+                    return
+        self._record(active, track, filepath)
+
+    def _record(self, active: _ActiveJob, track: Track, filepath: Optional[Path]) -> None:
+        active.job.in_flight -= 1
+        if filepath:
+            active.job.completed += 1
+        else:
+            active.job.failed += 1
+        if active.error is None:
+            with self._guard(active):
+                active.run.record(track, filepath)
+
+    def _cancel_tracks(self, active: _ActiveJob) -> None:
+        # Tracks not submitted yet are left for a later run to resume
+        active.tracks = None
+        for track in active.retries.drain():
+            self.downloader.metrics.fail(track, "cancelled")
+            self._record(active, track, None)
+
+    def _finish_done(self) -> None:
+        for active in list(self._active):
+            if active.tracks is not None or active.job.in_flight:
+                continue
+            job = active.job
+            error = active.error
+            try:
+                active.run.close()
+                result = active.run.finish()
+            except Exception as e:
+                logger.error(f"Job {job.id} failed to finish: {str(e)}")
+                result, error = None, error or str(e)
+            job.result = str(result) if result else None
+            if error:
+                status = JOB_FAILED
+            elif active.cancelled:
+                status = JOB_CANCELLED
+            elif active.run.failed and not active.run.downloaded:
+                status = JOB_FAILED
+            else:
+                status = JOB_COMPLETED
+            with self._cond:
+                self._active.remove(active)
+                self._finish_job(job, status, error)
+
+    def _step(self, pipeline: TrackPipeline, window: int) -> bool:
+        """Run one round of scheduling, returning False once the daemon has stopped."""
+        with self._cond:
+            self._changed = False
+            stopping = self._stopping
+            for job, future in self._resolved:
+                self._activate(job, future)
+            self._resolved.clear()
+            if stopping:
+                for _, _, job_id in self._queue:
+                    self._finish_job(self._jobs[job_id], JOB_CANCELLED)
+                self._queue.clear()
+                for job in self._resolving.values():
+                    self._finish_job(job, JOB_CANCELLED)
+                self._resolving.clear()
+            for active in self._active:
+                if stopping or active.job.id in self._cancelled:
+                    active.cancelled = True
+                    self._cancelled.discard(active.job.id)
+            active_jobs = list(self._active)
+
+        for active in active_jobs:
+            if active.cancelled:
+                self._cancel_tracks(active)
+            with self._guard(active):
+                for track in active.retries.due():
+                    pipeline.submit(track)
+        # Jobs outranking the running ones start right away
+        while self._start_next():
+            pass
+        while pipeline.pending < window:
+            active = next((a for a in self._active if a.tracks is not None), None)
+            if active is None:
+                # Start the next job while the last tracks are in flight
+                if not self._start_next():
+                    break
+                continue
+            with self._guard(active):
+                track = active.next_track()
+                if track is not None:
+                    self._submit(pipeline, track)
+        self._finish_done()
+
+        if pipeline.pending:
+            try:
+                self._collect(*pipeline.result(timeout=1.0))
+            except queue.Empty:
+                pass
+            return True
+        with self._cond:
+            if stopping and not self._active:
+                return False
+            # Nothing in flight: wait for a job, a resolved playlist, a cancellation or a retry
+            retries = [a.retries.wait_time() for a in self._active if len(a.retries)]
+            self._cond.wait_for(lambda: self._changed, min(retries) if retries else None)
+        return True
+
+    def _schedule(self) -> None:
+        with TrackPipeline(
+            fetch=self._fetch,
+            transcode=self.downloader.transcode_track,
+            fetch_workers=self.downloader._fetch_workers(self.max_workers),
+            transcode_workers=self.transcode_workers,
+        ) as pipeline:
+            window = 2 * pipeline.fetch_workers + pipeline.transcode_workers
+            while True:
+                try:
+                    if not self._step(pipeline, window):
+                        return
+                except Exception as e:
+                    # Errors of a single job are caught by its guard; keep serving the others
+                    logger.error(f"Download daemon scheduler error: {str(e)}")
+                    time.sleep(0.1)
+
+    def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_DAEMON_PORT,
+        socket_path: Optional[Path] = None,
+    ) -> None:
+        """
+        Serve the job API until interrupted (Ctrl+C or SIGTERM), then stop the daemon.
+
+        Args:
+            host (str): Address to listen on. Defaults to localhost only.
+            port (int): TCP port to listen on. Defaults to 8765.
+            socket_path (Optional[Path]): Listen on this Unix socket instead of TCP.
+        """
+        server = make_server(self, host, port, socket_path)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(
+                signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start()
+            )
+        logger.info(f"Job API listening on {socket_path or f'http://{host}:{port}'}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if socket_path:
+                Path(socket_path).unlink(missing_ok=True)
+            self.stop()
+
+
+_JOB_PATH_RE = re.compile(r"^/jobs/([0-9a-f]+)$")
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    daemon: DownloadDaemon
+
+    def log_message(self, format, *args):
+        logger.debug(f"API: {self.requestline}")
+
+    def _send(self, status: int, body: Union[Dict[str, Any], List[Any]]) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, {"error": message})
+
+    def do_GET(self):
+        if self.path == "/health":
+            counts: Dict[str, int] = {}
+            for job in self.daemon.jobs():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            self._send(200, {"status": "ok", "jobs": counts})
+        elif self.path == "/jobs":
+            self._send(200, {"jobs": [job.to_dict() for job in self.daemon.jobs()]})
+        elif match := _JOB_PATH_RE.match(self.path):
+            job = self.daemon.get(match.group(1))
+            if job is None:
+                self._error(404, "unknown job")
+            else:
+                self._send(200, job.to_dict())
+        else:
+            self._error(404, "not found")
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            self._error(404, "not found")
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+            url = body["url"]
+            priority = int(body.get("priority", 0))
+        except (ValueError, KeyError, TypeError):
+            self._error(400, 'expected a JSON object with a "url"')
+            return
+        if not isinstance(url, str) or not validate_url(url):
+            self._error(400, "invalid url")
+            return
+        try:
+            job = self.daemon.submit(
+                url,
+                priority=priority,
+                should_zip=bool(body.get("zip", False)),
+                flat=bool(body.get("flat", False)),
+                resume=not body.get("force", False),
+            )
+        except RuntimeError as e:
+            self._error(503, str(e))
+            return
+        self._send(201, job.to_dict())
+
+    def do_DELETE(self):
+        match = _JOB_PATH_RE.match(self.path)
+        job = self.daemon.cancel(match.group(1)) if match else None
+        if job is None:
+            self._error(404, "unknown job")
+        else:
+            self._send(200, job.to_dict())
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # BaseHTTPRequestHandler expects a (host, port) client address
+        return request, ("local", 0)
+
+
+def make_server(
+    daemon: DownloadDaemon,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_DAEMON_PORT,
+    socket_path: Optional[Path] = None,
+) -> socketserver.BaseServer:
+    """
+    Create the job API server of a daemon; call ``serve_forever`` to run it.
+
+    Endpoints, all exchanging JSON:
+
+    - ``POST /jobs`` with ``{"url": ..., "priority": 0, "zip": false, "flat": false,
+      "force": false}`` queues a playlist and returns the job (201).
+    - ``GET /jobs`` lists every job, ``GET /jobs/<id>`` returns a job's status and progress.
+    - ``DELETE /jobs/<id>`` cancels a job.
+    - ``GET /health`` returns the number of jobs by status.
+
+    Args:
+        daemon (DownloadDaemon): The daemon.
+        host (str): Address to listen on. Defaults to localhost only.
+        port (int): TCP port to listen on, 0 for a free port. Defaults to 8765.
+        socket_path (Optional[Path]): Listen on this Unix socket instead of TCP.
+
+    Returns:
+        socketserver.BaseServer: The server, not started yet.
+    """
+    handler = type("APIHandler", (_APIHandler,), {"daemon": daemon})
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        return _UnixHTTPServer(str(socket_path), handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
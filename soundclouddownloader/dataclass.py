@@ -1,17 +1,32 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 
-@dataclass
+# Slotted, since very large playlists hold many tracks
+@dataclass(slots=True)
 class Track:
     id: str
     title: str
     artist: str
     url: str
+    # Info dict already resolved by yt-dlp, reused to drive the download
+    info: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+    # The run downloading the track, which keeps its metrics apart from other runs'
+    run: Optional[str] = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Playlist:
     id: str
     title: str
     tracks: List[Track]
+
+
+@dataclass(slots=True)
+class FetchedTrack:
+    track: Track
+    info: Dict[str, Any] = field(repr=False)
+    path: Path
+    # The path already is the final output (e.g. materialised from the track store)
+    final: bool = False
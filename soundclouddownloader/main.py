@@ -1,15 +1,49 @@
-import os, sys, re, logging, time, random, shutil
-from soundclouddownloader.utils import validate_url, clean_filename, create_zip
-from soundclouddownloader.dataclass import Track, Playlist
+import os, sys, re, socket, threading, time, logging, warnings
+from dataclasses import replace
+from soundclouddownloader.utils import validate_url, clean_filename, link_file, setup_logging
+from soundclouddownloader.dataclass import Track, Playlist, FetchedTrack
+from soundclouddownloader.ratelimit import RateLimiter, is_throttled
+from soundclouddownloader.concurrency import ConcurrencyController, is_timeout
+from soundclouddownloader.bandwidth import BandwidthLimiter
+from soundclouddownloader.pipeline import TrackPipeline
+from soundclouddownloader.run import PlaylistRun
+from soundclouddownloader.sessions import YoutubeDLSessionPool
+from soundclouddownloader.store import TrackStore, store_key
+from soundclouddownloader.cache import PlaylistCache
+from soundclouddownloader.connections import ConnectionBudget, connections_for
+from soundclouddownloader.workqueue import WorkQueue, Job
+from soundclouddownloader.proxies import ProxyPool
+from soundclouddownloader.renditions import Rendition, encode_renditions, parse_renditions
+from soundclouddownloader.retry import (
+    RetryPolicy,
+    RetryQueue,
+    classify_error,
+    FAILURE_GEO_RESTRICTED,
+    FAILURE_PERMANENT,
+    RETRYABLE_FAILURES,
+)
+from soundclouddownloader.metrics import (
+    MetricsRecorder,
+    ProgressCallback,
+    RunReport,
+    STAGE_WAIT,
+    STAGE_EXTRACT,
+    STAGE_FETCH,
+    STAGE_TRANSCODE,
+    STAGE_RESOLVE,
+)
+from soundclouddownloader.policy import (
+    POLICY_TRANSCODE,
+    PATH_NATIVE,
+    PATH_TRANSCODE,
+    validate_policy,
+    format_selector,
+    plan_output,
+    postprocessors_for,
+)
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import yt_dlp
 from loguru import logger
-from typing import List, Optional, Dict, Any
-
-logger.remove()
-logger.add(sys.stderr, level="INFO")
-logger.add("soundcloud_downloader.log", rotation="10 MB", level="INFO")
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple, Union
 
 
 class SoundCloudDownloader:
@@ -20,22 +54,88 @@ class SoundCloudDownloader:
     from SoundCloud, using yt-dlp as the backend.
     """
 
-    def __init__(self, proxy: Optional[str] = None):
+    def __init__(
+        self,
+        proxy: Optional[str] = None,
+        requests_per_second: float = 1.0,
+        burst: int = 3,
+        output_policy: str = POLICY_TRANSCODE,
+        codec: str = "mp3",
+        quality: str = "192",
+        store: Optional[TrackStore] = None,
+        playlist_cache: Optional[PlaylistCache] = None,
+        progress_callback: Optional[ProgressCallback] = None,
+        report_dir: Optional[Path] = None,
+        fragment_connections: int = 4,
+        connection_budget: int = 8,
+        concurrency: Optional[ConcurrencyController] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        proxies: Optional[ProxyPool] = None,
+        max_bandwidth: Optional[int] = None,
+        renditions: Optional[Sequence[Union[str, Rendition]]] = None,
+    ):
         """
         Initialize the SoundCloudDownloader with default yt-dlp options.
 
         Args:
             proxy (Optional[str]): Proxy URL to use for downloads (e.g., 'http://proxy.example.com:8080')
+            requests_per_second (float): Request budget shared by all download workers. Defaults to 1.0.
+            burst (int): Number of requests that may be issued back to back. Defaults to 3.
+            output_policy (str): How downloaded audio is turned into the output file, one of
+                ``OUTPUT_POLICIES``. ``"transcode"`` converts every track to ``codec``;
+                ``"transcode-if-different"`` prefers source formats already in ``codec``
+                and only converts the rest; ``"remux"`` never re-encodes; ``"native"``
+                keeps the file as served. Defaults to ``"transcode"``.
+            codec (str): Target codec of the transcoding policies. Defaults to "mp3".
+            quality (str): Target quality of the transcoding policies. Defaults to "192".
+            store (Optional[TrackStore]): Local store of finished tracks. Tracks found in
+                it are linked into place instead of being downloaded, and every newly
+                finished track is added to it. Defaults to None (no store).
+            playlist_cache (Optional[PlaylistCache]): Cache of resolved playlists used by
+                :meth:`get_playlist_info`. Defaults to None (always resolve).
+            progress_callback (Optional[ProgressCallback]): Called with a track's
+                :class:`TrackMetrics` and the event name whenever one of its stages
+                ends and when it completes or fails. Defaults to None.
+            report_dir (Optional[Path]): Directory receiving a JSON report and a
+                Prometheus text file at the end of every playlist run. Defaults to
+                None (no report files).
+            fragment_connections (int): Connections a single long HLS track may be
+                fetched over, so that one long mix does not set the duration of the
+                whole playlist. Defaults to 4; 1 disables fragment-level parallelism.
+            connection_budget (int): Extra connections shared by all long tracks on
+                top of the one connection of every download worker. Defaults to 8.
+            concurrency (Optional[ConcurrencyController]): Adapts the number of
+                downloads in flight to throughput and throttling. The ``max_workers``
+                of the download methods are then ignored in favour of the
+                controller's maximum. Defaults to None (fixed ``max_workers``).
+            retry_policy (Optional[RetryPolicy]): How often tracks that failed with a
+                transient error or throttling are retried within a playlist run.
+                Defaults to ``RetryPolicy()``.
+            proxies (Optional[ProxyPool]): Proxies that track downloads are spread
+                across, each with its own request budget. Without an adaptive
+                ``concurrency``, the pool's capacity sets the number of downloads
+                in flight. Playlist resolution still uses ``proxy``. Defaults to None.
+            max_bandwidth (Optional[int]): Bytes per second shared fairly by all
+                downloads in flight. It can be changed while downloading through
+                ``downloader.bandwidth.limit``. Defaults to None (unlimited).
+            renditions (Optional[Sequence[Union[str, Rendition]]]): Output formats such
+                as ``["mp3@192", "opus@128"]``, all produced from a single download and
+                a single decode of every track. Each rendition is saved in a directory
+                of its own inside the playlist directory, e.g. ``mp3-192/<title>.mp3``,
+                and ``output_policy``, ``codec`` and ``quality`` are ignored. Tracks are
+                reported by the path of the first rendition. Cannot be combined with
+                a track store or zipping. Defaults to None (a single output file).
         """
+        self.renditions = parse_renditions(renditions) if renditions else []
+        if self.renditions and store:
+            raise ValueError("A track store cannot be combined with several renditions")
+        self.rate_limiter = RateLimiter(rate=requests_per_second, burst=burst)
+        self.output_policy = validate_policy(output_policy)
+        self.codec = codec
+        self.quality = quality
         self.ydl_opts = {
-            "format": "bestaudio/best",
-            "postprocessors": [
-                {
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }
-            ],
+            "format": format_selector(output_policy, codec),
+            "postprocessors": postprocessors_for(PATH_TRANSCODE, None, codec, quality),
             "outtmpl": "%(title)s",
             "quiet": True,
             "no_warnings": True,
@@ -43,11 +143,32 @@ class SoundCloudDownloader:
         if proxy:
             self.ydl_opts["proxy"] = proxy
             logger.info(f"Using proxy: {proxy}")
+        self.sessions = YoutubeDLSessionPool()
+        self.store = store
+        self.playlist_cache = playlist_cache
+        # Tracks are only interchangeable if they were produced the same way
+        self.output_format = f"{output_policy}-{codec}-{quality}"
+        self.metrics = MetricsRecorder(progress_callback)
+        self.report_dir = Path(report_dir) if report_dir else None
+        self.last_report: Optional[RunReport] = None
+        self.fragment_connections = fragment_connections
+        self.connections = ConnectionBudget(connection_budget)
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.proxies = proxies
+        self.bandwidth = BandwidthLimiter(max_bandwidth)
+
+    def close(self) -> None:
+        """Close the yt-dlp sessions this downloader keeps open between tracks."""
+        self.sessions.close()
 
     def download_track(self, track: Track, output_dir: Path) -> Optional[Path]:
         """
         Download a single track from SoundCloud.
 
+        This runs both pipeline stages, :meth:`fetch_track` and
+        :meth:`transcode_track`, one after the other on the calling thread.
+
         Args:
             track (Track): The Track object to download.
             output_dir (Path): The directory to save the downloaded track.
@@ -55,63 +176,292 @@ class SoundCloudDownloader:
         Returns:
             Optional[Path]: The path to the downloaded file, or None if download failed.
         """
+        filepath = None
         try:
-            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
-                info = ydl.extract_info(track.url, download=False)
-                filename = ydl.prepare_filename(info)
+            fetched = self.fetch_track(track, output_dir)
+            if fetched is not None:
+                filepath = self.transcode_track(fetched)
+            return filepath
+        finally:
+            # Outside of a run, nothing else collects the track's metrics
+            self.metrics.finish(track, filepath)
+
+    def fetch_track(self, track: Track, output_dir: Path) -> Optional[FetchedTrack]:
+        """
+        Download the raw audio of a track without post-processing it.
+
+        Args:
+            track (Track): The Track object to download.
+            output_dir (Path): The directory to save the downloaded track.
+
+        Returns:
+            Optional[FetchedTrack]: The fetched track, or None if the download failed.
+
+        Notes:
+            The track is resolved at most once. If ``track.info`` already holds
+            the info dict from :meth:`get_playlist_info` it drives the download
+            directly; otherwise the info dict from a single ``extract_info``
+            call is reused. Should a cached info dict have gone stale (e.g. an
+            expired stream URL), the track is re-extracted once as a fallback.
+
+            With a track store, a track already stored in the downloader's
+            output format is linked into ``output_dir`` without any request.
+        """
+        # Imported on first use, it accounts for most of the package's import time
+        import yt_dlp
+
+        if self.store:
+            key = store_key(track.id, self.output_format)
+            try:
+                with self.metrics.stage(track, STAGE_RESOLVE):
+                    stored = self.store.materialise(key, output_dir)
+            except OSError as e:
+                logger.warning(f"Failed to use stored copy of '{track.title}': {str(e)}")
+                stored = None
+            if stored:
+                logger.debug(f"Using stored copy of '{track.title}': {stored}")
+                return FetchedTrack(track=track, info={}, path=stored, final=True)
+
+        fetch_opts = dict(
+            self.ydl_opts, postprocessors=[], progress_hooks=[self.bandwidth.progress_hook]
+        )
+        session_name = "fetch"
+        rate_limiter = self.rate_limiter
+        if self.concurrency:
+            self.concurrency.acquire()
+        try:
+            proxy = self.proxies.acquire() if self.proxies else None
+        except BaseException:
+            # The slot is released below only once a proxy was taken
+            if self.concurrency:
+                self.concurrency.release()
+            raise
+        if proxy:
+            # yt-dlp binds the proxy to a session when it is created
+            fetch_opts["proxy"] = proxy.url
+            session_name = f"fetch-{proxy.url}"
+            rate_limiter = proxy.rate_limiter
+        started = time.perf_counter()
+        failure = None
+        try:
+            with self.sessions.session(session_name, fetch_opts) as ydl:
+                info = track.info
+                if info is None:
+                    self._acquire(track, rate_limiter)
+                    with self.metrics.stage(track, STAGE_EXTRACT):
+                        info = ydl.extract_info(track.url, download=False)
+                filename = ydl.prepare_filename(info, outtmpl=self.ydl_opts["outtmpl"])
                 clean_name = clean_filename(filename)
                 filepath_without_ext = Path(output_dir) / clean_name
 
-                ydl_opts = dict(self.ydl_opts)
-                ydl_opts["outtmpl"] = str(filepath_without_ext)
-
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([track.url])
-
-                time.sleep(0.5)  # Small delay to ensure file system update
-                if filepath_without_ext.with_suffix(".mp3").exists():
-                    filepath = filepath_without_ext.with_suffix(".mp3")
-                elif filepath_without_ext.exists():
-                    filepath = filepath_without_ext
-                else:
-                    filepath = None
-
-                if not filepath:
-                    dir_contents = list(Path(output_dir).iterdir())
-
-                    # Try to find a file with a similar name
-                    similar_files = [
-                        f for f in dir_contents if f.stem.startswith(clean_name)
-                    ]
-                    if similar_files:
-                        filepath = similar_files[0]
-                    if not filepath:
-                        logger.info(
-                            f"File not found after download: {filepath_without_ext}"
-                        )
+                # The session is confined to this thread, so its output
+                # template can be pointed at this track's destination.
+                ydl.params["outtmpl"]["default"] = (
+                    str(filepath_without_ext).replace("%", "%%") + ".%(ext)s"
+                )
+
+                wanted = connections_for(info, self.fragment_connections)
+                with self.connections.lease(wanted - 1) as extra:
+                    if extra:
                         logger.debug(
-                            f"Directory contents: {[str(f) for f in dir_contents]}"
+                            f"Fetching '{track.title}' over {1 + extra} connections"
                         )
-                        return None
+                    ydl.params["concurrent_fragment_downloads"] = 1 + extra
+
+                    self._acquire(track, rate_limiter)
+                    try:
+                        with self.metrics.stage(track, STAGE_FETCH):
+                            info = ydl.process_ie_result(info, download=True)
+                    except yt_dlp.utils.DownloadError:
+                        if track.info is None:
+                            raise
+                        logger.debug(f"Cached info for '{track.title}' is stale, re-extracting")
+                        self._acquire(track, rate_limiter)
+                        with self.metrics.stage(track, STAGE_FETCH) as metrics:
+                            # Not a retry: it must not use up the track's retries
+                            metrics.reextracts += 1
+                            info = ydl.extract_info(track.url, download=True)
+            rate_limiter.succeeded()
 
-                logger.info(f"Successfully downloaded: {filepath}")
-                return filepath
+            with self.metrics.stage(track, STAGE_RESOLVE) as metrics:
+                filepath = Path(info["requested_downloads"][-1]["filepath"])
+                if not filepath.exists():
+                    logger.info(f"File not found after download: {filepath}")
+                    failure = FAILURE_PERMANENT
+                    self.metrics.fail(track, "file not found after download", failure)
+                    self._record_outcome(False)
+                    return None
+                size = filepath.stat().st_size
+                metrics.bytes_downloaded += size
+            self._record_outcome(True, size)
+            return FetchedTrack(track=track, info=info, path=filepath)
         except yt_dlp.utils.GeoRestrictedError:
             logger.warning(f"Skipping geo-restricted track: {track.title} ({track.url})")
+            failure = FAILURE_GEO_RESTRICTED
+            self.metrics.fail(track, "geo-restricted", failure)
             return None
         except Exception as e:
+            throttled = is_throttled(e)
+            # A throttled proxy is drained, the other proxies carry on
+            if throttled and not proxy:
+                self.rate_limiter.throttled()
             logger.error(f"Failed to download track '{track.title}': {str(e)}")
+            failure = classify_error(e)
+            self.metrics.fail(track, str(e), failure)
+            self._record_outcome(False, congested=throttled or is_timeout(e))
+            return None
+        finally:
+            if proxy:
+                self.proxies.release(proxy, time.perf_counter() - started, failure)
+            if self.concurrency:
+                self.concurrency.release()
+
+    def transcode_track(self, fetched: FetchedTrack) -> Optional[Path]:
+        """
+        Run the audio post-processors on a fetched track.
+
+        This stage is CPU-bound and makes no requests to SoundCloud. The
+        cheapest processing path allowed by the output policy is chosen per
+        track (see :func:`plan_output`) and logged with the result. The final
+        path is the one yt-dlp's post-processors report, so no polling or
+        directory scan is needed.
+
+        Args:
+            fetched (FetchedTrack): The output of :meth:`fetch_track`.
+
+        Returns:
+            Optional[Path]: The path to the final file, or None if post-processing failed.
+        """
+        track = fetched.track
+        if fetched.final:
+            logger.info(f"Successfully downloaded (stored): {fetched.path}")
+            return fetched.path
+        if self.renditions:
+            return self._encode_renditions(fetched)
+        source_ext = fetched.path.suffix[1:]
+        path = plan_output(self.output_policy, source_ext, self.codec)
+        try:
+            filepath = fetched.path
+            ydl_opts = dict(self.ydl_opts)
+            ydl_opts["postprocessors"] = postprocessors_for(
+                path, source_ext, self.codec, self.quality
+            )
+            if ydl_opts["postprocessors"]:
+                # Sessions keep the post-processors they were created with, and
+                # remuxing maps each source codec to a post-processor of its own
+                codec = ydl_opts["postprocessors"][0]["preferredcodec"]
+                with self.sessions.session(f"transcode-{path}-{codec}", ydl_opts) as ydl:
+                    with self.metrics.stage(track, STAGE_TRANSCODE):
+                        # yt-dlp reports where the post-processors left the file
+                        info = ydl.post_process(str(fetched.path), fetched.info)
+                filepath = Path(info["filepath"])
+
+            with self.metrics.stage(track, STAGE_RESOLVE):
+                found = filepath.exists()
+            if not found:
+                logger.info(f"File not found after download: {filepath}")
+                self.metrics.fail(track, "file not found after conversion", FAILURE_PERMANENT)
+                return None
+
+            logger.info(f"Successfully downloaded ({path}): {filepath}")
+            if self.store:
+                self._store_track(track, filepath)
+            return filepath
+        except Exception as e:
+            logger.error(f"Failed to convert track '{track.title}': {str(e)}")
+            self.metrics.fail(track, str(e), FAILURE_PERMANENT)
             return None
 
+    def _encode_renditions(self, fetched: FetchedTrack) -> Optional[Path]:
+        track = fetched.track
+        # Renditions sit in directories of their own next to the downloaded file
+        outputs = {
+            rendition: rendition.output_path(fetched.path.parent, fetched.path.stem)
+            for rendition in self.renditions
+        }
+        try:
+            with self.metrics.stage(track, STAGE_TRANSCODE):
+                encode_renditions(fetched.path, outputs)
+            fetched.path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.error(f"Failed to convert track '{track.title}': {str(e)}")
+            self.metrics.fail(track, str(e), FAILURE_PERMANENT)
+            return None
+        filepath = outputs[self.renditions[0]]
+        names = ", ".join(rendition.name for rendition in self.renditions)
+        logger.info(f"Successfully downloaded ({names}): {filepath}")
+        return filepath
+
+    def _record_outcome(self, succeeded: bool, nbytes: int = 0, congested: bool = False) -> None:
+        if self.concurrency:
+            self.concurrency.record(succeeded, nbytes, congested)
+
+    def _fetch_workers(self, max_workers: int) -> int:
+        # With a controller the pool only bounds the threads, the controller the downloads
+        if self.concurrency:
+            return self.concurrency.maximum
+        return self.proxies.capacity if self.proxies else max_workers
+
+    def _acquire(self, track: Track, rate_limiter: Optional[RateLimiter] = None) -> None:
+        # Time spent waiting for the rate limiter is part of the track's wall time
+        rate_limiter = rate_limiter or self.rate_limiter
+        self.metrics.add(track, STAGE_WAIT, rate_limiter.acquire())
+
+    def _store_track(self, track: Track, filepath: Path) -> None:
+        try:
+            self.store.put(store_key(track.id, self.output_format), filepath)
+        except OSError as e:
+            # The track itself is fine, only later runs lose the shortcut
+            logger.warning(f"Failed to add '{track.title}' to the track store: {str(e)}")
+
     def get_playlist_info(self, playlist_url: str) -> Playlist:
         """
         Extract playlist information from SoundCloud.
 
+        With a playlist cache, a playlist resolved within the cache's TTL is
+        returned without any request. An older entry is revalidated with a flat
+        enumeration of the playlist, which costs a single request, and the
+        playlist is only resolved again if its tracks changed.
+
         Args:
             playlist_url (str): The URL of the playlist.
 
         Returns:
             Playlist: A Playlist object containing the playlist information.
+        """
+        cache = self.playlist_cache
+        if cache is None:
+            return self._resolve_playlist(playlist_url)[0]
+
+        if cache.is_fresh(playlist_url):
+            playlist = cache.get(playlist_url)
+            logger.info(f"Using cached playlist '{playlist.title}'")
+            return playlist
+        if cache.get(playlist_url) is not None:
+            try:
+                _, tracks = self.iter_playlist_tracks(playlist_url)
+                playlist = cache.revalidate(playlist_url, [track.id for track in tracks])
+            except Exception as e:
+                logger.debug(f"Failed to revalidate cached playlist: {str(e)}")
+                playlist = None
+            if playlist is not None:
+                logger.info(f"Playlist '{playlist.title}' is unchanged, using cached tracks")
+                return playlist
+
+        playlist, listed = self._resolve_playlist(playlist_url)
+        cache.put(playlist_url, playlist, listed)
+        return playlist
+
+    def _resolve_playlist(self, playlist_url: str) -> Tuple[Playlist, int]:
+        """
+        Resolve a playlist and all of its tracks.
+
+        Args:
+            playlist_url (str): The URL of the playlist.
+
+        Returns:
+            Tuple[Playlist, int]: The playlist, and the number of tracks it lists
+            including those that could not be extracted.
 
         Notes:
             Uses yt-dlp's ``ignoreerrors=True`` so a single track that yt-dlp
@@ -123,7 +473,8 @@ class SoundCloudDownloader:
         playlist_opts = dict(self.ydl_opts)
         playlist_opts["ignoreerrors"] = True
 
-        with yt_dlp.YoutubeDL(playlist_opts) as ydl:
+        self.rate_limiter.acquire()
+        with self.sessions.session("playlist", playlist_opts) as ydl:
             playlist_info = ydl.extract_info(playlist_url, download=False)
             entries = playlist_info.get("entries") or []
             tracks: List[Track] = []
@@ -136,8 +487,9 @@ class SoundCloudDownloader:
                     Track(
                         id=entry["id"],
                         title=entry["title"],
-                        artist=entry["uploader"],
+                        artist=entry.get("uploader") or "",
                         url=entry["webpage_url"],
+                        info=entry,
                     )
                 )
             if skipped:
@@ -148,18 +500,82 @@ class SoundCloudDownloader:
                     "(DRM-protected or newly-formatted tracks). "
                     f"Continuing with {len(tracks)} extractable track(s)."
                 )
-            return Playlist(
+            playlist = Playlist(
                 id=playlist_info["id"], title=playlist_info["title"], tracks=tracks
             )
+            return playlist, len(tracks) + skipped
+
+    def iter_playlist_tracks(self, playlist_url: str) -> Tuple[Playlist, Iterator[Track]]:
+        """
+        Enumerate a playlist flat, without resolving its tracks.
+
+        Only the playlist itself is fetched up front; entries are yielded as
+        yt-dlp discovers them (paged collections such as likes are fetched
+        page by page while the iterator is consumed). The yielded tracks carry
+        no info dict, so :meth:`download_track` resolves each one lazily.
+
+        Args:
+            playlist_url (str): The URL of the playlist.
+
+        Returns:
+            Tuple[Playlist, Iterator[Track]]: The playlist header (with an empty
+            ``tracks`` list) and a lazy iterator over its tracks.
+        """
+        import yt_dlp
+
+        self.rate_limiter.acquire()
+        # The iterator may be consumed after this call returns, so it gets an
+        # instance of its own rather than a pooled, thread-confined one.
+        ydl = yt_dlp.YoutubeDL(dict(self.ydl_opts))
+        try:
+            playlist_info = ydl.extract_info(playlist_url, download=False, process=False)
+            while playlist_info.get("_type") in ("url", "url_transparent"):
+                playlist_info = ydl.extract_info(
+                    playlist_info["url"],
+                    download=False,
+                    ie_key=playlist_info.get("ie_key"),
+                    process=False,
+                )
+        except Exception:
+            ydl.close()
+            raise
+
+        def tracks() -> Iterator[Track]:
+            try:
+                for entry in playlist_info.get("entries") or []:
+                    if not entry or not entry.get("url"):
+                        continue
+                    yield Track(
+                        id=str(entry.get("id") or entry["url"]),
+                        title=entry.get("title") or entry["url"],
+                        artist=entry.get("uploader") or "",
+                        url=entry["url"],
+                    )
+            except Exception as e:
+                logger.error(f"Playlist enumeration stopped early: {str(e)}")
+            finally:
+                ydl.close()
+
+        playlist = Playlist(
+            id=str(playlist_info.get("id") or playlist_url),
+            title=playlist_info.get("title") or str(playlist_info.get("id")),
+            tracks=[],
+        )
+        return playlist, tracks()
 
     def download_playlist(
         self,
         playlist_url: str,
         output_dir: Path,
         max_workers: int = 5,
-        min_delay: int = 3,
-        max_delay: int = 10,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
         should_zip: bool = False,
+        *,
+        flat: bool = False,
+        resume: bool = True,
+        transcode_workers: Optional[int] = None,
+        zip_compression: str = "stored",
     ) -> Optional[Path]:
         """
         Download an entire playlist from SoundCloud.
@@ -168,62 +584,497 @@ class SoundCloudDownloader:
             playlist_url (str): The URL of the playlist to download.
             output_dir (Path): The directory to save the downloaded tracks.
             max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 5.
-            min_delay (int, optional): Minimum delay between downloads in seconds. Defaults to 3.
-            max_delay (int, optional): Maximum delay between downloads in seconds. Defaults to 10.
-            should_zip (bool, optional): Whether to zip the downloaded files. Defaults to False.
+                Request pacing is governed by the downloader's shared rate limiter,
+                not by the number of workers.
+            min_delay (Optional[float], optional): Deprecated and ignored, requests are
+                paced by the downloader's ``requests_per_second`` and ``burst``.
+            max_delay (Optional[float], optional): Deprecated and ignored, like ``min_delay``.
+            should_zip (bool, optional): Whether to zip the downloaded files. Tracks are
+                streamed into the archive as they finish and removed from disk once
+                archived. Defaults to False.
+            flat (bool, optional): Enumerate the playlist flat and start downloading
+                tracks as they are discovered, resolving each one in its worker.
+                Defaults to False.
+            resume (bool, optional): Skip tracks that the download manifest in
+                ``output_dir`` records as completed by a previous run. Combined with
+                ``flat`` only newly added tracks are resolved at all. Defaults to True.
+            transcode_workers (Optional[int], optional): Number of concurrent FFmpeg
+                transcodes, run in a pool separate from the ``max_workers`` downloads.
+                Defaults to the number of CPU cores.
+            zip_compression (str, optional): Compression of the zip archive, one of
+                ``ZIP_COMPRESSIONS``. Defaults to "stored" since audio does not compress.
 
         Returns:
             Optional[Path]: The path to the zipped playlist or playlist directory, or None if download failed.
         """
+        if min_delay is not None or max_delay is not None:
+            warnings.warn(
+                "min_delay and max_delay are ignored, pace requests with the "
+                "downloader's requests_per_second and burst instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        run, tracks = self._open_playlist(
+            playlist_url,
+            output_dir,
+            should_zip=should_zip,
+            flat=flat,
+            resume=resume,
+            zip_compression=zip_compression,
+        )
+        try:
+            for _ in self._download_tracks(run, tracks, max_workers, transcode_workers):
+                pass
+        finally:
+            run.close()
+            # Sessions of the pipeline's worker threads end with the run
+            self.sessions.prune()
+
+        return run.finish()
+
+    def iter_download_playlist(
+        self,
+        playlist_url: str,
+        output_dir: Path,
+        max_workers: int = 5,
+        should_zip: bool = False,
+        flat: bool = True,
+        resume: bool = True,
+        transcode_workers: Optional[int] = None,
+        zip_compression: str = "stored",
+        window: Optional[int] = None,
+    ) -> Iterator[Tuple[Track, Optional[Path]]]:
+        """
+        Download a playlist, yielding the outcome of every track as it finishes.
+
+        Unlike :meth:`download_playlist`, tracks are only submitted while fewer
+        than ``window`` are in flight and the run keeps totals instead of every
+        track's metrics, so memory use stays flat however large the playlist is.
+        The run is finished (report written, archive finalized) when the
+        iterator is exhausted or closed; its result is then available as
+        ``last_report.result``.
+
+        Args:
+            playlist_url (str): The URL of the playlist to download.
+            output_dir (Path): The directory to save the downloaded tracks.
+            max_workers (int, optional): Maximum number of concurrent downloads. Defaults to 5.
+            should_zip (bool, optional): Whether to zip the downloaded files. Defaults to False.
+            flat (bool, optional): Enumerate the playlist flat, so that tracks are only
+                resolved as they are submitted. Defaults to True.
+            resume (bool, optional): Skip tracks completed by a previous run. Defaults to True.
+            transcode_workers (Optional[int], optional): Number of concurrent FFmpeg
+                transcodes. Defaults to the number of CPU cores.
+            zip_compression (str, optional): Compression of the zip archive. Defaults to "stored".
+            window (Optional[int], optional): Maximum number of tracks in flight.
+                Defaults to twice ``max_workers`` plus the transcode workers.
+
+        Yields:
+            Tuple[Track, Optional[Path]]: Every downloaded track and its final path,
+            or None if it failed. Tracks completed by a previous run are not yielded.
+        """
+        run, tracks = self._open_playlist(
+            playlist_url,
+            output_dir,
+            should_zip=should_zip,
+            flat=flat,
+            resume=resume,
+            zip_compression=zip_compression,
+            keep_tracks=False,
+        )
+        try:
+            yield from self._download_tracks(run, tracks, max_workers, transcode_workers, window)
+        finally:
+            run.close()
+            self.sessions.prune()
+            run.finish()
+
+    def _open_playlist(
+        self,
+        playlist_url: str,
+        output_dir: Path,
+        should_zip: bool,
+        flat: bool,
+        resume: bool,
+        zip_compression: str,
+        keep_tracks: bool = True,
+    ) -> Tuple[PlaylistRun, Iterator[Track]]:
         output_dir = Path(output_dir).resolve()
         output_dir.mkdir(parents=True, exist_ok=True)
 
         logger.debug(f"Downloading to directory: {output_dir}")
 
+        started = time.perf_counter()
+        if flat:
+            playlist, tracks = self.iter_playlist_tracks(playlist_url)
+        else:
+            playlist = self.get_playlist_info(playlist_url)
+            tracks = iter(playlist.tracks)
+        run = self.open_run(
+            playlist,
+            output_dir,
+            should_zip=should_zip,
+            zip_compression=zip_compression,
+            resume=resume,
+            keep_tracks=keep_tracks,
+        )
+        run.report.stages[STAGE_EXTRACT] = time.perf_counter() - started
+        return run, tracks
+
+    def _download_tracks(
+        self,
+        run: PlaylistRun,
+        tracks: Iterator[Track],
+        max_workers: int,
+        transcode_workers: Optional[int],
+        window: Optional[int] = None,
+    ) -> Iterator[Tuple[Track, Optional[Path]]]:
+        playlist_dir = run.playlist_dir
+        with TrackPipeline(
+            fetch=lambda track: self.fetch_track(track, playlist_dir),
+            transcode=self.transcode_track,
+            fetch_workers=self._fetch_workers(max_workers),
+            transcode_workers=transcode_workers,
+        ) as pipeline:
+            if window is None:
+                window = 2 * pipeline.fetch_workers + pipeline.transcode_workers
+            retries = RetryQueue(self.retry_policy)
+            # Submitting while enumerating lets workers start on the first
+            # tracks while a flat enumeration is still discovering the rest.
+            for track in tracks:
+                scheduled = run.schedule(track)
+                if scheduled is None:
+                    continue
+                pipeline.submit(scheduled)
+                for track, filepath in self._results(pipeline, retries, window):
+                    run.record(track, filepath)
+                    yield track, filepath
+
+            for track, filepath in self._results(pipeline, retries):
+                run.record(track, filepath)
+                yield track, filepath
+
+    def _results(
+        self, pipeline: TrackPipeline, retries: RetryQueue, window: Optional[int] = None
+    ) -> Iterator[Tuple[Track, Optional[Path]]]:
+        """
+        Collect final outcomes from a pipeline, resubmitting tracks that are retried.
+
+        Args:
+            pipeline (TrackPipeline): The pipeline.
+            retries (RetryQueue): The run's deferred retries.
+            window (Optional[int]): Only collect until fewer than this many tracks are
+                in flight. Defaults to None: collect every track, waiting for
+                deferred retries too.
+
+        Yields:
+            Tuple[Track, Optional[Path]]: Tracks that completed or failed for good.
+        """
+        while pipeline.pending >= window if window else pipeline.pending or len(retries):
+            for track in retries.due():
+                pipeline.submit(track)
+            if not pipeline.pending:
+                time.sleep(retries.wait_time())
+                continue
+            track, filepath = pipeline.result()
+            if filepath is None and retries.defer(track, self.metrics.get(track)):
+                continue
+            yield track, filepath
+
+    def open_run(
+        self,
+        playlist: Playlist,
+        output_dir: Path,
+        should_zip: bool = False,
+        zip_compression: str = "stored",
+        resume: bool = True,
+        keep_tracks: bool = True,
+    ) -> PlaylistRun:
+        """
+        Start the bookkeeping of a playlist download, reporting through this downloader.
+
+        Args:
+            playlist (Playlist): The playlist being downloaded.
+            output_dir (Path): The directory holding the playlist directory.
+            should_zip (bool): Whether to stream finished tracks into a zip file.
+            zip_compression (str): Compression of the zip archive.
+            resume (bool): Skip tracks completed by a previous run.
+            keep_tracks (bool): Keep every track's metrics in the report.
+
+        Returns:
+            PlaylistRun: The run. Its report becomes :attr:`last_report`.
+
+        Raises:
+            ValueError: If zipping is requested with several renditions.
+        """
+        if should_zip and self.renditions:
+            raise ValueError("Zipping is not supported with several renditions")
+        run = PlaylistRun(
+            playlist,
+            output_dir,
+            should_zip=should_zip,
+            zip_compression=zip_compression,
+            resume=resume,
+            metrics=self.metrics,
+            report_dir=self.report_dir,
+            keep_tracks=keep_tracks,
+            concurrency=self.concurrency,
+            bandwidth=self.bandwidth,
+        )
+        self.last_report = run.report
+        return run
+
+    def download_playlists(
+        self,
+        playlist_urls: List[str],
+        output_dir: Path,
+        max_workers: int = 5,
+        should_zip: bool = False,
+        flat: bool = False,
+        resume: bool = True,
+        transcode_workers: Optional[int] = None,
+        zip_compression: str = "stored",
+    ) -> Dict[str, Optional[Path]]:
+        """
+        Download several playlists through one shared worker pool.
+
+        Tracks are deduplicated by ``Track.id`` across all playlists: each unique
+        track is downloaded and transcoded once, into the directory of the first
+        playlist that lists it, and hardlinked into the directories of the other
+        playlists (copied when hardlinks are not supported).
+
+        Args:
+            playlist_urls (List[str]): The URLs of the playlists to download.
+            output_dir (Path): The directory to save the playlist directories in.
+            max_workers (int, optional): Maximum number of concurrent downloads
+                across all playlists. Defaults to 5.
+            should_zip (bool, optional): Whether to zip each playlist. Defaults to False.
+            flat (bool, optional): Enumerate the playlists flat. Defaults to False.
+            resume (bool, optional): Skip tracks completed by a previous run. Defaults to True.
+            transcode_workers (Optional[int], optional): Number of concurrent FFmpeg
+                transcodes. Defaults to the number of CPU cores.
+            zip_compression (str, optional): Compression of the zip archives. Defaults to "stored".
+
+        Returns:
+            Dict[str, Optional[Path]]: The result of every playlist URL, as returned
+            by :meth:`download_playlist`.
+        """
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        runs: Dict[str, PlaylistRun] = {}
+        results: Dict[str, Optional[Path]] = {}
+        # Runs waiting for each unique track, the first one receives the download
+        waiting: Dict[str, List[PlaylistRun]] = {}
+        tracks_by_id: Dict[str, Track] = {}
+
+        try:
+            for playlist_url in dict.fromkeys(playlist_urls):
+                try:
+                    if flat:
+                        playlist, tracks = self.iter_playlist_tracks(playlist_url)
+                    else:
+                        playlist = self.get_playlist_info(playlist_url)
+                        tracks = iter(playlist.tracks)
+                except Exception as e:
+                    logger.error(f"Failed to get playlist '{playlist_url}': {str(e)}")
+                    results[playlist_url] = None
+                    continue
+                run = self.open_run(
+                    playlist,
+                    output_dir,
+                    should_zip=should_zip,
+                    zip_compression=zip_compression,
+                    resume=resume,
+                )
+                runs[playlist_url] = run
+                for track in tracks:
+                    scheduled = run.schedule(track)
+                    if scheduled is not None:
+                        # Tracks shared by several playlists are recorded in the first one's run
+                        tracks_by_id.setdefault(track.id, scheduled)
+                        waiting.setdefault(track.id, []).append(run)
+
+            logger.info(
+                f"Downloading {len(waiting)} unique track(s) for {len(runs)} playlist(s)"
+            )
+            with TrackPipeline(
+                fetch=lambda track: self.fetch_track(
+                    track, waiting[track.id][0].playlist_dir
+                ),
+                transcode=self.transcode_track,
+                fetch_workers=self._fetch_workers(max_workers),
+                transcode_workers=transcode_workers,
+            ) as pipeline:
+                for track in tracks_by_id.values():
+                    pipeline.submit(track)
+
+                for track, filepath in self._results(pipeline, RetryQueue(self.retry_policy)):
+                    track_runs = waiting[track.id]
+                    # Link before recording, zipping removes the recorded file
+                    outcomes = [(track_runs[0], filepath)]
+                    for run in track_runs[1:]:
+                        outcomes.append((run, self._link_into(filepath, run.playlist_dir)))
+                    metrics = self.metrics.finish(track, filepath)
+                    # Linked copies cost no download or transcode of their own
+                    linked = replace(metrics, stages={}, bytes_downloaded=0, retries=0, reextracts=0)
+                    for i, (run, path) in enumerate(outcomes):
+                        run.record(track, path, metrics if i == 0 else linked)
+        finally:
+            for run in runs.values():
+                run.close()
+            self.sessions.prune()
+
+        for playlist_url, run in runs.items():
+            results[playlist_url] = run.finish()
+        return {playlist_url: results[playlist_url] for playlist_url in dict.fromkeys(playlist_urls)}
+
+    def publish_playlist(self, playlist_url: str, queue: WorkQueue) -> Playlist:
+        """
+        Resolve a playlist and queue its tracks for workers (see :meth:`work`).
+
+        Args:
+            playlist_url (str): The URL of the playlist.
+            queue (WorkQueue): The queue shared with the workers.
+
+        Returns:
+            Playlist: The resolved playlist.
+        """
         playlist = self.get_playlist_info(playlist_url)
-        playlist_name = clean_filename(playlist.title)
-        playlist_dir = output_dir / playlist_name
-        playlist_dir.mkdir(exist_ok=True)
-
-        downloaded_files: List[Path] = []
-        failed_tracks: List[str] = []
-        total_tracks = len(playlist.tracks)
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_track = {
-                executor.submit(self.download_track, track, playlist_dir): track
-                for track in playlist.tracks
-            }
-            for future in as_completed(future_to_track):
-                track = future_to_track[future]
-                filepath = future.result()
-                if filepath:
-                    downloaded_files.append(filepath)
-                else:
-                    failed_tracks.append(track.title)
-
-                delay = random.uniform(min_delay, max_delay)
-                time.sleep(delay)
-
-        # Log summary
-        logger.info(f"Download complete: {len(downloaded_files)}/{total_tracks} tracks downloaded")
-        if failed_tracks:
-            logger.warning(f"Skipped {len(failed_tracks)} track(s): {', '.join(failed_tracks[:5])}")
-            if len(failed_tracks) > 5:
-                logger.warning(f"... and {len(failed_tracks) - 5} more")
-
-        if downloaded_files:
-            if should_zip:
-                zip_filename = output_dir / f"{playlist_name}.zip"
-                create_zip(downloaded_files, zip_filename, playlist_dir)
-                for file in downloaded_files:
-                    file.unlink()  # Delete original files after zipping
-                shutil.rmtree(playlist_dir)
-                return zip_filename
-            else:
-                return playlist_dir
+        queue.publish(playlist)
+        return playlist
+
+    def work(
+        self,
+        queue: WorkQueue,
+        output_dir: Path,
+        worker_id: Optional[str] = None,
+        max_workers: int = 5,
+        transcode_workers: Optional[int] = None,
+        poll_interval: float = 5.0,
+    ) -> Dict[str, int]:
+        """
+        Download tracks leased from a shared queue until no track is left.
+
+        Several processes, on one or more machines sharing ``output_dir`` and
+        the queue file, may work on the same queue. Leases are renewed from a
+        background thread while tracks are in flight; the tracks of a worker
+        that dies are issued again once its leases expire. While other workers
+        still hold tracks, this worker keeps polling so it can pick up their
+        tracks should their leases expire.
+
+        Tracks are saved into a directory per playlist inside ``output_dir``.
+        Worker mode does not zip and does not use the download manifest: the
+        queue records which tracks are completed.
+
+        Args:
+            queue (WorkQueue): The queue.
+            output_dir (Path): The directory to save the playlist directories in.
+            worker_id (Optional[str]): A name unique across all workers. Defaults to
+                the host name and process id.
+            max_workers (int): Maximum number of concurrent downloads. Defaults to 5.
+            transcode_workers (Optional[int]): Number of concurrent FFmpeg transcodes.
+                Defaults to the number of CPU cores.
+            poll_interval (float): Seconds to wait before looking for tracks again
+                while other workers hold the remaining ones. Defaults to 5.
+
+        Returns:
+            Dict[str, int]: The number of tracks this worker completed and failed.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        # Keyed by playlist and track: a worker may hold the same track for
+        # several playlists at once
+        in_flight: Dict[Tuple[str, str], Job] = {}
+        outcomes = {"completed": 0, "failed": 0}
+
+        stop = threading.Event()
+
+        def renew_leases() -> None:
+            while not stop.wait(queue.lease_timeout / 3):
+                try:
+                    queue.extend(worker_id)
+                except Exception as e:
+                    logger.warning(f"Failed to renew leases: {str(e)}")
+
+        def job_dir(job: Job) -> Path:
+            return output_dir / clean_filename(job.playlist_title)
+
+        logger.info(f"Worker {worker_id} started")
+        heartbeat = threading.Thread(target=renew_leases, name="lease-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            with TrackPipeline(
+                fetch=lambda track: self.fetch_track(
+                    track, job_dir(in_flight[track.run, track.id])
+                ),
+                transcode=self.transcode_track,
+                fetch_workers=self._fetch_workers(max_workers),
+                transcode_workers=transcode_workers,
+            ) as pipeline:
+                window = 2 * pipeline.fetch_workers + pipeline.transcode_workers
+                while True:
+                    for job in queue.lease(worker_id, window - pipeline.pending):
+                        job_dir(job).mkdir(exist_ok=True)
+                        # Tagged with its playlist, which keeps the metrics apart too
+                        track = replace(job.track, run=job.playlist_id)
+                        in_flight[track.run, track.id] = job
+                        pipeline.submit(track)
+                    if not pipeline.pending:
+                        if not queue.remaining():
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    track, filepath = pipeline.result()
+                    job = in_flight.pop((track.run, track.id))
+                    metrics = self.metrics.finish(track, filepath)
+                    if filepath:
+                        queue.complete(job, worker_id, filepath)
+                        outcomes["completed"] += 1
+                    else:
+                        # The queue retries failures that may pass on another attempt,
+                        # backing off so that a burst of server errors is not hammered
+                        queue.fail(
+                            job,
+                            worker_id,
+                            metrics.error,
+                            retry=metrics.failure in RETRYABLE_FAILURES,
+                            delay=self.retry_policy.delay(job.attempts - 1),
+                        )
+                        outcomes["failed"] += 1
+        finally:
+            stop.set()
+            heartbeat.join()
+            # Tracks whose outcome was not recorded go back to the queue
+            queue.release(worker_id)
+            self.sessions.prune()
+
+        logger.info(
+            f"Worker {worker_id} done: {outcomes['completed']} completed, "
+            f"{outcomes['failed']} failed"
+        )
+        return outcomes
+
+    def _link_into(self, filepath: Optional[Path], directory: Path) -> Optional[Path]:
+        if filepath is None:
+            return None
+        if self.renditions:
+            # Every rendition is linked, each into its own directory
+            stem, playlist_dir = filepath.stem, filepath.parent.parent
+            links = [
+                (rendition.output_path(playlist_dir, stem), rendition.output_path(directory, stem))
+                for rendition in self.renditions
+            ]
         else:
-            logger.error("No files were successfully downloaded.")
+            links = [(filepath, directory / filepath.name)]
+        try:
+            for source, destination in links:
+                destination.parent.mkdir(exist_ok=True)
+                link_file(source, destination)
+            return links[0][1]
+        except OSError as e:
+            logger.error(f"Failed to link '{filepath}' into {directory}: {str(e)}")
             return None
 
 
@@ -234,6 +1085,7 @@ def main() -> None:
     This function sets up logging, prompts the user for input,
     and initiates the download process.
     """
+    setup_logging()
 
     while True:
         playlist_url = input("Enter SoundCloud playlist URL: ")
@@ -0,0 +1,204 @@
+import sqlite3, threading, time
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from soundclouddownloader.dataclass import Track
+
+MANIFEST_FILENAME = ".soundclouddownloader.sqlite"
+
+STATUS_PENDING = "pending"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class DownloadManifest:
+    """
+    A persistent record of the tracks downloaded into an output directory.
+
+    The manifest is a small SQLite database keyed by playlist id and
+    ``Track.id``. It stores the final path, size and status of every track so
+    that reruns can skip tracks that are already on disk, resume tracks left
+    pending by an interrupted run, and only fetch tracks added since the last
+    sync. Tracks of zipped runs are recorded by their archive and member name,
+    since their files are removed once archived.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the manifest database.
+
+        Args:
+            path (Path): Path of the SQLite file.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tracks (
+                    playlist_id TEXT NOT NULL,
+                    track_id TEXT NOT NULL,
+                    title TEXT,
+                    path TEXT,
+                    size INTEGER,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    member TEXT,
+                    PRIMARY KEY (playlist_id, track_id)
+                )
+                """
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(tracks)")]
+            # Manifests written before zip members were recorded
+            if "member" not in columns:
+                self._conn.execute("ALTER TABLE tracks ADD COLUMN member TEXT")
+
+    @classmethod
+    def for_directory(cls, output_dir: Path) -> "DownloadManifest":
+        """
+        Open the manifest stored in the given output directory.
+
+        Args:
+            output_dir (Path): The download output directory.
+
+        Returns:
+            DownloadManifest: The manifest for that directory.
+        """
+        return cls(Path(output_dir) / MANIFEST_FILENAME)
+
+    def _upsert(
+        self,
+        playlist_id: str,
+        track: Track,
+        status: str,
+        path: Optional[Path] = None,
+        size: Optional[int] = None,
+        member: Optional[str] = None,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO tracks (
+                    playlist_id, track_id, title, path, size, status, updated_at, member
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (playlist_id, track_id) DO UPDATE SET
+                    title = excluded.title,
+                    path = COALESCE(excluded.path, tracks.path),
+                    size = COALESCE(excluded.size, tracks.size),
+                    status = excluded.status,
+                    updated_at = excluded.updated_at,
+                    member = excluded.member
+                """,
+                (
+                    playlist_id,
+                    track.id,
+                    track.title,
+                    str(path) if path else None,
+                    size,
+                    status,
+                    time.time(),
+                    member,
+                ),
+            )
+
+    def mark_pending(self, playlist_id: str, track: Track) -> None:
+        """Record that a track download has been scheduled."""
+        self._upsert(playlist_id, track, STATUS_PENDING)
+
+    def mark_completed(
+        self,
+        playlist_id: str,
+        track: Track,
+        path: Path,
+        archive: Optional[Path] = None,
+        member: Optional[str] = None,
+    ) -> None:
+        """
+        Record the final path and size of a downloaded track.
+
+        Args:
+            playlist_id (str): The playlist the track was downloaded for.
+            track (Track): The track.
+            path (Path): The downloaded file.
+            archive (Optional[Path]): The zip file the track is being archived into,
+                recorded instead of ``path``.
+            member (Optional[str]): The track's name inside ``archive``.
+        """
+        size = Path(path).stat().st_size
+        if archive:
+            self._upsert(playlist_id, track, STATUS_COMPLETED, archive, size, member)
+        else:
+            self._upsert(playlist_id, track, STATUS_COMPLETED, path, size)
+
+    def mark_failed(self, playlist_id: str, track: Track) -> None:
+        """Record that a track download failed."""
+        self._upsert(playlist_id, track, STATUS_FAILED)
+
+    def status(self, playlist_id: str, track_id: str) -> Optional[str]:
+        """
+        Get the recorded status of a track.
+
+        Args:
+            playlist_id (str): The playlist the track was downloaded for.
+            track_id (str): The track id.
+
+        Returns:
+            Optional[str]: The status, or None if the track is unknown.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM tracks WHERE playlist_id = ? AND track_id = ?",
+                (playlist_id, track_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def completed_path(
+        self, playlist_id: str, track_id: str, members: Optional[Dict[str, int]] = None
+    ) -> Optional[Path]:
+        """
+        Get the path of a track completed by a previous run.
+
+        A track only counts as completed if its file still exists with the
+        recorded size, so deleted or truncated files are downloaded again.
+        A track archived by a zipped run counts as completed if the archive
+        still holds it with the recorded size.
+
+        Args:
+            playlist_id (str): The playlist the track was downloaded for.
+            track_id (str): The track id.
+            members (Optional[Dict[str, int]]): The members of the playlist's zip
+                file (see ``archived_members``) when resuming a zipped run.
+                Defaults to None, so that archived tracks are downloaded again.
+
+        Returns:
+            Optional[Path]: The path of the completed file, or of the zip file
+            holding it, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, member FROM tracks "
+                "WHERE playlist_id = ? AND track_id = ? AND status = ?",
+                (playlist_id, track_id, STATUS_COMPLETED),
+            ).fetchone()
+        if not row or not row[0]:
+            return None
+        path = Path(row[0])
+        if row[2] is not None:
+            if members is not None and members.get(row[2]) == row[1]:
+                return path
+            logger.debug(f"Manifest entry for track {track_id} is not in {path}")
+            return None
+        try:
+            if path.stat().st_size == row[1]:
+                return path
+        except OSError:
+            pass
+        logger.debug(f"Manifest entry for track {track_id} is stale: {path}")
+        return None
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
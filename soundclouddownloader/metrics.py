@@ -0,0 +1,300 @@
+import json, threading, time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from loguru import logger
+from soundclouddownloader.dataclass import Track
+
+# Stages timed for every track
+STAGE_WAIT = "wait"
+STAGE_EXTRACT = "extract"
+STAGE_FETCH = "fetch"
+STAGE_TRANSCODE = "transcode"
+STAGE_RESOLVE = "resolve"
+STAGE_ARCHIVE = "archive"
+
+STAGES = (STAGE_WAIT, STAGE_EXTRACT, STAGE_FETCH, STAGE_TRANSCODE, STAGE_RESOLVE, STAGE_ARCHIVE)
+
+# Final states of a track in a run
+TRACK_COMPLETED = "completed"
+TRACK_FAILED = "failed"
+TRACK_SKIPPED = "skipped"
+
+# Events passed to progress callbacks besides the stage names
+EVENT_COMPLETED = TRACK_COMPLETED
+EVENT_FAILED = TRACK_FAILED
+
+
+@dataclass(slots=True)
+class TrackMetrics:
+    track_id: str
+    title: str
+    status: str = "pending"
+    path: Optional[str] = None
+    # Seconds spent in each stage, summed over retries
+    stages: Dict[str, float] = field(default_factory=dict)
+    bytes_downloaded: int = 0
+    bytes_written: int = 0
+    retries: int = 0
+    # Downloads repeated because the cached info dict had gone stale, not retries
+    reextracts: int = 0
+    error: Optional[str] = None
+    # Class of the failure, see ``classify_error``
+    failure: Optional[str] = None
+
+
+ProgressCallback = Callable[[TrackMetrics, str], None]
+
+
+class MetricsRecorder:
+    """
+    Collects per-track timings, sizes and retries while tracks are in flight.
+
+    Workers time their stages with :meth:`stage`; the entry of a track is
+    handed over to its run once the track's outcome is known (:meth:`finish`).
+    Entries are kept per run (``track.run``), so that runs sharing a downloader
+    may have the same track in flight.
+    The optional progress callback is called, from the worker thread, with the
+    track's metrics and the name of the stage that just ended, and with
+    ``"completed"`` or ``"failed"`` when the track is done. Exceptions raised
+    by the callback are logged and otherwise ignored.
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            callback (Optional[ProgressCallback]): Called with ``(metrics, event)``
+                as tracks progress. Defaults to None.
+        """
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._tracks: Dict[Tuple[Optional[str], str], TrackMetrics] = {}
+
+    def get(self, track: Track) -> TrackMetrics:
+        """Get the in-flight metrics of a track, creating them on first use."""
+        with self._lock:
+            metrics = self._tracks.get((track.run, track.id))
+            if metrics is None:
+                metrics = self._tracks[track.run, track.id] = TrackMetrics(track.id, track.title)
+            return metrics
+
+    def emit(self, metrics: TrackMetrics, event: str) -> None:
+        """Call the progress callback, if any."""
+        if self.callback is None:
+            return
+        try:
+            self.callback(metrics, event)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {str(e)}")
+
+    def add(self, track: Track, stage: str, seconds: float) -> None:
+        """Add time spent in a stage, e.g. measured elsewhere."""
+        metrics = self.get(track)
+        with self._lock:
+            metrics.stages[stage] = metrics.stages.get(stage, 0.0) + seconds
+        self.emit(metrics, stage)
+
+    @contextmanager
+    def stage(self, track: Track, stage: str) -> Iterator[TrackMetrics]:
+        """
+        Time a stage of a track.
+
+        Args:
+            track (Track): The track.
+            stage (str): One of ``STAGES``.
+
+        Yields:
+            TrackMetrics: The track's metrics, for recording sizes and retries.
+        """
+        start = time.perf_counter()
+        try:
+            yield self.get(track)
+        finally:
+            self.add(track, stage, time.perf_counter() - start)
+
+    def fail(self, track: Track, reason: str, failure: Optional[str] = None) -> None:
+        """Record why a track failed and, optionally, the class of the failure."""
+        metrics = self.get(track)
+        metrics.error = reason
+        metrics.failure = failure
+
+    def finish(self, track: Track, filepath: Optional[Path]) -> TrackMetrics:
+        """
+        Hand over the metrics of a track whose outcome is known.
+
+        Args:
+            track (Track): The track.
+            filepath (Optional[Path]): Its final path, or None if it failed.
+
+        Returns:
+            TrackMetrics: The track's metrics, no longer tracked by the recorder.
+        """
+        with self._lock:
+            metrics = self._tracks.pop((track.run, track.id), None) or TrackMetrics(
+                track.id, track.title
+            )
+        if filepath:
+            metrics.status = TRACK_COMPLETED
+            metrics.path = str(filepath)
+            try:
+                metrics.bytes_written = Path(filepath).stat().st_size
+            except OSError:
+                pass
+        else:
+            metrics.status = TRACK_FAILED
+            metrics.error = metrics.error or "unknown error"
+        self.emit(metrics, metrics.status)
+        return metrics
+
+
+@dataclass
+class RunReport:
+    playlist_id: str
+    playlist_title: str
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    result: Optional[str] = None
+    # Seconds spent on the run as a whole, e.g. resolving the playlist
+    stages: Dict[str, float] = field(default_factory=dict)
+    # Metrics of every track, unless the run keeps only its totals
+    tracks: List[TrackMetrics] = field(default_factory=list)
+    keep_tracks: bool = True
+    # Totals over all tracks, maintained by add() so they do not need ``tracks``
+    counts: Dict[str, int] = field(default_factory=dict)
+    stage_seconds: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(STAGES, 0.0))
+    bytes_downloaded: int = 0
+    bytes_written: int = 0
+    retries: int = 0
+    reextracts: int = 0
+    failures: List[TrackMetrics] = field(default_factory=list)
+    # Downloads in flight at the end of the run, when adapted automatically
+    concurrency: Optional[int] = None
+    # Bytes per second all downloads were capped at, if capped
+    bandwidth_limit: Optional[int] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def add(self, metrics: TrackMetrics) -> None:
+        """Add the final metrics of a track to the report."""
+        if self.keep_tracks:
+            self.tracks.append(metrics)
+        if metrics.status == TRACK_FAILED:
+            self.failures.append(metrics)
+        self.counts[metrics.status] = self.counts.get(metrics.status, 0) + 1
+        for stage, seconds in metrics.stages.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        self.bytes_downloaded += metrics.bytes_downloaded
+        self.bytes_written += metrics.bytes_written
+        self.retries += metrics.retries
+        self.reextracts += metrics.reextracts
+
+    def add_stage(self, metrics: TrackMetrics, stage: str, seconds: float) -> None:
+        """Add time a track spent in a stage after it was added, e.g. archiving."""
+        metrics.stages[stage] = metrics.stages.get(stage, 0.0) + seconds
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def count(self, status: str) -> int:
+        return self.counts.get(status, 0)
+
+    def to_dict(self) -> dict:
+        """Get the report as JSON-serializable data."""
+        return {
+            "playlist_id": self.playlist_id,
+            "playlist_title": self.playlist_title,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration": self.duration,
+            "result": self.result,
+            "stages": self.stages,
+            "concurrency": self.concurrency,
+            "bandwidth_limit": self.bandwidth_limit,
+            "summary": {
+                "completed": self.count(TRACK_COMPLETED),
+                "failed": self.count(TRACK_FAILED),
+                "skipped": self.count(TRACK_SKIPPED),
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_written": self.bytes_written,
+                "retries": self.retries,
+                "reextracts": self.reextracts,
+                "stage_seconds": dict(self.stage_seconds),
+            },
+            "failures": [
+                {
+                    "track_id": track.track_id,
+                    "title": track.title,
+                    "failure": track.failure,
+                    "error": track.error,
+                }
+                for track in self.failures
+            ],
+            "tracks": [asdict(track) for track in self.tracks],
+        }
+
+    def write_json(self, path: Path) -> Path:
+        """Write the report as JSON."""
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        return path
+
+    def to_prometheus(self) -> str:
+        """Render the report in the Prometheus text exposition format."""
+        playlist = self.playlist_id.replace("\\", "\\\\").replace('"', '\\"')
+        labels = f'playlist="{playlist}"'
+        summary = self.to_dict()["summary"]
+        lines = [
+            "# HELP soundcloud_downloader_tracks Tracks of the run by final status.",
+            "# TYPE soundcloud_downloader_tracks gauge",
+        ]
+        for status in (TRACK_COMPLETED, TRACK_FAILED, TRACK_SKIPPED):
+            lines.append(
+                f'soundcloud_downloader_tracks{{{labels},status="{status}"}} {summary[status]}'
+            )
+        lines += [
+            "# HELP soundcloud_downloader_stage_seconds Time tracks spent in each stage.",
+            "# TYPE soundcloud_downloader_stage_seconds gauge",
+        ]
+        for stage, seconds in summary["stage_seconds"].items():
+            lines.append(
+                f'soundcloud_downloader_stage_seconds{{{labels},stage="{stage}"}} {seconds:.6f}'
+            )
+        gauges = [
+            ("bytes_downloaded", "Bytes downloaded from SoundCloud.", summary["bytes_downloaded"]),
+            ("bytes_written", "Bytes of finished output files.", summary["bytes_written"]),
+            ("retries", "Retried requests.", summary["retries"]),
+            (
+                "reextracts",
+                "Tracks extracted again because their cached info was stale.",
+                summary["reextracts"],
+            ),
+            ("run_duration_seconds", "Wall time of the run.", f"{self.duration:.6f}"),
+        ]
+        if self.concurrency is not None:
+            gauges.append(
+                ("concurrency", "Adaptive limit of downloads in flight.", self.concurrency)
+            )
+        if self.bandwidth_limit is not None:
+            gauges.append(
+                (
+                    "bandwidth_limit_bytes_per_second",
+                    "Cap on the bytes per second of all downloads.",
+                    self.bandwidth_limit,
+                )
+            )
+        for name, help_text, value in gauges:
+            lines += [
+                f"# HELP soundcloud_downloader_{name} {help_text}",
+                f"# TYPE soundcloud_downloader_{name} gauge",
+                f"soundcloud_downloader_{name}{{{labels}}} {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> Path:
+        """Write the report in the Prometheus text format, e.g. for node_exporter's textfile collector."""
+        path = Path(path)
+        path.write_text(self.to_prometheus())
+        return path
@@ -0,0 +1,147 @@
+import os, queue, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+from loguru import logger
+from soundclouddownloader.dataclass import Track, FetchedTrack
+
+
+class TrackPipeline:
+    """
+    A two-stage download pipeline: network fetches feed CPU-bound transcodes.
+
+    A pool of fetch workers downloads raw audio and hands each file to a
+    separate pool of transcode workers through a bounded queue. When the
+    transcoders fall behind, the queue fills up and the fetchers block, so the
+    network and the CPU are each saturated by their own pool without piling
+    up untranscoded downloads on disk.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Track], Optional[FetchedTrack]],
+        transcode: Callable[[FetchedTrack], Optional[Path]],
+        fetch_workers: int = 5,
+        transcode_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        """
+        Start the transcode workers of the pipeline.
+
+        Args:
+            fetch (Callable): Downloads a track, returning None on failure.
+            transcode (Callable): Post-processes a fetched track, returning the
+                final path or None on failure.
+            fetch_workers (int): Number of concurrent fetches. Defaults to 5.
+            transcode_workers (Optional[int]): Number of concurrent transcodes.
+                Defaults to the number of CPU cores.
+            queue_size (Optional[int]): Capacity of the queue between the two
+                stages. Defaults to twice the number of transcode workers.
+        """
+        self.fetch_workers = fetch_workers
+        self.transcode_workers = transcode_workers or os.cpu_count() or 1
+        self._fetch = fetch
+        self._transcode = transcode
+        self._handoff: "queue.Queue[Optional[FetchedTrack]]" = queue.Queue(
+            maxsize=queue_size or self.transcode_workers * 2
+        )
+        self._results: "queue.Queue[Tuple[Track, Optional[Path]]]" = queue.Queue()
+        self._fetch_executor = ThreadPoolExecutor(
+            max_workers=fetch_workers, thread_name_prefix="fetch"
+        )
+        self._transcoders = [
+            threading.Thread(target=self._transcode_loop, name=f"transcode-{i}", daemon=True)
+            for i in range(self.transcode_workers)
+        ]
+        for thread in self._transcoders:
+            thread.start()
+        self.submitted = 0
+        self._collected = 0
+        self._closed = False
+
+    def _fetch_one(self, track: Track) -> None:
+        try:
+            fetched = self._fetch(track)
+        except Exception as e:
+            logger.error(f"Failed to download track '{track.title}': {str(e)}")
+            fetched = None
+        if fetched is None:
+            self._results.put((track, None))
+        else:
+            # Blocks while the transcoders are behind
+            self._handoff.put(fetched)
+
+    def _transcode_loop(self) -> None:
+        while True:
+            fetched = self._handoff.get()
+            if fetched is None:
+                return
+            try:
+                filepath = self._transcode(fetched)
+            except Exception as e:
+                logger.error(f"Failed to convert track '{fetched.track.title}': {str(e)}")
+                filepath = None
+            self._results.put((fetched.track, filepath))
+
+    def submit(self, track: Track) -> None:
+        """
+        Schedule a track for download.
+
+        Args:
+            track (Track): The track to fetch and transcode.
+        """
+        self.submitted += 1
+        self._fetch_executor.submit(self._fetch_one, track)
+
+    @property
+    def pending(self) -> int:
+        """The number of submitted tracks whose outcome has not been collected yet."""
+        return self.submitted - self._collected
+
+    def result(self, timeout: Optional[float] = None) -> Tuple[Track, Optional[Path]]:
+        """
+        Wait for the next submitted track to complete.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait at most. Defaults to None (no limit).
+
+        Returns:
+            Tuple[Track, Optional[Path]]: The track and its final path, or None
+            if either stage failed.
+
+        Raises:
+            queue.Empty: If no track completed within ``timeout``.
+        """
+        if not self.pending:
+            raise RuntimeError("No track is pending")
+        result = self._results.get(timeout=timeout)
+        self._collected += 1
+        return result
+
+    def results(self) -> Iterator[Tuple[Track, Optional[Path]]]:
+        """
+        Yield the outcome of every submitted track as it completes.
+
+        Yields:
+            Tuple[Track, Optional[Path]]: The track and its final path, or None
+            if either stage failed.
+        """
+        while self.pending:
+            yield self.result()
+
+    def close(self) -> None:
+        """Wait for all submitted work to finish and stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        self._fetch_executor.shutdown(wait=True)
+        for _ in self._transcoders:
+            self._handoff.put(None)
+        for thread in self._transcoders:
+            thread.join()
+
+    def __enter__(self) -> "TrackPipeline":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Optional
+
+# Always convert to the target codec (copying the stream when it already matches)
+POLICY_TRANSCODE = "transcode"
+# Prefer source formats already in the target codec, convert only the rest
+POLICY_TRANSCODE_IF_DIFFERENT = "transcode-if-different"
+# Never re-encode, only copy the audio stream into its canonical container
+POLICY_REMUX = "remux"
+# Keep the downloaded file exactly as served
+POLICY_NATIVE = "native"
+
+OUTPUT_POLICIES = (
+    POLICY_TRANSCODE,
+    POLICY_TRANSCODE_IF_DIFFERENT,
+    POLICY_REMUX,
+    POLICY_NATIVE,
+)
+
+# Processing paths, cheapest first
+PATH_NATIVE = "native"
+PATH_REMUX = "remux"
+PATH_TRANSCODE = "transcode"
+
+# Audio codec carried by each extension SoundCloud serves, and the canonical
+# extension yt-dlp's FFmpegExtractAudio uses for each codec.
+EXT_CODECS = {
+    "mp3": "mp3",
+    "opus": "opus",
+    "m4a": "aac",
+    "aac": "aac",
+    "ogg": "vorbis",
+    "flac": "flac",
+    "wav": "wav",
+}
+CODEC_EXTS = {
+    "mp3": "mp3",
+    "opus": "opus",
+    "aac": "m4a",
+    "vorbis": "ogg",
+    "flac": "flac",
+    "wav": "wav",
+}
+
+
+def validate_policy(policy: str) -> str:
+    """
+    Check that an output policy is known.
+
+    Args:
+        policy (str): The output policy name.
+
+    Returns:
+        str: The policy, unchanged.
+
+    Raises:
+        ValueError: If the policy is not one of ``OUTPUT_POLICIES``.
+    """
+    if policy not in OUTPUT_POLICIES:
+        raise ValueError(
+            f"Unknown output policy '{policy}', expected one of: {', '.join(OUTPUT_POLICIES)}"
+        )
+    return policy
+
+
+def format_selector(policy: str, codec: str) -> str:
+    """
+    Get the yt-dlp format selector for an output policy.
+
+    Args:
+        policy (str): The output policy.
+        codec (str): The target codec of transcoding policies.
+
+    Returns:
+        str: The yt-dlp ``format`` option.
+    """
+    if policy == POLICY_TRANSCODE_IF_DIFFERENT:
+        return f"bestaudio[ext={CODEC_EXTS.get(codec, codec)}]/bestaudio/best"
+    return "bestaudio/best"
+
+
+def plan_output(policy: str, source_ext: Optional[str], codec: str) -> str:
+    """
+    Pick the cheapest processing path for a downloaded track.
+
+    Args:
+        policy (str): The output policy.
+        source_ext (Optional[str]): Extension of the downloaded file.
+        codec (str): The target codec of transcoding policies.
+
+    Returns:
+        str: ``PATH_NATIVE``, ``PATH_REMUX`` or ``PATH_TRANSCODE``.
+    """
+    source_codec = EXT_CODECS.get(source_ext or "")
+    if policy == POLICY_NATIVE:
+        return PATH_NATIVE
+    if policy == POLICY_REMUX:
+        if source_codec and CODEC_EXTS[source_codec] == source_ext:
+            return PATH_NATIVE
+        return PATH_REMUX
+    if source_codec == codec and CODEC_EXTS[codec] == source_ext:
+        return PATH_NATIVE
+    return PATH_TRANSCODE
+
+
+def postprocessors_for(
+    path: str, source_ext: Optional[str], codec: str, quality: str
+) -> List[Dict[str, Any]]:
+    """
+    Get the yt-dlp post-processors implementing a processing path.
+
+    Args:
+        path (str): The processing path from :func:`plan_output`.
+        source_ext (Optional[str]): Extension of the downloaded file.
+        codec (str): The target codec.
+        quality (str): The target quality, passed to FFmpeg as ``preferredquality``.
+
+    Returns:
+        List[Dict[str, Any]]: The ``postprocessors`` option.
+    """
+    if path == PATH_NATIVE:
+        return []
+    if path == PATH_REMUX:
+        # Same codec in and out makes FFmpegExtractAudio copy the stream
+        return [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": EXT_CODECS.get(source_ext or "", "best"),
+            }
+        ]
+    return [
+        {
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": codec,
+            "preferredquality": quality,
+        }
+    ]
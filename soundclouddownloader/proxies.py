@@ -0,0 +1,178 @@
+import threading, time
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from soundclouddownloader.ratelimit import RateLimiter
+from soundclouddownloader.retry import FAILURE_THROTTLED, FAILURE_TRANSIENT
+
+
+class Proxy:
+    """
+    A proxy of a :class:`ProxyPool` and its health.
+
+    Every proxy is a separate egress IP, so it gets its own rate limiter.
+    Latency and error rate are exponentially weighted moving averages over
+    the requests made through the proxy.
+    """
+
+    def __init__(self, url: str, rate_limiter: RateLimiter):
+        self.url = url
+        self.rate_limiter = rate_limiter
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.drained_until = 0.0
+        self.drains = 0
+
+    def __repr__(self) -> str:
+        return f"Proxy({self.url!r})"
+
+
+class ProxyPool:
+    """
+    A pool of proxies that tracks are spread across.
+
+    Each proxy carries at most ``max_per_proxy`` downloads at once and has
+    its own request budget, so throughput grows with the number of healthy
+    proxies. Tracks go to the proxy with the best score, which combines its
+    latency, error rate and current load; proxies that have not been used
+    yet are tried first. A proxy that is throttled, or whose error rate
+    exceeds ``error_threshold``, is drained: it gets no new tracks for an
+    exponentially growing period, after which it is tried again.
+    """
+
+    def __init__(
+        self,
+        proxies: List[str],
+        max_per_proxy: int = 2,
+        requests_per_second: float = 1.0,
+        burst: int = 3,
+        error_threshold: float = 0.5,
+        min_samples: int = 3,
+        drain_base: float = 30.0,
+        drain_max: float = 600.0,
+        smoothing: float = 0.3,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            proxies (List[str]): Proxy URLs, e.g. ``http://proxy.example.com:8080``.
+            max_per_proxy (int): Downloads carried by one proxy at once. Defaults to 2.
+            requests_per_second (float): Request budget of every proxy. Defaults to 1.0.
+            burst (int): Requests one proxy may issue back to back. Defaults to 3.
+            error_threshold (float): Error rate above which a proxy is drained. Defaults to 0.5.
+            min_samples (int): Requests through a proxy before its error rate counts.
+                Defaults to 3.
+            drain_base (float): First drain period in seconds. Defaults to 30.
+            drain_max (float): Upper bound of the drain period in seconds. Defaults to 600.
+            smoothing (float): Weight of the latest request in the moving averages.
+                Defaults to 0.3.
+        """
+        proxies = list(dict.fromkeys(proxies))
+        if not proxies:
+            raise ValueError("at least one proxy is required")
+        if max_per_proxy < 1:
+            raise ValueError("max_per_proxy must be at least 1")
+        self.max_per_proxy = max_per_proxy
+        self.error_threshold = error_threshold
+        self.min_samples = min_samples
+        self.drain_base = drain_base
+        self.drain_max = drain_max
+        self.smoothing = smoothing
+        self.proxies = [
+            Proxy(url, RateLimiter(rate=requests_per_second, burst=burst)) for url in proxies
+        ]
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self) -> int:
+        """The number of downloads all proxies can carry at once."""
+        return len(self.proxies) * self.max_per_proxy
+
+    def _score(self, proxy: Proxy) -> float:
+        # Unused proxies score 0, so that each one is measured early on
+        return (proxy.latency or 0.0) * (1 + proxy.in_flight) * (1 + 4 * proxy.error_rate)
+
+    def acquire(self) -> Proxy:
+        """
+        Wait for a healthy proxy with free capacity and take a slot on it.
+
+        Returns:
+            Proxy: The proxy to use, to be handed back with :meth:`release`.
+        """
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                available = [
+                    proxy
+                    for proxy in self.proxies
+                    if proxy.drained_until <= now and proxy.in_flight < self.max_per_proxy
+                ]
+                if available:
+                    proxy = min(available, key=self._score)
+                    proxy.in_flight += 1
+                    return proxy
+                drained = [p.drained_until for p in self.proxies if p.drained_until > now]
+                # Wake up when a drained proxy returns, or a slot frees up
+                self._cond.wait(min(drained) - now if drained else None)
+
+    def release(self, proxy: Proxy, seconds: float, failure: Optional[str] = None) -> None:
+        """
+        Hand back a proxy slot and update the proxy's health.
+
+        Args:
+            proxy (Proxy): The proxy from :meth:`acquire`.
+            seconds (float): How long the download through the proxy took.
+            failure (Optional[str]): Class of the failure (see ``classify_error``),
+                or None if the download succeeded. Only throttling and transient
+                failures count against the proxy.
+        """
+        with self._cond:
+            proxy.in_flight -= 1
+            if failure == FAILURE_THROTTLED:
+                self._drain(proxy, "throttled")
+            elif failure is None or failure == FAILURE_TRANSIENT:
+                error = 1.0 if failure else 0.0
+                proxy.samples += 1
+                proxy.error_rate += self.smoothing * (error - proxy.error_rate)
+                if failure is None:
+                    proxy.drains = 0
+                    proxy.latency = (
+                        seconds
+                        if proxy.latency is None
+                        else proxy.latency + self.smoothing * (seconds - proxy.latency)
+                    )
+                if (
+                    proxy.samples >= self.min_samples
+                    and proxy.error_rate > self.error_threshold
+                ):
+                    self._drain(proxy, f"error rate {proxy.error_rate:.0%}")
+            self._cond.notify_all()
+
+    def _drain(self, proxy: Proxy, reason: str) -> None:
+        if proxy.drained_until > time.monotonic():
+            # Downloads started before the drain fail the same way
+            return
+        delay = min(self.drain_base * 2**proxy.drains, self.drain_max)
+        proxy.drains += 1
+        proxy.drained_until = time.monotonic() + delay
+        # On probation when it returns: one more error drains it again
+        proxy.error_rate = self.error_threshold
+        proxy.samples = self.min_samples
+        logger.warning(f"Draining proxy {proxy.url} for {delay:.0f}s ({reason})")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get the health of every proxy, e.g. for logging."""
+        now = time.monotonic()
+        with self._cond:
+            return [
+                {
+                    "url": proxy.url,
+                    "in_flight": proxy.in_flight,
+                    "latency": proxy.latency,
+                    "error_rate": proxy.error_rate,
+                    "drained_for": max(0.0, proxy.drained_until - now),
+                }
+                for proxy in self.proxies
+            ]
@@ -0,0 +1,128 @@
+import re, threading, time
+from loguru import logger
+
+THROTTLE_STATUS_CODES = (403, 429)
+_THROTTLE_MESSAGE_RE = re.compile(r"HTTP Error (403|429)")
+
+
+def is_throttled(error: BaseException) -> bool:
+    """
+    Check whether an error was caused by SoundCloud throttling the client.
+
+    yt-dlp wraps the underlying ``HTTPError`` in ``ExtractorError`` and
+    ``DownloadError``, so the cause chain is followed and the message is
+    checked as a last resort.
+
+    Args:
+        error (BaseException): The error raised by a download.
+
+    Returns:
+        bool: True if an HTTP 429 or 403 response caused the error.
+    """
+    message = str(error)
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status", None) or getattr(error, "code", None)
+        if status in THROTTLE_STATUS_CODES:
+            return True
+        exc_info = getattr(error, "exc_info", None)
+        error = (
+            getattr(error, "cause", None)
+            or (exc_info[1] if exc_info else None)
+            or error.__cause__
+        )
+    return bool(_THROTTLE_MESSAGE_RE.search(message))
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket shared by every download worker.
+
+    Each request to SoundCloud (a playlist or track extraction, a track
+    download) takes one token. Tokens refill at ``rate`` per second up to
+    ``burst``. When a worker reports throttling, every worker is paused for an
+    exponentially growing backoff period until a request succeeds again.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 3,
+        backoff_base: float = 30.0,
+        backoff_max: float = 600.0,
+    ):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate (float): Requests per second. Defaults to 1.0.
+            burst (int): Maximum number of requests issued back to back. Defaults to 3.
+            backoff_base (float): First backoff period in seconds after throttling. Defaults to 30.
+            backoff_max (float): Upper bound of the backoff period in seconds. Defaults to 600.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._throttle_count = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be issued.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def throttled(self) -> float:
+        """
+        Report a throttled request (HTTP 429/403) and back off all workers.
+
+        Reports arriving while the workers are already backing off belong to the
+        same throttling event (requests that were in flight when it started),
+        so they do not lengthen the backoff.
+
+        Returns:
+            float: The backoff period in seconds, or the rest of the current one.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            delay = min(self.backoff_base * 2**self._throttle_count, self.backoff_max)
+            self._throttle_count += 1
+            self._blocked_until = now + delay
+            self._tokens = 0.0
+        logger.warning(f"Throttled by SoundCloud, pausing requests for {delay:.0f}s")
+        return delay
+
+    def succeeded(self) -> None:
+        """Report a successful request, resetting the backoff period."""
+        with self._lock:
+            self._throttle_count = 0
@@ -0,0 +1,138 @@
+import shutil, subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+from soundclouddownloader.policy import CODEC_EXTS
+
+# FFmpeg encoder of each codec a rendition may use
+ENCODERS = {
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "aac": "aac",
+    "vorbis": "libvorbis",
+    "flac": "flac",
+    "wav": "pcm_s16le",
+}
+
+# Lossless codecs take no bitrate
+LOSSLESS_CODECS = ("flac", "wav")
+
+
+@dataclass(frozen=True)
+class Rendition:
+    codec: str
+    # Bitrate in kbps, ignored by lossless codecs
+    quality: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rendition":
+        """
+        Parse a rendition such as ``mp3@192``, ``opus@128`` or ``flac``.
+
+        Args:
+            spec (str): The codec, followed by ``@`` and the bitrate in kbps for lossy codecs.
+
+        Returns:
+            Rendition: The rendition.
+
+        Raises:
+            ValueError: If the codec is unknown or a lossy codec lacks a bitrate.
+        """
+        codec, _, quality = spec.strip().lower().partition("@")
+        if codec not in ENCODERS:
+            raise ValueError(
+                f"Unknown codec '{codec}' in rendition '{spec}', "
+                f"expected one of: {', '.join(ENCODERS)}"
+            )
+        if codec in LOSSLESS_CODECS:
+            return cls(codec)
+        if not quality.isdigit():
+            raise ValueError(f"Rendition '{spec}' needs a bitrate in kbps, e.g. {codec}@192")
+        return cls(codec, quality)
+
+    @property
+    def name(self) -> str:
+        """The name of the rendition's directory, e.g. ``mp3-192``."""
+        return f"{self.codec}-{self.quality}" if self.quality else self.codec
+
+    @property
+    def ext(self) -> str:
+        return CODEC_EXTS[self.codec]
+
+    def output_path(self, playlist_dir: Path, stem: str) -> Path:
+        """Get where a track of a playlist is saved in this rendition."""
+        return Path(playlist_dir) / self.name / f"{stem}.{self.ext}"
+
+
+def parse_renditions(specs: Sequence[Union[str, Rendition]]) -> List[Rendition]:
+    """
+    Parse several renditions, dropping duplicates.
+
+    Args:
+        specs (Sequence[Union[str, Rendition]]): Renditions or their specs, e.g. ``mp3@192``.
+
+    Returns:
+        List[Rendition]: The renditions, in the given order.
+    """
+    renditions = [spec if isinstance(spec, Rendition) else Rendition.parse(spec) for spec in specs]
+    return list(dict.fromkeys(renditions))
+
+
+def fanout_command(
+    ffmpeg: str, source: Path, outputs: Dict[Rendition, Path]
+) -> List[str]:
+    """
+    Build one FFmpeg command producing every rendition of a source file.
+
+    FFmpeg decodes the source once and hands the decoded audio to one encoder
+    per output; recent FFmpeg versions run each output's encoder in a thread
+    of its own.
+
+    Args:
+        ffmpeg (str): The FFmpeg executable.
+        source (Path): The downloaded audio.
+        outputs (Dict[Rendition, Path]): Where to write each rendition.
+
+    Returns:
+        List[str]: The command line.
+    """
+    command = [ffmpeg, "-v", "error", "-nostdin", "-y", "-i", str(source)]
+    for rendition, path in outputs.items():
+        command += ["-map", "0:a", "-map_metadata", "0", "-c:a", ENCODERS[rendition.codec]]
+        if rendition.quality:
+            command += ["-b:a", f"{rendition.quality}k"]
+        command.append(str(path))
+    return command
+
+
+def encode_renditions(
+    source: Path, outputs: Dict[Rendition, Path], ffmpeg: Optional[str] = None
+) -> None:
+    """
+    Encode a downloaded track into every rendition in a single FFmpeg run.
+
+    Outputs are removed again if FFmpeg fails, so that no rendition is left
+    half written.
+
+    Args:
+        source (Path): The downloaded audio.
+        outputs (Dict[Rendition, Path]): Where to write each rendition; missing
+            directories are created.
+        ffmpeg (Optional[str]): The FFmpeg executable. Defaults to ``ffmpeg`` on the PATH.
+
+    Raises:
+        RuntimeError: If FFmpeg is missing or fails.
+    """
+    ffmpeg = ffmpeg or shutil.which("ffmpeg")
+    if not ffmpeg:
+        raise RuntimeError("FFmpeg not found, it is needed to encode renditions")
+    for path in outputs.values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+    process = subprocess.run(
+        fanout_command(ffmpeg, source, outputs), capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        for path in outputs.values():
+            path.unlink(missing_ok=True)
+        error = process.stderr.strip().splitlines()
+        raise RuntimeError(f"FFmpeg failed: {error[-1] if error else process.returncode}")
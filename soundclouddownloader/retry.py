@@ -0,0 +1,190 @@
+import heapq, itertools, random, re, threading, time
+from dataclasses import dataclass
+from http.client import IncompleteRead
+from typing import List, Optional, Tuple
+from loguru import logger
+from soundclouddownloader.dataclass import Track
+from soundclouddownloader.metrics import TrackMetrics
+from soundclouddownloader.ratelimit import is_throttled
+from soundclouddownloader.concurrency import is_timeout
+
+# Classes of track failures
+FAILURE_TRANSIENT = "transient"
+FAILURE_THROTTLED = "throttled"
+FAILURE_GEO_RESTRICTED = "geo-restricted"
+FAILURE_PERMANENT = "permanent"
+
+# Failures worth trying again later
+RETRYABLE_FAILURES = (FAILURE_TRANSIENT, FAILURE_THROTTLED)
+
+DEFAULT_RETRY_BUDGET = 50
+
+_SERVER_ERROR_RE = re.compile(r"HTTP Error 5\d\d")
+_TRANSIENT_ERRORS = (ConnectionError, IncompleteRead)
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify the error a track failed with.
+
+    Args:
+        error (BaseException): The error raised while downloading the track.
+
+    Returns:
+        str: ``"throttled"`` for HTTP 429/403, ``"transient"`` for timeouts,
+        dropped connections and 5xx responses, ``"geo-restricted"`` for tracks
+        not available in the client's country and ``"permanent"`` otherwise.
+    """
+    if is_throttled(error):
+        return FAILURE_THROTTLED
+    if is_timeout(error):
+        return FAILURE_TRANSIENT
+    message = str(error)
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if type(error).__name__ == "GeoRestrictedError":
+            return FAILURE_GEO_RESTRICTED
+        if isinstance(error, _TRANSIENT_ERRORS):
+            return FAILURE_TRANSIENT
+        status = getattr(error, "status", None) or getattr(error, "code", None)
+        if isinstance(status, int) and 500 <= status < 600:
+            return FAILURE_TRANSIENT
+        exc_info = getattr(error, "exc_info", None)
+        error = (
+            getattr(error, "cause", None)
+            or (exc_info[1] if exc_info else None)
+            or error.__cause__
+        )
+    if _SERVER_ERROR_RE.search(message):
+        return FAILURE_TRANSIENT
+    return FAILURE_PERMANENT
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    # Retries of a single track
+    max_retries: int = 3
+    # Retries of all tracks of a run together
+    budget: int = DEFAULT_RETRY_BUDGET
+    base_delay: float = 5.0
+    max_delay: float = 300.0
+
+    def delay(self, retries: int) -> float:
+        """
+        Get the seconds to wait before retrying a track.
+
+        The delay grows exponentially with the retries made before and is
+        jittered, so that tracks which failed together do not retry together.
+
+        Args:
+            retries (int): Retries of the track so far.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = min(self.base_delay * 2**retries, self.max_delay)
+        # Equal jitter: between half and all of the delay
+        return random.uniform(delay / 2, delay)
+
+
+class RetryQueue:
+    """
+    Tracks deferred for another attempt after a transient failure.
+
+    A failed track is deferred if its failure is retryable (transient or
+    throttled), it has retries left and the run's retry budget is not used
+    up. The delay grows exponentially with the track's retries and is
+    jittered, so that tracks which failed together do not retry together.
+    Schedulers resubmit the tracks returned by :meth:`due`.
+    """
+
+    def __init__(self, policy: Optional[RetryPolicy] = None):
+        """
+        Initialize the queue.
+
+        Args:
+            policy (Optional[RetryPolicy]): Limits and delays. Defaults to ``RetryPolicy()``.
+        """
+        self.policy = policy or RetryPolicy()
+        self.spent = 0
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, Track]] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def backoff(self, track: Track, metrics: TrackMetrics) -> Optional[float]:
+        """
+        Take a retry of a failed track from the budget.
+
+        On success the track's failure is cleared and its retries counted, and
+        its cached info dict is dropped so that it is resolved again.
+
+        Args:
+            track (Track): The track.
+            metrics (TrackMetrics): The track's metrics, holding the failure.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the
+            track must not be retried.
+        """
+        if metrics.failure not in RETRYABLE_FAILURES:
+            return None
+        with self._lock:
+            if metrics.retries >= self.policy.max_retries or self.spent >= self.policy.budget:
+                return None
+            self.spent += 1
+        delay = self.policy.delay(metrics.retries)
+        logger.info(
+            f"Retrying '{track.title}' in {delay:.0f}s after {metrics.failure} failure: "
+            f"{metrics.error}"
+        )
+        metrics.retries += 1
+        metrics.error = None
+        metrics.failure = None
+        track.info = None
+        return delay
+
+    def defer(self, track: Track, metrics: TrackMetrics) -> bool:
+        """
+        Defer a failed track for a retry.
+
+        Args:
+            track (Track): The track.
+            metrics (TrackMetrics): The track's metrics, holding the failure.
+
+        Returns:
+            bool: True if the track was deferred, False if it failed for good.
+        """
+        delay = self.backoff(track, metrics)
+        if delay is None:
+            return False
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._order), track))
+        return True
+
+    def due(self) -> List[Track]:
+        """Take the deferred tracks whose delay has passed."""
+        now = time.monotonic()
+        tracks = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                tracks.append(heapq.heappop(self._heap)[2])
+        return tracks
+
+    def drain(self) -> List[Track]:
+        """Take every deferred track, due or not, e.g. when the run is cancelled."""
+        with self._lock:
+            tracks = [track for _, _, track in sorted(self._heap)]
+            self._heap.clear()
+        return tracks
+
+    def wait_time(self) -> float:
+        """Seconds until the next deferred track is due."""
+        with self._lock:
+            if not self._heap:
+                return 0.0
+            return max(0.0, self._heap[0][0] - time.monotonic())
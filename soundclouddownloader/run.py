@@ -0,0 +1,294 @@
+import shutil, threading, time, uuid
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from soundclouddownloader.utils import clean_filename
+from soundclouddownloader.dataclass import Track, Playlist
+from soundclouddownloader.manifest import DownloadManifest
+from soundclouddownloader.archive import StreamingZipWriter, archived_members
+from soundclouddownloader.concurrency import ConcurrencyController
+from soundclouddownloader.bandwidth import BandwidthLimiter
+from soundclouddownloader.metrics import (
+    MetricsRecorder,
+    RunReport,
+    TrackMetrics,
+    STAGE_ARCHIVE,
+    TRACK_COMPLETED,
+    TRACK_FAILED,
+    TRACK_SKIPPED,
+)
+
+
+class PlaylistRun:
+    """
+    The bookkeeping of one playlist download, independent of how tracks are scheduled.
+
+    A run owns the playlist directory, the download manifest and, when zipping,
+    the streaming archive. Schedulers ask :meth:`schedule` whether a track still
+    needs downloading, report every outcome through :meth:`record` and call
+    :meth:`finish` once all tracks are done. The metrics of every track are
+    collected into the run's :class:`RunReport`.
+
+    A run only keeps counters of finished tracks, so its memory use does not
+    grow with the size of the playlist unless the report keeps every track's
+    metrics (``keep_tracks``).
+    """
+
+    def __init__(
+        self,
+        playlist: Playlist,
+        output_dir: Path,
+        should_zip: bool = False,
+        zip_compression: str = "stored",
+        resume: bool = True,
+        metrics: Optional[MetricsRecorder] = None,
+        report_dir: Optional[Path] = None,
+        keep_tracks: bool = True,
+        concurrency: Optional[ConcurrencyController] = None,
+        bandwidth: Optional[BandwidthLimiter] = None,
+    ):
+        """
+        Create the playlist directory and open the manifest and archive.
+
+        Args:
+            playlist (Playlist): The playlist being downloaded (tracks may be empty
+                when the playlist is enumerated lazily).
+            output_dir (Path): The directory holding the playlist directory.
+            should_zip (bool): Whether to stream finished tracks into a zip file.
+            zip_compression (str): Compression of the zip archive.
+            resume (bool): Skip tracks completed by a previous run.
+            metrics (Optional[MetricsRecorder]): Recorder holding the metrics of the
+                tracks in flight.
+            report_dir (Optional[Path]): Directory receiving the run's JSON report and
+                Prometheus text file. Defaults to None (no report files).
+            keep_tracks (bool): Keep the metrics of every track in the report, not
+                only the totals and failures. Defaults to True.
+            concurrency (Optional[ConcurrencyController]): The downloader's adaptive
+                concurrency, whose final limit is added to the report.
+            bandwidth (Optional[BandwidthLimiter]): The downloader's bandwidth cap,
+                which is added to the report.
+        """
+        self.id = uuid.uuid4().hex
+        self.playlist = playlist
+        self.output_dir = Path(output_dir)
+        self.playlist_name = clean_filename(playlist.title)
+        self.playlist_dir = self.output_dir / self.playlist_name
+        self.playlist_dir.mkdir(exist_ok=True)
+        self.should_zip = should_zip
+        self.resume = resume
+        self.zip_filename = self.output_dir / f"{self.playlist_name}.zip"
+
+        self.downloaded = 0
+        self.failed = 0
+        self.already_downloaded = 0
+        self.scheduled = 0
+
+        self.metrics = metrics
+        self.concurrency = concurrency
+        self.bandwidth = bandwidth
+        self.report_dir = Path(report_dir) if report_dir else None
+        self.report = RunReport(
+            playlist_id=str(playlist.id), playlist_title=playlist.title, keep_tracks=keep_tracks
+        )
+        # Metrics of tracks waiting to be archived
+        self._metrics_by_path: Dict[Path, TrackMetrics] = {}
+        # The archive writer thread adds to the report too
+        self._report_lock = threading.Lock()
+
+        self.manifest = DownloadManifest.for_directory(self.output_dir)
+        # A resumed zipped run adds to the archive of the previous run
+        self._members = archived_members(self.zip_filename) if should_zip and resume else {}
+        self.archive = (
+            StreamingZipWriter(
+                self.zip_filename,
+                self.playlist_dir,
+                compression=zip_compression,
+                on_archived=self._archived,
+                append=bool(self._members),
+            )
+            if should_zip
+            else None
+        )
+        self._closed = False
+
+    @property
+    def total_tracks(self) -> int:
+        return self.scheduled + self.already_downloaded
+
+    def schedule(self, track: Track) -> Optional[Track]:
+        """
+        Decide whether a track has to be downloaded.
+
+        Tracks completed by a previous run are counted as downloaded right away.
+
+        Args:
+            track (Track): The track to consider.
+
+        Returns:
+            Optional[Track]: The track to download, tagged with the run so that its
+            metrics are kept apart from other runs', or None if it is not downloaded.
+        """
+        existing = (
+            self.manifest.completed_path(
+                self.playlist.id, track.id, self._members if self.archive else None
+            )
+            if self.resume
+            else None
+        )
+        if existing:
+            logger.debug(f"Already downloaded: {existing}")
+            self.downloaded += 1
+            self.already_downloaded += 1
+            # Tracks already in the archive stay there
+            archiving = self.archive is not None and not existing.samefile(self.zip_filename)
+            self._add_metrics(
+                TrackMetrics(track.id, track.title, status=TRACK_SKIPPED, path=str(existing)),
+                existing if archiving else None,
+            )
+            if archiving:
+                self._mark_completed(track, existing)
+                self.archive.add(existing)
+            return None
+        self.manifest.mark_pending(self.playlist.id, track)
+        self.scheduled += 1
+        return replace(track, run=self.id)
+
+    def record(
+        self, track: Track, filepath: Optional[Path], metrics: Optional[TrackMetrics] = None
+    ) -> None:
+        """
+        Record the outcome of a scheduled track.
+
+        Args:
+            track (Track): The track.
+            filepath (Optional[Path]): Its final path, or None if it failed.
+            metrics (Optional[TrackMetrics]): The track's metrics. Defaults to the
+                ones held by the run's recorder.
+        """
+        if metrics is None:
+            if self.metrics:
+                metrics = self.metrics.finish(track, filepath)
+            else:
+                metrics = TrackMetrics(track.id, track.title)
+        else:
+            metrics = replace(metrics, stages=dict(metrics.stages))
+        metrics.status = TRACK_COMPLETED if filepath else TRACK_FAILED
+        metrics.path = str(filepath) if filepath else None
+        # Registered before archiving, whose timing is added from the writer thread
+        self._add_metrics(metrics, filepath)
+
+        if filepath:
+            self.downloaded += 1
+            self._mark_completed(track, filepath)
+            if self.archive:
+                self.archive.add(filepath)
+        else:
+            self.failed += 1
+            self.manifest.mark_failed(self.playlist.id, track)
+
+    def _mark_completed(self, track: Track, filepath: Path) -> None:
+        if self.archive:
+            # The file is removed once archived, the manifest points into the archive
+            self.manifest.mark_completed(
+                self.playlist.id,
+                track,
+                filepath,
+                archive=self.zip_filename,
+                member=self.archive.member_name(filepath),
+            )
+        else:
+            self.manifest.mark_completed(self.playlist.id, track, filepath)
+
+    def _add_metrics(self, metrics: TrackMetrics, filepath: Optional[Path]) -> None:
+        with self._report_lock:
+            self.report.add(metrics)
+            if filepath and self.archive:
+                self._metrics_by_path[Path(filepath)] = metrics
+
+    def _archived(self, file: Path, seconds: float) -> None:
+        with self._report_lock:
+            metrics = self._metrics_by_path.pop(file, None)
+            if metrics is not None:
+                self.report.add_stage(metrics, STAGE_ARCHIVE, seconds)
+        if metrics is not None:
+            if self.metrics:
+                self.metrics.emit(metrics, STAGE_ARCHIVE)
+
+    def write_report(self) -> None:
+        """Write the run's JSON report and Prometheus text file into ``report_dir``."""
+        if not self.report_dir:
+            return
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            json_path = self.report.write_json(self.report_dir / f"{self.playlist_name}.report.json")
+            self.report.write_prometheus(self.report_dir / f"{self.playlist_name}.prom")
+        except OSError as e:
+            logger.error(f"Failed to write run report: {str(e)}")
+            return
+        logger.info(f"Run report written to {json_path}")
+
+    def close(self) -> None:
+        """Close the manifest and finalize the archive."""
+        if self._closed:
+            return
+        self._closed = True
+        self.manifest.close()
+        if self.archive:
+            self.archive.close()
+
+    def finish(self) -> Optional[Path]:
+        """
+        Close the run, log its summary and put the output in its final place.
+
+        Returns:
+            Optional[Path]: The path to the zipped playlist or playlist directory, or None if no track was downloaded.
+        """
+        self.close()
+        if self.bandwidth:
+            self.report.bandwidth_limit = self.bandwidth.limit
+        result = self._finalize()
+        self.report.finished_at = time.time()
+        if self.concurrency:
+            self.report.concurrency = self.concurrency.limit
+        self.report.result = str(result) if result else None
+        self.write_report()
+        return result
+
+    def _finalize(self) -> Optional[Path]:
+        # Log summary
+        logger.info(
+            f"Download complete: {self.downloaded}/{self.total_tracks} tracks downloaded"
+        )
+        if self.already_downloaded:
+            logger.info(
+                f"{self.already_downloaded} track(s) were already downloaded by a previous run"
+            )
+        failed_tracks = [
+            f"{metrics.title} ({metrics.failure or 'error'}: {metrics.error})"
+            if metrics.error
+            else metrics.title
+            for metrics in self.report.failures
+        ]
+        if self.report.bandwidth_limit:
+            logger.info(
+                f"Downloaded {self.report.bytes_downloaded / self.report.duration / 1024**2:.2f} MB/s "
+                f"on average, capped at {self.report.bandwidth_limit / 1024**2:.2f} MB/s"
+            )
+        if failed_tracks:
+            logger.warning(f"Skipped {len(failed_tracks)} track(s): {', '.join(failed_tracks[:5])}")
+            if len(failed_tracks) > 5:
+                logger.warning(f"... and {len(failed_tracks) - 5} more")
+
+        if self.downloaded:
+            if self.should_zip:
+                # Tracks were archived and removed as they completed
+                shutil.rmtree(self.playlist_dir)
+                return self.zip_filename
+            else:
+                return self.playlist_dir
+        else:
+            if self.should_zip:
+                self.zip_filename.unlink(missing_ok=True)
+            logger.error("No files were successfully downloaded.")
+            return None
@@ -0,0 +1,105 @@
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Tuple
+from loguru import logger
+
+if TYPE_CHECKING:
+    import yt_dlp
+
+
+class YoutubeDLSessionPool:
+    """
+    A pool of long-lived ``YoutubeDL`` instances, one per worker thread.
+
+    Building a ``YoutubeDL`` re-initialises its extractors and HTTP session,
+    so every new instance repeats TLS handshakes and SoundCloud's client_id
+    discovery. The pool hands each thread its own instance for a given kind of
+    work (``name``) and keeps it for the whole run, so connections, cookies and
+    the resolved client_id are reused from track to track. Instances are never
+    shared between threads. An instance is closed and dropped when work on it
+    raises, and transparently re-created on next use.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[threading.Thread, str], "yt_dlp.YoutubeDL"] = {}
+
+    def get(self, name: str, ydl_opts: Dict[str, Any]) -> "yt_dlp.YoutubeDL":
+        """
+        Get the calling thread's instance for a kind of work.
+
+        Args:
+            name (str): Identifies the kind of work, e.g. "fetch".
+            ydl_opts (Dict[str, Any]): Options used if the instance has to be created.
+
+        Returns:
+            yt_dlp.YoutubeDL: The thread's instance.
+        """
+        key = (threading.current_thread(), name)
+        with self._lock:
+            ydl = self._sessions.get(key)
+        if ydl is None:
+            import yt_dlp
+
+            ydl = yt_dlp.YoutubeDL(dict(ydl_opts))
+            with self._lock:
+                self._sessions[key] = ydl
+        return ydl
+
+    def discard(self, name: str) -> None:
+        """
+        Close and drop the calling thread's instance for a kind of work.
+
+        Args:
+            name (str): Identifies the kind of work.
+        """
+        with self._lock:
+            ydl = self._sessions.pop((threading.current_thread(), name), None)
+        if ydl is not None:
+            self._close(ydl)
+
+    @contextmanager
+    def session(self, name: str, ydl_opts: Dict[str, Any]) -> Iterator["yt_dlp.YoutubeDL"]:
+        """
+        Use the calling thread's instance, re-creating it next time if it errors.
+
+        Args:
+            name (str): Identifies the kind of work.
+            ydl_opts (Dict[str, Any]): Options used if the instance has to be created.
+
+        Yields:
+            yt_dlp.YoutubeDL: The thread's instance.
+        """
+        ydl = self.get(name, ydl_opts)
+        try:
+            yield ydl
+        except BaseException:
+            self.discard(name)
+            raise
+
+    def prune(self) -> None:
+        """Close the instances of threads that have exited."""
+        with self._lock:
+            dead = [key for key in self._sessions if not key[0].is_alive()]
+            sessions = [self._sessions.pop(key) for key in dead]
+        for ydl in sessions:
+            self._close(ydl)
+
+    def close(self) -> None:
+        """Close every instance in the pool."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for ydl in sessions:
+            self._close(ydl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    @staticmethod
+    def _close(ydl: "yt_dlp.YoutubeDL") -> None:
+        try:
+            ydl.close()
+        except Exception as e:
+            logger.debug(f"Failed to close yt-dlp session: {str(e)}")
@@ -0,0 +1,205 @@
+import hashlib, sqlite3, threading, time
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+from soundclouddownloader.utils import link_file
+
+STORE_INDEX_FILENAME = "index.sqlite"
+
+# 10 GiB
+DEFAULT_STORE_MAX_SIZE = 10 * 1024**3
+
+
+def store_key(track_id: str, output_format: str) -> str:
+    """
+    Build the store key of a track in a given output format.
+
+    Args:
+        track_id (str): The ``Track.id``.
+        output_format (str): Identifies how the file was produced, e.g.
+            ``"transcode-mp3-192"``.
+
+    Returns:
+        str: The key.
+    """
+    return f"{track_id}:{output_format}"
+
+
+class TrackStore:
+    """
+    A local store of finished tracks shared by all playlists and runs.
+
+    Each file is stored once under the hash of its key, a track id plus the
+    output format it was produced in, so the same track in another playlist or
+    a later run is materialised by hardlink instead of being downloaded and
+    transcoded again. A SQLite index records the original filename, size and
+    last use of every entry; once the store grows beyond ``max_size`` the least
+    recently used entries are evicted. Evicting an entry never affects files
+    already linked into playlist directories.
+    """
+
+    def __init__(self, root: Path, max_size: int = DEFAULT_STORE_MAX_SIZE):
+        """
+        Open (or create) the store.
+
+        Args:
+            root (Path): The store directory.
+            max_size (int): Maximum total size of the stored files in bytes.
+                Defaults to 10 GiB.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.root / STORE_INDEX_FILENAME), check_same_thread=False
+        )
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+
+    def _path_for(self, key: str, suffix: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        Look up a stored file, marking it as recently used.
+
+        Args:
+            key (str): The store key.
+
+        Returns:
+            Optional[Path]: The stored file, or None if the key is not stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            path = self.root / row[0]
+            try:
+                valid = path.stat().st_size == row[1]
+            except OSError:
+                valid = False
+            with self._conn:
+                if not valid:
+                    logger.debug(f"Store entry for {key} is stale: {path}")
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    return None
+                self._conn.execute(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key)
+                )
+        return path
+
+    def filename(self, key: str) -> Optional[str]:
+        """Get the original filename of a stored file."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT filename FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, file: Path) -> Optional[Path]:
+        """
+        Add a finished file to the store, evicting old entries if needed.
+
+        Files larger than ``max_size`` are not stored, since keeping them would
+        evict every other entry without ever fitting the store.
+
+        Args:
+            key (str): The store key.
+            file (Path): The file, which stays in place and is linked into the store.
+
+        Returns:
+            Optional[Path]: The stored file, or None if it is too large to store.
+        """
+        file = Path(file)
+        size = file.stat().st_size
+        if size > self.max_size:
+            logger.debug(f"Not storing '{file.name}': {size} bytes exceed the store size")
+            return None
+        path = self._path_for(key, file.suffix)
+        path.parent.mkdir(exist_ok=True)
+        link_file(file, path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO entries (key, path, filename, size, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, str(path.relative_to(self.root)), file.name, size, time.time()),
+            )
+        self.evict(keep=key)
+        return path
+
+    def materialise(self, key: str, directory: Path) -> Optional[Path]:
+        """
+        Link a stored file into a directory under its original filename.
+
+        Args:
+            key (str): The store key.
+            directory (Path): The destination directory.
+
+        Returns:
+            Optional[Path]: The linked file, or None if the key is not stored.
+        """
+        path = self.get(key)
+        filename = self.filename(key)
+        if path is None or filename is None:
+            return None
+        return link_file(path, Path(directory) / filename)
+
+    def size(self) -> int:
+        """Get the total size of the stored files in bytes."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove least recently used entries until the store fits ``max_size``.
+
+        Args:
+            keep (Optional[str]): A key that is never evicted, such as the entry
+                that was just added.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        evicted = 0
+        with self._lock:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            if total <= self.max_size:
+                return 0
+            rows = self._conn.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_used"
+            ).fetchall()
+            with self._conn:
+                for key, path, size in rows:
+                    if total <= self.max_size:
+                        break
+                    if key == keep:
+                        continue
+                    (self.root / path).unlink(missing_ok=True)
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    total -= size
+                    evicted += 1
+        logger.debug(f"Evicted {evicted} track(s) from the store")
+        return evicted
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -1,9 +1,38 @@
-import os, re, zipfile
+import os, re, shutil, sys, zipfile
 from urllib.parse import urlparse
 from pathlib import Path
 from unidecode import unidecode
 from loguru import logger
-from typing import List
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux ioctl cloning a file's extents (reflink) on copy-on-write filesystems
+FICLONE = 0x40049409
+
+
+def setup_logging(
+    log_file: Optional[str] = "soundcloud_downloader.log", level: str = "INFO"
+) -> None:
+    """
+    Configure logging for the command-line entry points.
+
+    Importing the package leaves the global loguru logger untouched, so
+    applications embedding the downloader keep their own logging setup. The
+    entry points call this to log to stderr and to a rotating log file.
+
+    Args:
+        log_file (Optional[str]): The log file, or None to log to stderr only.
+            Defaults to "soundcloud_downloader.log" in the working directory.
+        level (str): The minimum level logged. Defaults to "INFO".
+    """
+    logger.remove()
+    logger.add(sys.stderr, level=level)
+    if log_file:
+        logger.add(log_file, rotation="10 MB", level=level)
 
 
 def validate_url(url: str) -> bool:
@@ -65,6 +94,72 @@ def clean_filename(filename: str) -> str:
     return filename
 
 
+def link_file(source: Path, destination: Path) -> Path:
+    """
+    Materialise a file at another path without copying its data where possible.
+
+    The file is hardlinked. Where the filesystem does not support hardlinks it
+    is reflinked (copy-on-write clone, Linux only), and copied as a last resort.
+
+    Args:
+        source (Path): The existing file.
+        destination (Path): Where the file should appear.
+
+    Returns:
+        Path: The destination path.
+    """
+    source, destination = Path(source), Path(destination)
+    if destination.exists():
+        if destination.samefile(source):
+            return destination
+        destination.unlink()
+    try:
+        os.link(source, destination)
+    except OSError as e:
+        logger.debug(f"Hardlink failed for '{source}': {str(e)}")
+        if not _reflink(source, destination):
+            shutil.copy2(source, destination)
+    return destination
+
+
+def _reflink(source: Path, destination: Path) -> bool:
+    if not hasattr(fcntl, "ioctl") or sys.platform != "linux":
+        return False
+    try:
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        destination.unlink(missing_ok=True)
+        return False
+    shutil.copystat(source, destination)
+    return True
+
+
+def read_url_file(path: Path) -> List[str]:
+    """
+    Read playlist URLs from a text file.
+
+    The file holds one URL per line. Blank lines and lines starting with ``#``
+    are ignored, and invalid URLs are skipped with a warning.
+
+    Args:
+        path (Path): The file to read.
+
+    Returns:
+        List[str]: The URLs, in file order.
+    """
+    urls = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if validate_url(line):
+            urls.append(line)
+        else:
+            logger.warning(f"Skipping invalid URL in {path}: {line}")
+    return urls
+
+
 def create_zip(files: List[Path], zip_filename: Path, source_dir: Path) -> None:
     """
     Create a zip file containing the downloaded tracks.
@@ -0,0 +1,351 @@
+import json, sqlite3, threading, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from soundclouddownloader.dataclass import Track, Playlist
+
+# Seconds a worker may hold a track without renewing its lease
+DEFAULT_LEASE_TIMEOUT = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+JOB_QUEUED = "queued"
+JOB_LEASED = "leased"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+@dataclass(slots=True)
+class Job:
+    playlist_id: str
+    playlist_title: str
+    track: Track
+    # Number of times the track has been leased, including this lease
+    attempts: int
+
+
+class WorkQueue:
+    """
+    A job queue of tracks shared by several downloader processes or hosts.
+
+    A coordinator publishes the tracks of playlists (:meth:`publish`); any
+    number of workers, on one machine or on several machines mounting the
+    same file, lease tracks (:meth:`lease`), download them and record the
+    outcome (:meth:`complete`, :meth:`fail`). Leases expire unless the worker
+    renews them (:meth:`extend`), so the tracks of a crashed or stalled worker
+    are issued again to another worker. A track is given up after
+    ``max_attempts`` leases.
+
+    The queue is a SQLite file: every lease is taken in an immediate
+    transaction, so concurrent workers never receive the same track. Keep the
+    file on storage with working POSIX locks (local disks, NFSv4) rather than
+    on filesystems known to break SQLite locking.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path (Path): Path of the SQLite file.
+            lease_timeout (float): Seconds after which a lease that was not renewed
+                expires. Defaults to five minutes.
+            max_attempts (int): Leases of a track before it is marked failed. Defaults to 3.
+        """
+        self.path = Path(path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Transactions are explicit, so that leases can lock the database up front
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                playlist_id TEXT NOT NULL,
+                playlist_title TEXT NOT NULL,
+                track_id TEXT NOT NULL,
+                track TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                path TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                available_at REAL,
+                PRIMARY KEY (playlist_id, track_id)
+            )
+            """
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        # Queues created before failed tracks were retried after a delay
+        if "available_at" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+
+    def _transaction(self, immediate: bool = False):
+        self._conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+    def publish(self, playlist: Playlist) -> int:
+        """
+        Queue the tracks of a playlist.
+
+        Tracks already completed or in progress are left alone; tracks that
+        failed are queued again with fresh attempts.
+
+        Args:
+            playlist (Playlist): The resolved playlist.
+
+        Returns:
+            int: The number of tracks queued.
+        """
+        now = time.time()
+        with self._lock:
+            self._transaction()
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    """
+                    INSERT INTO jobs (playlist_id, playlist_title, track_id, track, status, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (playlist_id, track_id) DO UPDATE SET
+                        status = excluded.status,
+                        attempts = 0,
+                        error = NULL,
+                        updated_at = excluded.updated_at
+                    WHERE jobs.status = ?
+                    """,
+                    [
+                        (
+                            str(playlist.id),
+                            playlist.title,
+                            track.id,
+                            json.dumps(
+                                {
+                                    "id": track.id,
+                                    "title": track.title,
+                                    "artist": track.artist,
+                                    "url": track.url,
+                                }
+                            ),
+                            JOB_QUEUED,
+                            now,
+                            JOB_FAILED,
+                        )
+                        for track in playlist.tracks
+                    ],
+                )
+                queued = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Queued {queued} track(s) of playlist '{playlist.title}'")
+        return queued
+
+    def lease(self, worker: str, limit: int = 1) -> List[Job]:
+        """
+        Lease queued tracks, or tracks whose lease expired.
+
+        Failed tracks queued again are only leased once their retry delay passed.
+
+        Args:
+            worker (str): A name identifying the worker, unique across hosts.
+            limit (int): Maximum number of tracks to lease. Defaults to 1.
+
+        Returns:
+            List[Job]: The leased tracks, possibly none.
+        """
+        if limit <= 0:
+            return []
+        now = time.time()
+        with self._lock:
+            self._transaction(immediate=True)
+            try:
+                # Tracks whose last lease expired are given up once out of attempts
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET status = ?, error = ?, worker = NULL,
+                        lease_expires = NULL, updated_at = ?
+                    WHERE status = ? AND lease_expires < ? AND attempts >= ?
+                    """,
+                    (JOB_FAILED, "lease expired", now, JOB_LEASED, now, self.max_attempts),
+                )
+                rows = self._conn.execute(
+                    """
+                    SELECT playlist_id, playlist_title, track_id, track, attempts FROM jobs
+                    WHERE (status = ? AND (available_at IS NULL OR available_at <= ?))
+                        OR (status = ? AND lease_expires < ?)
+                    ORDER BY rowid LIMIT ?
+                    """,
+                    (JOB_QUEUED, now, JOB_LEASED, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    """
+                    UPDATE jobs SET status = ?, worker = ?, lease_expires = ?,
+                        attempts = attempts + 1, updated_at = ?
+                    WHERE playlist_id = ? AND track_id = ?
+                    """,
+                    [
+                        (JOB_LEASED, worker, now + self.lease_timeout, now, row[0], row[2])
+                        for row in rows
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            Job(
+                playlist_id=playlist_id,
+                playlist_title=playlist_title,
+                track=Track(**json.loads(track)),
+                attempts=attempts + 1,
+            )
+            for playlist_id, playlist_title, _, track, attempts in rows
+        ]
+
+    def extend(self, worker: str) -> int:
+        """
+        Renew every lease held by a worker.
+
+        Args:
+            worker (str): The worker.
+
+        Returns:
+            int: The number of leases renewed.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE worker = ? AND status = ?",
+                (time.time() + self.lease_timeout, worker, JOB_LEASED),
+            )
+        return cursor.rowcount
+
+    def complete(self, job: Job, worker: str, path: Path) -> None:
+        """
+        Record that a track was downloaded.
+
+        The track counts as completed even if its lease expired meanwhile, since
+        the file exists either way.
+
+        Args:
+            job (Job): The leased track.
+            worker (str): The worker that downloaded it.
+            path (Path): The final path of the track.
+        """
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, worker = ?, lease_expires = NULL, path = ?,
+                    error = NULL, updated_at = ?
+                WHERE playlist_id = ? AND track_id = ?
+                """,
+                (JOB_COMPLETED, worker, str(path), time.time(), job.playlist_id, job.track.id),
+            )
+
+    def fail(
+        self,
+        job: Job,
+        worker: str,
+        error: Optional[str] = None,
+        retry: bool = True,
+        delay: float = 0.0,
+    ) -> None:
+        """
+        Record that a track could not be downloaded.
+
+        The track is queued again unless it ran out of attempts or ``retry`` is
+        False. Nothing is recorded if the worker lost its lease, since another
+        worker holds the track by now.
+
+        Args:
+            job (Job): The leased track.
+            worker (str): The worker that tried to download it.
+            error (Optional[str]): Why it failed.
+            retry (bool): Whether another attempt may succeed. Defaults to True.
+            delay (float): Seconds before the track is leased again. Defaults to 0.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END,
+                    worker = NULL, lease_expires = NULL, error = ?, updated_at = ?,
+                    available_at = ?
+                WHERE playlist_id = ? AND track_id = ? AND status = ? AND worker = ?
+                """,
+                (
+                    self.max_attempts if retry else 0,
+                    JOB_FAILED,
+                    JOB_QUEUED,
+                    error,
+                    now,
+                    now + delay,
+                    job.playlist_id,
+                    job.track.id,
+                    JOB_LEASED,
+                    worker,
+                ),
+            )
+
+    def release(self, worker: str) -> int:
+        """
+        Return the tracks leased by a worker to the queue, e.g. on shutdown.
+
+        Released tracks do not use up an attempt.
+
+        Args:
+            worker (str): The worker.
+
+        Returns:
+            int: The number of tracks released.
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                UPDATE jobs SET status = ?, worker = NULL, lease_expires = NULL,
+                    attempts = MAX(attempts - 1, 0), updated_at = ?
+                WHERE worker = ? AND status = ?
+                """,
+                (JOB_QUEUED, time.time(), worker, JOB_LEASED),
+            )
+        return cursor.rowcount
+
+    def counts(self, playlist_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count the tracks of the queue by status.
+
+        Args:
+            playlist_id (Optional[str]): Only count the tracks of this playlist.
+
+        Returns:
+            Dict[str, int]: The number of tracks of every status.
+        """
+        query = "SELECT status, COUNT(*) FROM jobs"
+        params: tuple = ()
+        if playlist_id is not None:
+            query += " WHERE playlist_id = ?"
+            params = (playlist_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " GROUP BY status", params).fetchall()
+        counts = dict.fromkeys((JOB_QUEUED, JOB_LEASED, JOB_COMPLETED, JOB_FAILED), 0)
+        counts.update(rows)
+        return counts
+
+    def remaining(self, playlist_id: Optional[str] = None) -> int:
+        """Count the tracks that are queued or leased."""
+        counts = self.counts(playlist_id)
+        return counts[JOB_QUEUED] + counts[JOB_LEASED]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
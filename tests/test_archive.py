@@ -0,0 +1,54 @@
+import unittest, tempfile, shutil, zipfile
+from pathlib import Path
+from soundclouddownloader.archive import StreamingZipWriter
+
+
+class TestStreamingZipWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.source_dir = self.temp_dir / "playlist"
+        self.source_dir.mkdir()
+        self.zip_filename = self.temp_dir / "playlist.zip"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_files_are_archived_and_removed(self):
+        files = []
+        with StreamingZipWriter(self.zip_filename, self.source_dir) as writer:
+            for n in range(3):
+                file = self.source_dir / f"track{n}.mp3"
+                file.write_bytes(b"audio" * 100)
+                files.append(file)
+                writer.add(file)
+            writer.add(self.source_dir / "missing.mp3")
+
+        self.assertEqual(sorted(writer.archived), files)
+        self.assertFalse(any(file.exists() for file in files))
+        with zipfile.ZipFile(self.zip_filename) as zipf:
+            self.assertEqual(
+                sorted(zipf.namelist()), ["track0.mp3", "track1.mp3", "track2.mp3"]
+            )
+            self.assertTrue(
+                all(i.compress_type == zipfile.ZIP_STORED for i in zipf.infolist())
+            )
+            self.assertEqual(zipf.read("track1.mp3"), b"audio" * 100)
+
+    def test_explicit_compression(self):
+        file = self.source_dir / "track.mp3"
+        file.write_bytes(b"audio" * 100)
+        with StreamingZipWriter(
+            self.zip_filename, self.source_dir, compression="deflated", delete_sources=False
+        ) as writer:
+            writer.add(file)
+
+        self.assertTrue(file.exists())
+        with zipfile.ZipFile(self.zip_filename) as zipf:
+            self.assertEqual(zipf.getinfo("track.mp3").compress_type, zipfile.ZIP_DEFLATED)
+
+        with self.assertRaises(ValueError):
+            StreamingZipWriter(self.zip_filename, self.source_dir, compression="rar")
+
+
+if __name__ == "__main__":
+    unittest.main()
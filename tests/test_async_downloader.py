@@ -0,0 +1,131 @@
+import asyncio, tempfile, shutil, threading, zipfile
+from pathlib import Path
+from soundclouddownloader import AsyncSoundCloudDownloader, SoundCloudDownloader
+from soundclouddownloader import Track, Playlist, FetchedTrack
+
+import unittest
+from unittest.mock import patch
+
+
+def make_playlist(count):
+    return Playlist(
+        id="playlist123",
+        title="Test Playlist",
+        tracks=[
+            Track(id=f"track{i}", title=f"Track {i}", artist="", url=f"https://soundcloud.com/track{i}")
+            for i in range(count)
+        ],
+    )
+
+
+def fake_fetch_track(track, output_dir):
+    filepath = output_dir / f"{track.title}.mp3"
+    filepath.write_bytes(b"audio")
+    return FetchedTrack(track=track, info={"id": track.id}, path=filepath)
+
+
+def fake_transcode_track(fetched):
+    return fetched.path
+
+
+class TestAsyncSoundCloudDownloader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.downloader = SoundCloudDownloader()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @patch.object(SoundCloudDownloader, "transcode_track", side_effect=fake_transcode_track)
+    @patch.object(SoundCloudDownloader, "fetch_track", side_effect=fake_fetch_track)
+    @patch.object(SoundCloudDownloader, "get_playlist_info", return_value=make_playlist(3))
+    def test_download_playlist(self, mock_get_playlist_info, mock_fetch, mock_transcode):
+        async def run():
+            async with AsyncSoundCloudDownloader(self.downloader) as downloader:
+                return await downloader.download_playlist(
+                    "https://soundcloud.com/test_playlist", self.temp_dir, should_zip=True
+                )
+
+        result = asyncio.run(run())
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist.zip")
+        self.assertEqual(mock_fetch.call_count, 3)
+        with zipfile.ZipFile(result) as zipf:
+            self.assertEqual(len(zipf.namelist()), 3)
+
+    @patch.object(SoundCloudDownloader, "transcode_track", side_effect=fake_transcode_track)
+    @patch.object(SoundCloudDownloader, "fetch_track", side_effect=fake_fetch_track)
+    def test_download_track_releases_its_metrics(self, mock_fetch, mock_transcode):
+        track = make_playlist(1).tracks[0]
+
+        async def run():
+            async with AsyncSoundCloudDownloader(self.downloader) as downloader:
+                self.downloader.metrics.get(track)
+                return await downloader.download_track(track, self.temp_dir)
+
+        self.assertEqual(asyncio.run(run()), self.temp_dir / "Track 0.mp3")
+        self.assertEqual(self.downloader.metrics._tracks, {})
+
+    @patch.object(SoundCloudDownloader, "transcode_track", side_effect=fake_transcode_track)
+    @patch.object(SoundCloudDownloader, "get_playlist_info", return_value=make_playlist(20))
+    def test_iter_download_playlist_bounds_concurrency(self, mock_get_playlist_info, mock_transcode):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def fetch_track(track, output_dir):
+            with lock:
+                active.append(track)
+                peak.append(len(active))
+            try:
+                return fake_fetch_track(track, output_dir)
+            finally:
+                with lock:
+                    active.remove(track)
+
+        async def run():
+            async with AsyncSoundCloudDownloader(self.downloader, max_concurrency=4) as downloader:
+                return [
+                    result
+                    async for result in downloader.iter_download_playlist(
+                        "https://soundcloud.com/test_playlist", self.temp_dir
+                    )
+                ]
+
+        with patch.object(SoundCloudDownloader, "fetch_track", side_effect=fetch_track):
+            results = asyncio.run(run())
+
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(filepath for _, filepath in results))
+        self.assertLessEqual(max(peak), 4)
+
+    @patch.object(SoundCloudDownloader, "transcode_track", side_effect=fake_transcode_track)
+    @patch.object(SoundCloudDownloader, "get_playlist_info", return_value=make_playlist(10))
+    def test_cancellation_stops_pending_tracks(self, mock_get_playlist_info, mock_transcode):
+        started = []
+
+        def fetch_track(track, output_dir):
+            started.append(track)
+            threading.Event().wait(0.05)
+            return fake_fetch_track(track, output_dir)
+
+        async def run():
+            async with AsyncSoundCloudDownloader(self.downloader, max_concurrency=2) as downloader:
+                task = asyncio.create_task(
+                    downloader.download_playlist(
+                        "https://soundcloud.com/test_playlist", self.temp_dir
+                    )
+                )
+                await asyncio.sleep(0.02)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        with patch.object(SoundCloudDownloader, "fetch_track", side_effect=fetch_track):
+            asyncio.run(run())
+
+        self.assertLess(len(started), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
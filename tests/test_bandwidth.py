@@ -0,0 +1,86 @@
+import unittest, tempfile, threading, time
+from pathlib import Path
+from benchmarks.server import StandInServer
+from soundclouddownloader.bandwidth import BandwidthLimiter
+from soundclouddownloader.main import SoundCloudDownloader
+
+
+class TestBandwidthLimiter(unittest.TestCase):
+    def test_paces_concurrent_downloads_evenly(self):
+        limiter = BandwidthLimiter(200 * 1024, burst=0.05)
+        counts = [0, 0, 0]
+        deadline = time.monotonic() + 0.5
+
+        def download(n):
+            while time.monotonic() < deadline:
+                limiter.consume(4096)
+                counts[n] += 4096
+
+        threads = [threading.Thread(target=download, args=(n,)) for n in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Half a second at the cap, plus the blocks admitted before the deadline
+        self.assertLess(sum(counts), 0.5 * 200 * 1024 + 4 * 4096)
+        self.assertGreater(min(counts) / max(counts), 0.8)
+        self.assertGreater(limiter.waited, 0)
+
+    def test_limit_can_be_lifted_while_waiting(self):
+        limiter = BandwidthLimiter(1024)
+        limiter.consume(100 * 1024)
+        waiter = threading.Thread(target=limiter.consume, args=(1024,))
+        waiter.start()
+        limiter.limit = None
+        waiter.join(timeout=5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(limiter.bytes, 101 * 1024)
+
+    def test_progress_hook_counts_new_bytes_only(self):
+        limiter = BandwidthLimiter()
+        for status, downloaded in (("downloading", 1000), ("downloading", 3000), ("finished", 4000)):
+            limiter.progress_hook(
+                {"status": status, "tmpfilename": "a.part", "downloaded_bytes": downloaded}
+            )
+        # A file found complete on disk was not downloaded
+        limiter.progress_hook({"status": "finished", "filename": "b", "downloaded_bytes": 500})
+        # A restarted download counts from zero again
+        limiter.progress_hook({"status": "downloading", "tmpfilename": "c", "downloaded_bytes": 800})
+        limiter.progress_hook({"status": "downloading", "tmpfilename": "c", "downloaded_bytes": 200})
+        limiter.progress_hook({"status": "downloading", "tmpfilename": "c", "downloaded_bytes": 700})
+        self.assertEqual(limiter.bytes, 4000 + 800 + 500)
+
+
+class TestBandwidthCapDownloads(unittest.TestCase):
+    def test_download_playlist_respects_cap(self):
+        with tempfile.TemporaryDirectory() as tmp, StandInServer(
+            Path(tmp) / "server", tracks=4, track_size=32 * 1024
+        ) as server:
+            downloader = SoundCloudDownloader(
+                requests_per_second=1000,
+                burst=10,
+                output_policy="native",
+                max_bandwidth=128 * 1024,
+            )
+            downloader.ydl_opts["noprogress"] = True
+            start = time.monotonic()
+            try:
+                downloader.download_playlist(
+                    server.playlist_url, Path(tmp) / "out", max_workers=4, resume=False
+                )
+            finally:
+                downloader.close()
+            elapsed = time.monotonic() - start
+
+            report = downloader.last_report.to_dict()
+            self.assertEqual(report["summary"]["completed"], 4)
+            self.assertEqual(report["bandwidth_limit"], 128 * 1024)
+            # About 128 KB at 128 KB/s, the last blocks are admitted without waiting
+            self.assertGreater(elapsed, 0.5)
+            self.assertGreaterEqual(downloader.bandwidth.bytes, 4 * 32 * 1024 * 0.9)
+            self.assertGreater(downloader.bandwidth.waited, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+from loguru import logger
+from benchmarks.bench_download import BenchConfig, sweep
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_sweep_against_stand_in_server(self):
+        configs = [
+            BenchConfig(workers=2, rate=1000, latency_ms=0, policy="native", codec="mp3", zip=zip_mode)
+            for zip_mode in (False, True)
+        ]
+
+        messages = []
+        sink = logger.add(messages.append, format="{message}")
+        self.addCleanup(logger.remove, sink)
+        results = sweep(configs, tracks=3, track_size=16 * 1024, isolated=False)
+        # The in-process runs leave the logging of the test process as it was
+        logger.info("after the sweep")
+        self.assertEqual(messages, ["after the sweep\n"])
+
+        self.assertEqual([result["completed"] for result in results], [3, 3])
+        self.assertTrue(all(result["tracks_per_second"] > 0 for result in results))
+        self.assertTrue(all(result["peak_rss_mb"] > 0 for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest, tempfile, shutil
+from pathlib import Path
+from unittest.mock import patch
+from soundclouddownloader.dataclass import Track, Playlist
+from soundclouddownloader.cache import PlaylistCache
+
+URL = "https://soundcloud.com/user/sets/playlist"
+
+
+class TestPlaylistCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache = PlaylistCache(self.temp_dir / "playlists.sqlite", ttl=60)
+        self.playlist = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(id="1", title="Track 1", artist="A", url="https://soundcloud.com/1", info={}),
+                Track(id="2", title="Track 2", artist="B", url="https://soundcloud.com/2"),
+            ],
+        )
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_put_and_get(self):
+        self.cache.put(URL, self.playlist)
+
+        cached = self.cache.get(URL)
+        self.assertEqual(cached, self.playlist)
+        self.assertIsNone(cached.tracks[0].info)
+        self.assertTrue(self.cache.is_fresh(URL))
+
+    def test_expired_entry_is_not_fresh(self):
+        self.cache.put(URL, self.playlist)
+        with patch("soundclouddownloader.cache.time.time", return_value=10**10):
+            self.assertFalse(self.cache.is_fresh(URL))
+
+    def test_revalidate(self):
+        # Track 3 is listed but could not be resolved
+        self.cache.put(URL, self.playlist, listed=3)
+
+        self.assertEqual(self.cache.revalidate(URL, ["1", "2", "3"]), self.playlist)
+        self.assertIsNone(self.cache.revalidate(URL, ["1", "2"]))
+        self.assertIsNone(self.cache.revalidate(URL, ["1", "3", "4"]))
+
+    def test_refresh_bypasses_reads(self):
+        self.cache.put(URL, self.playlist)
+        self.cache.refresh = True
+
+        self.assertIsNone(self.cache.get(URL))
+        self.assertFalse(self.cache.is_fresh(URL))
+
+
+if __name__ == "__main__":
+    unittest.main()
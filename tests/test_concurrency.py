@@ -0,0 +1,74 @@
+import unittest, socket
+from unittest.mock import patch
+from yt_dlp.utils import DownloadError
+from soundclouddownloader.concurrency import ConcurrencyController, is_timeout
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TestConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch(
+            "soundclouddownloader.concurrency.time.monotonic", self.clock.monotonic
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.controller = ConcurrencyController(initial=2, maximum=4, interval=10)
+
+    def run_interval(self, nbytes, errors=0):
+        # Keep the limit reached, as a busy run would
+        held = self.controller.limit
+        for _ in range(held):
+            self.controller.acquire()
+        for _ in range(errors):
+            self.controller.record(False)
+        self.clock.now += 10
+        self.controller.record(True, nbytes)
+        for _ in range(held):
+            self.controller.release()
+
+    def test_grows_while_throughput_rises(self):
+        self.run_interval(1000)
+        self.assertEqual(self.controller.limit, 3)
+        self.run_interval(2000)
+        self.assertEqual(self.controller.limit, 4)
+        # Capped at the maximum
+        self.run_interval(4000)
+        self.assertEqual(self.controller.limit, 4)
+        # Steps back once more downloads stop paying off
+        self.run_interval(2000)
+        self.assertEqual(self.controller.limit, 3)
+
+    def test_backs_off_on_congestion_once_per_interval(self):
+        self.run_interval(1000)
+        self.run_interval(2000)
+        self.assertEqual(self.controller.limit, 4)
+
+        self.controller.record(False, congested=True)
+        self.controller.record(False, congested=True)
+        self.assertEqual(self.controller.limit, 2)
+
+        self.run_interval(1000, errors=3)
+        self.assertEqual(self.controller.limit, 1)
+
+    def test_does_not_grow_while_idle(self):
+        self.clock.now += 10
+        self.controller.record(True, 1000)
+        self.assertEqual(self.controller.limit, 2)
+
+    def test_is_timeout(self):
+        self.assertTrue(is_timeout(socket.timeout("timed out")))
+        wrapped = DownloadError("ERROR: Read timed out.")
+        self.assertTrue(is_timeout(wrapped))
+        self.assertFalse(is_timeout(DownloadError("ERROR: HTTP Error 404: Not Found")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from soundclouddownloader.connections import ConnectionBudget, connections_for, is_fragmented
+
+HLS_MIX = {"duration": 7200, "protocol": "m3u8_native"}
+
+
+class TestConnections(unittest.TestCase):
+    def test_budget_grants_what_is_free(self):
+        budget = ConnectionBudget(limit=5)
+
+        with budget.lease(3) as first:
+            with budget.lease(3) as second:
+                self.assertEqual((first, second), (3, 2))
+                self.assertEqual(budget.acquire(1), 0)
+        self.assertEqual(budget.in_use, 0)
+
+    def test_only_long_hls_tracks_are_split(self):
+        self.assertTrue(is_fragmented(HLS_MIX))
+        self.assertEqual(connections_for(HLS_MIX, 4), 4)
+        self.assertEqual(connections_for(dict(HLS_MIX, duration=180), 4), 1)
+        self.assertEqual(
+            connections_for({"duration": 7200, "protocol": "https"}, 4), 1
+        )
+        self.assertEqual(connections_for(HLS_MIX, 1), 1)
+
+    def test_only_selected_formats_count(self):
+        formats = [{"protocol": "m3u8_native"}, {"protocol": "https"}]
+        self.assertFalse(is_fragmented({"formats": formats, "protocol": "https"}))
+        self.assertTrue(is_fragmented({"formats": formats, "protocol": "m3u8_native"}))
+        self.assertFalse(is_fragmented({"formats": formats, "requested_formats": formats[1:]}))
+        self.assertTrue(is_fragmented({"formats": formats, "requested_formats": formats[:1]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
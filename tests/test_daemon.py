@@ -0,0 +1,175 @@
+import unittest, json, socket, tempfile, threading, urllib.error, urllib.request
+from pathlib import Path
+from unittest.mock import patch
+import yt_dlp
+from benchmarks.server import StandInServer
+from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.daemon import DownloadDaemon, JOB_CANCELLED, JOB_RUNNING, make_server
+from soundclouddownloader.workqueue import JOB_COMPLETED, JOB_FAILED
+
+
+class TestDownloadDaemon(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.downloader = SoundCloudDownloader(
+            requests_per_second=1000, burst=10, output_policy="native"
+        )
+        self.downloader.ydl_opts["noprogress"] = True
+        self.addCleanup(self.downloader.close)
+
+    def serve_playlist(self, **kwargs) -> StandInServer:
+        server = StandInServer(self.tmp / "server", track_size=16 * 1024, **kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def start_daemon(self, **kwargs) -> DownloadDaemon:
+        daemon = DownloadDaemon(self.downloader, self.tmp / "out", transcode_workers=1, **kwargs)
+        daemon.start()
+        self.addCleanup(daemon.stop)
+        return daemon
+
+    def test_jobs_reuse_warm_sessions(self):
+        server = self.serve_playlist(tracks=4)
+        daemon = self.start_daemon(max_workers=2)
+        created = []
+        init = yt_dlp.YoutubeDL.__init__
+
+        def counting_init(ydl, *args, **kwargs):
+            created.append(ydl)
+            init(ydl, *args, **kwargs)
+
+        with patch.object(yt_dlp.YoutubeDL, "__init__", counting_init):
+            first = daemon.wait(daemon.submit(server.playlist_url).id, timeout=60)
+            warmed_up = len(created)
+            second = daemon.wait(daemon.submit(server.playlist_url, resume=False).id, timeout=60)
+
+        self.assertEqual((first.status, first.completed), (JOB_COMPLETED, 4))
+        self.assertEqual((second.status, second.completed), (JOB_COMPLETED, 4))
+        self.assertGreater(warmed_up, 0)
+        # The second job runs entirely on the sessions of the first
+        self.assertEqual(len(created), warmed_up)
+
+    def test_higher_priority_jobs_start_first(self):
+        server = self.serve_playlist(tracks=2)
+        daemon = DownloadDaemon(self.downloader, self.tmp / "out", max_workers=1)
+        self.addCleanup(daemon.stop)
+        low = daemon.submit(server.playlist_url, resume=False)
+        high = daemon.submit(server.playlist_url, priority=5, resume=False)
+        daemon.start()
+        daemon.wait(low.id, timeout=60)
+        daemon.wait(high.id, timeout=60)
+        self.assertLess(high.started_at, low.started_at)
+        self.assertEqual([low.status, high.status], [JOB_COMPLETED, JOB_COMPLETED])
+
+    def test_cancel_running_job(self):
+        server = self.serve_playlist(tracks=8, latency=0.1)
+        daemon = self.start_daemon(max_workers=1)
+        job = daemon.submit(server.playlist_url)
+        first_track = threading.Event()
+        self.downloader.metrics.callback = lambda metrics, event: first_track.set()
+        self.assertTrue(first_track.wait(30))
+        daemon.cancel(job.id)
+        daemon.wait(job.id, timeout=60)
+        self.assertEqual(job.status, JOB_CANCELLED)
+        self.assertLess(job.completed, 8)
+        self.assertEqual(job.in_flight, 0)
+
+    def test_slow_resolve_does_not_block_other_jobs(self):
+        server = self.serve_playlist(tracks=2)
+        daemon = self.start_daemon()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        resolve = self.downloader.get_playlist_info
+
+        def hanging_resolve(url):
+            if "hang" in url:
+                release.wait(30)
+            return resolve(url.replace("hang", ""))
+
+        with patch.object(self.downloader, "get_playlist_info", hanging_resolve):
+            slow = daemon.submit(server.playlist_url + "?hang", priority=5)
+            fast = daemon.submit(server.playlist_url, priority=5, resume=False)
+            daemon.wait(fast.id, timeout=30)
+            self.assertEqual(fast.status, JOB_COMPLETED)
+            self.assertEqual(slow.status, JOB_RUNNING)
+            # A job is cancelled at once while its playlist is resolved
+            daemon.cancel(slow.id)
+            self.assertEqual(slow.status, JOB_CANCELLED)
+
+    def test_job_error_fails_only_that_job(self):
+        server = self.serve_playlist(tracks=2)
+        daemon = self.start_daemon(max_workers=1)
+        broken = daemon.submit(server.playlist_url, priority=1)
+        open_run = self.downloader.open_run
+
+        def open_broken_run(*args, **kwargs):
+            run = open_run(*args, **kwargs)
+            if len([job for job in daemon.jobs() if job.started_at]) == 1:
+                run.record = lambda *args, **kwargs: 1 / 0
+            return run
+
+        with patch.object(self.downloader, "open_run", open_broken_run):
+            daemon.wait(broken.id, timeout=60)
+            healthy = daemon.wait(daemon.submit(server.playlist_url, resume=False).id, timeout=60)
+        self.assertEqual(broken.status, JOB_FAILED)
+        self.assertIn("division by zero", broken.error)
+        self.assertEqual(broken.in_flight, 0)
+        self.assertEqual((healthy.status, healthy.completed), (JOB_COMPLETED, 2))
+
+    def test_http_api(self):
+        server = self.serve_playlist(tracks=2)
+        daemon = self.start_daemon()
+        api = make_server(daemon, port=0)
+        threading.Thread(target=api.serve_forever, daemon=True).start()
+        self.addCleanup(api.server_close)
+        self.addCleanup(api.shutdown)
+        base = f"http://127.0.0.1:{api.server_address[1]}"
+
+        def call(method, path, body=None):
+            data = json.dumps(body).encode() if body is not None else None
+            request = urllib.request.Request(base + path, data=data, method=method)
+            try:
+                with urllib.request.urlopen(request) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        status, job = call("POST", "/jobs", {"url": server.playlist_url, "priority": 1})
+        self.assertEqual(status, 201)
+        daemon.wait(job["id"], timeout=60)
+
+        status, job = call("GET", f"/jobs/{job['id']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(job["status"], JOB_COMPLETED)
+        self.assertEqual(job["progress"]["completed"], 2)
+        self.assertEqual(job["progress"]["total"], 2)
+        self.assertEqual(call("GET", "/jobs")[1]["jobs"][0]["id"], job["id"])
+        self.assertEqual(call("GET", "/health")[1]["jobs"], {JOB_COMPLETED: 1})
+
+        self.assertEqual(call("POST", "/jobs", {"url": "not a url"})[0], 400)
+        self.assertEqual(call("GET", "/jobs/0123abcd")[0], 404)
+        self.assertEqual(call("DELETE", "/jobs/0123abcd")[0], 404)
+
+    def test_unix_socket_api(self):
+        daemon = self.start_daemon()
+        path = self.tmp / "daemon.sock"
+        api = make_server(daemon, socket_path=path)
+        threading.Thread(target=api.serve_forever, daemon=True).start()
+        self.addCleanup(api.server_close)
+        self.addCleanup(api.shutdown)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(path))
+            client.sendall(b"GET /health HTTP/1.0\r\n\r\n")
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+        head, body = response.split(b"\r\n\r\n", 1)
+        self.assertTrue(head.startswith(b"HTTP/1.0 200"))
+        self.assertEqual(json.loads(body), {"status": "ok", "jobs": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest, tempfile, shutil
+from pathlib import Path
+from soundclouddownloader.dataclass import Track
+from soundclouddownloader.manifest import DownloadManifest, MANIFEST_FILENAME
+
+
+class TestDownloadManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manifest = DownloadManifest.for_directory(self.temp_dir)
+        self.track = Track(
+            id="track1",
+            title="Track 1",
+            artist="Artist 1",
+            url="https://soundcloud.com/track1",
+        )
+
+    def tearDown(self):
+        self.manifest.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_completed_track_is_skipped_on_reopen(self):
+        path = self.temp_dir / "Track 1.mp3"
+        path.write_bytes(b"audio")
+        self.manifest.mark_pending("playlist123", self.track)
+        self.manifest.mark_completed("playlist123", self.track, path)
+        self.manifest.close()
+
+        self.manifest = DownloadManifest(self.temp_dir / MANIFEST_FILENAME)
+        self.assertEqual(self.manifest.completed_path("playlist123", "track1"), path)
+        self.assertIsNone(self.manifest.completed_path("other", "track1"))
+
+    def test_pending_and_failed_tracks_are_not_completed(self):
+        self.manifest.mark_pending("playlist123", self.track)
+        self.assertEqual(self.manifest.status("playlist123", "track1"), "pending")
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1"))
+
+        self.manifest.mark_failed("playlist123", self.track)
+        self.assertEqual(self.manifest.status("playlist123", "track1"), "failed")
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1"))
+
+    def test_missing_or_truncated_file_is_not_completed(self):
+        path = self.temp_dir / "Track 1.mp3"
+        path.write_bytes(b"audio")
+        self.manifest.mark_completed("playlist123", self.track, path)
+
+        path.write_bytes(b"au")
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1"))
+
+        path.unlink()
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1"))
+
+    def test_archived_track_is_completed_while_in_archive(self):
+        path = self.temp_dir / "Track 1.mp3"
+        path.write_bytes(b"audio")
+        archive = self.temp_dir / "Playlist.zip"
+        self.manifest.mark_completed(
+            "playlist123", self.track, path, archive=archive, member="Track 1.mp3"
+        )
+        path.unlink()
+
+        self.assertEqual(
+            self.manifest.completed_path("playlist123", "track1", {"Track 1.mp3": 5}), archive
+        )
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1", {}))
+        # Runs that do not zip download archived tracks again
+        self.assertIsNone(self.manifest.completed_path("playlist123", "track1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
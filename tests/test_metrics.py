@@ -0,0 +1,88 @@
+import unittest, tempfile, shutil, json
+from dataclasses import replace
+from pathlib import Path
+from soundclouddownloader.dataclass import Track
+from soundclouddownloader.metrics import (
+    MetricsRecorder,
+    RunReport,
+    TrackMetrics,
+    STAGE_FETCH,
+    TRACK_COMPLETED,
+    TRACK_FAILED,
+)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.track = Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/1")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_recorder_times_stages_and_calls_back(self):
+        events = []
+        recorder = MetricsRecorder(lambda metrics, event: events.append(event))
+        path = self.temp_dir / "Track 1.mp3"
+        path.write_bytes(b"audio")
+
+        with recorder.stage(self.track, STAGE_FETCH) as metrics:
+            metrics.bytes_downloaded += 5
+        with recorder.stage(self.track, STAGE_FETCH):
+            pass
+        metrics = recorder.finish(self.track, path)
+
+        self.assertEqual(events, [STAGE_FETCH, STAGE_FETCH, TRACK_COMPLETED])
+        self.assertGreaterEqual(metrics.stages[STAGE_FETCH], 0.0)
+        self.assertEqual(metrics.bytes_written, 5)
+        # Finished tracks are no longer held by the recorder
+        self.assertIsNot(recorder.get(self.track), metrics)
+
+    def test_failure_reason_is_kept(self):
+        recorder = MetricsRecorder()
+        recorder.fail(self.track, "geo-restricted")
+
+        metrics = recorder.finish(self.track, None)
+
+        self.assertEqual(metrics.status, TRACK_FAILED)
+        self.assertEqual(metrics.error, "geo-restricted")
+
+    def test_runs_keep_their_own_metrics(self):
+        recorder = MetricsRecorder()
+        first, second = replace(self.track, run="a"), replace(self.track, run="b")
+        with recorder.stage(first, STAGE_FETCH) as metrics:
+            metrics.bytes_downloaded += 5
+        recorder.fail(second, "HTTP Error 503", "transient")
+
+        failed = recorder.finish(second, None)
+        completed = recorder.finish(first, self.temp_dir / "missing.mp3")
+
+        self.assertEqual((failed.error, failed.bytes_downloaded), ("HTTP Error 503", 0))
+        self.assertEqual((completed.error, completed.bytes_downloaded), (None, 5))
+        self.assertIn(STAGE_FETCH, completed.stages)
+
+    def test_report_outputs(self):
+        report = RunReport(playlist_id="playlist123", playlist_title="Test Playlist")
+        report.add(
+            TrackMetrics("1", "Track 1", TRACK_COMPLETED, stages={STAGE_FETCH: 1.5}, bytes_downloaded=10)
+        )
+        report.add(
+            TrackMetrics("2", "Track 2", TRACK_FAILED, stages={STAGE_FETCH: 0.5}, error="HTTP Error 404")
+        )
+        report.finished_at = report.started_at + 3
+
+        data = json.loads(report.write_json(self.temp_dir / "report.json").read_text())
+        self.assertEqual(data["summary"]["completed"], 1)
+        self.assertEqual(data["summary"]["stage_seconds"][STAGE_FETCH], 2.0)
+        self.assertEqual(data["failures"][0]["error"], "HTTP Error 404")
+
+        text = report.write_prometheus(self.temp_dir / "run.prom").read_text()
+        self.assertIn('soundcloud_downloader_tracks{playlist="playlist123",status="failed"} 1', text)
+        self.assertIn(
+            'soundcloud_downloader_stage_seconds{playlist="playlist123",stage="fetch"} 2.000000', text
+        )
+        self.assertIn('soundcloud_downloader_bytes_downloaded{playlist="playlist123"} 10', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
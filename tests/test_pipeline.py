@@ -0,0 +1,103 @@
+import unittest, queue, threading, time
+from pathlib import Path
+from soundclouddownloader.dataclass import Track, FetchedTrack
+from soundclouddownloader.pipeline import TrackPipeline
+
+
+def make_track(n):
+    return Track(
+        id=f"track{n}",
+        title=f"Track {n}",
+        artist="Artist",
+        url=f"https://soundcloud.com/track{n}",
+    )
+
+
+class TestTrackPipeline(unittest.TestCase):
+    def test_stages_run_in_separate_pools(self):
+        stage_threads = {"fetch": set(), "transcode": set()}
+
+        def fetch(track):
+            stage_threads["fetch"].add(threading.current_thread().name)
+            return FetchedTrack(track=track, info={}, path=Path(track.id))
+
+        def transcode(fetched):
+            stage_threads["transcode"].add(threading.current_thread().name)
+            return fetched.path.with_suffix(".mp3")
+
+        with TrackPipeline(fetch, transcode, fetch_workers=2, transcode_workers=2) as pipeline:
+            for n in range(6):
+                pipeline.submit(make_track(n))
+            results = dict((track.id, path) for track, path in pipeline.results())
+
+        self.assertEqual(results, {f"track{n}": Path(f"track{n}.mp3") for n in range(6)})
+        self.assertTrue(all(name.startswith("fetch") for name in stage_threads["fetch"]))
+        self.assertTrue(
+            all(name.startswith("transcode") for name in stage_threads["transcode"])
+        )
+
+    def test_failures_in_either_stage_are_reported(self):
+        def fetch(track):
+            if track.id == "track0":
+                return None
+            if track.id == "track1":
+                raise RuntimeError("network down")
+            return FetchedTrack(track=track, info={}, path=Path(track.id))
+
+        def transcode(fetched):
+            if fetched.track.id == "track2":
+                raise RuntimeError("ffmpeg crashed")
+            return fetched.path
+
+        with TrackPipeline(fetch, transcode, fetch_workers=2, transcode_workers=1) as pipeline:
+            for n in range(4):
+                pipeline.submit(make_track(n))
+            results = dict((track.id, path) for track, path in pipeline.results())
+
+        self.assertEqual(
+            results,
+            {"track0": None, "track1": None, "track2": None, "track3": Path("track3")},
+        )
+
+    def test_full_queue_blocks_fetchers(self):
+        release = threading.Event()
+
+        def fetch(track):
+            return FetchedTrack(track=track, info={}, path=Path(track.id))
+
+        def transcode(item):
+            release.wait()
+            return item.path
+
+        with TrackPipeline(
+            fetch, transcode, fetch_workers=4, transcode_workers=1, queue_size=1
+        ) as pipeline:
+            for n in range(6):
+                pipeline.submit(make_track(n))
+            # One item is being transcoded and one is queued; the remaining
+            # fetchers are held back until the transcoder catches up.
+            for _ in range(100):
+                if pipeline._handoff.full():
+                    break
+                time.sleep(0.01)
+            self.assertTrue(pipeline._handoff.full())
+            release.set()
+            self.assertEqual(len(list(pipeline.results())), 6)
+
+    def test_result_times_out(self):
+        release = threading.Event()
+
+        def fetch(track):
+            release.wait()
+            return None
+
+        with TrackPipeline(fetch, lambda item: item.path, fetch_workers=1) as pipeline:
+            pipeline.submit(make_track(1))
+            with self.assertRaises(queue.Empty):
+                pipeline.result(timeout=0.01)
+            release.set()
+            self.assertEqual(pipeline.result(timeout=5)[1], None)
+
+
+if __name__ == "__main__":
+    unittest.main()
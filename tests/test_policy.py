@@ -0,0 +1,30 @@
+import unittest
+from soundclouddownloader.policy import (
+    plan_output,
+    postprocessors_for,
+    PATH_NATIVE,
+    PATH_REMUX,
+    PATH_TRANSCODE,
+)
+
+
+class TestOutputPolicy(unittest.TestCase):
+    def test_plan_output(self):
+        self.assertEqual(plan_output("transcode", "mp3", "mp3"), PATH_NATIVE)
+        self.assertEqual(plan_output("transcode", "opus", "mp3"), PATH_TRANSCODE)
+        self.assertEqual(plan_output("transcode-if-different", "m4a", "mp3"), PATH_TRANSCODE)
+        self.assertEqual(plan_output("remux", "m4a", "mp3"), PATH_NATIVE)
+        self.assertEqual(plan_output("remux", "aac", "mp3"), PATH_REMUX)
+        self.assertEqual(plan_output("native", "opus", "mp3"), PATH_NATIVE)
+
+    def test_postprocessors_for(self):
+        self.assertEqual(postprocessors_for(PATH_NATIVE, "opus", "mp3", "192"), [])
+        remux = postprocessors_for(PATH_REMUX, "aac", "mp3", "192")
+        self.assertEqual(remux, [{"key": "FFmpegExtractAudio", "preferredcodec": "aac"}])
+        transcode = postprocessors_for(PATH_TRANSCODE, "opus", "mp3", "192")
+        self.assertEqual(transcode[0]["preferredcodec"], "mp3")
+        self.assertEqual(transcode[0]["preferredquality"], "192")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest, tempfile
+from pathlib import Path
+from unittest.mock import patch
+from benchmarks.server import StandInServer, StandInProxy
+from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.concurrency import ConcurrencyController
+from soundclouddownloader.dataclass import Track
+from soundclouddownloader.proxies import ProxyPool
+from soundclouddownloader.retry import RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class TestProxyPool(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch("soundclouddownloader.proxies.time.monotonic", self.clock.monotonic)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ProxyPool(
+            ["http://a:1", "http://b:1"], max_per_proxy=2, min_samples=2, drain_base=30
+        )
+        self.a, self.b = self.pool.proxies
+
+    def test_prefers_unused_then_fast_proxies(self):
+        first = self.pool.acquire()
+        self.pool.release(first, 2.0)
+        # The other proxy has not been measured yet
+        second = self.pool.acquire()
+        self.assertIsNot(second, first)
+        self.pool.release(second, 0.5)
+        self.assertIs(self.pool.acquire(), second)
+
+    def test_limits_downloads_per_proxy(self):
+        self.assertEqual(self.pool.capacity, 4)
+        acquired = [self.pool.acquire() for _ in range(4)]
+        self.assertEqual(acquired.count(self.a), 2)
+        self.assertEqual(acquired.count(self.b), 2)
+
+    def test_drains_throttled_proxy_until_it_returns(self):
+        self.pool.release(self.pool.acquire(), 1.0)
+        self.pool.release(self.pool.acquire(), 1.0)
+        self.a.in_flight += 1
+        self.pool.release(self.a, 1.0, failure="throttled")
+        self.assertEqual([self.pool.acquire() for _ in range(2)], [self.b, self.b])
+        self.assertEqual(self.pool.stats()[0]["drained_for"], 30)
+
+        self.clock.now += 30
+        # Only the returning proxy has free capacity
+        self.assertIs(self.pool.acquire(), self.a)
+        # On probation: throttled again, it is drained for twice as long
+        self.pool.release(self.a, 1.0, failure="throttled")
+        self.assertEqual(self.pool.stats()[0]["drained_for"], 60)
+
+    def test_drains_proxy_with_high_error_rate(self):
+        for _ in range(2):
+            self.a.in_flight += 1
+            self.pool.release(self.a, 1.0, failure="transient")
+        self.assertGreater(self.pool.stats()[0]["drained_for"], 0)
+        # Permanent failures are the track's fault, not the proxy's
+        for _ in range(3):
+            self.b.in_flight += 1
+            self.pool.release(self.b, 1.0, failure="permanent")
+        self.assertEqual(self.pool.stats()[1]["drained_for"], 0)
+
+
+class TestProxyPoolDownloads(unittest.TestCase):
+    def test_failing_proxy_is_drained_and_tracks_retried(self):
+        with tempfile.TemporaryDirectory() as tmp, StandInServer(
+            Path(tmp) / "server", tracks=4, track_size=16 * 1024
+        ) as server, StandInProxy() as good, StandInProxy(failing=True) as bad:
+            pool = ProxyPool(
+                [bad.url, good.url], requests_per_second=1000, burst=10, min_samples=1
+            )
+            downloader = SoundCloudDownloader(
+                requests_per_second=1000,
+                burst=10,
+                output_policy="native",
+                proxies=pool,
+                retry_policy=RetryPolicy(base_delay=0.01),
+            )
+            downloader.ydl_opts["noprogress"] = True
+            try:
+                downloader.download_playlist(
+                    server.playlist_url, Path(tmp) / "out", resume=False
+                )
+            finally:
+                downloader.close()
+
+            summary = downloader.last_report.to_dict()["summary"]
+            self.assertEqual(summary["completed"], 4)
+            self.assertGreater(good.requests, 0)
+            self.assertGreater(bad.requests, 0)
+            self.assertGreater(pool.stats()[0]["drained_for"], 0)
+
+    def test_proxy_error_releases_concurrency_slot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            controller = ConcurrencyController(initial=1, maximum=2)
+            downloader = SoundCloudDownloader(
+                proxies=ProxyPool(["http://a:1"]), concurrency=controller
+            )
+            self.addCleanup(downloader.close)
+            track = Track(id="track1", title="Track 1", artist="", url="")
+            with patch.object(downloader.proxies, "acquire", side_effect=RuntimeError("closed")):
+                with self.assertRaises(RuntimeError):
+                    downloader.fetch_track(track, Path(tmp))
+            self.assertEqual(controller.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
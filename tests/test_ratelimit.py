@@ -0,0 +1,83 @@
+import unittest, io, threading
+from unittest.mock import patch
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import DownloadError, ExtractorError
+from soundclouddownloader.ratelimit import RateLimiter, is_throttled
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = patch.multiple(
+            "soundclouddownloader.ratelimit.time",
+            monotonic=self.clock.monotonic,
+            sleep=self.clock.sleep,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_burst_then_steady_rate(self):
+        limiter = RateLimiter(rate=2.0, burst=3)
+        for _ in range(3):
+            self.assertEqual(limiter.acquire(), 0.0)
+        self.assertAlmostEqual(limiter.acquire(), 0.5)
+        self.assertAlmostEqual(limiter.acquire(), 0.5)
+
+    def test_throttling_backs_off_exponentially(self):
+        limiter = RateLimiter(rate=10.0, burst=1, backoff_base=30.0, backoff_max=100.0)
+        self.assertEqual(limiter.throttled(), 30.0)
+        self.assertGreaterEqual(limiter.acquire(), 30.0)
+        self.assertEqual(limiter.throttled(), 60.0)
+        limiter.acquire()
+        self.assertEqual(limiter.throttled(), 100.0)
+
+        limiter.acquire()
+        limiter.succeeded()
+        self.assertEqual(limiter.throttled(), 30.0)
+
+    def test_concurrent_reports_of_one_throttle_back_off_once(self):
+        limiter = RateLimiter(rate=10.0, burst=1, backoff_base=30.0, backoff_max=600.0)
+        delays = []
+        threads = [
+            threading.Thread(target=lambda: delays.append(limiter.throttled())) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every worker waits out the same 30s instead of doubling it eight times
+        self.assertEqual(delays, [30.0] * 8)
+        self.assertAlmostEqual(limiter.acquire(), 30.0)
+        self.assertEqual(limiter.throttled(), 60.0)
+
+
+class TestIsThrottled(unittest.TestCase):
+    def test_detects_wrapped_http_errors(self):
+        cause = ExtractorError("Unable to download JSON metadata")
+        cause.cause = HTTPError(
+            Response(io.BytesIO(), "https://api-v2.soundcloud.com", {}, status=429)
+        )
+        self.assertTrue(is_throttled(DownloadError("ERROR: failed", (None, cause, None))))
+
+    def test_detects_message_and_ignores_other_errors(self):
+        self.assertTrue(is_throttled(DownloadError("ERROR: HTTP Error 403: Forbidden")))
+        self.assertFalse(is_throttled(DownloadError("ERROR: HTTP Error 404: Not Found")))
+
+
+if __name__ == "__main__":
+    unittest.main()
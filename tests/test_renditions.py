@@ -0,0 +1,112 @@
+import unittest, subprocess, tempfile
+from pathlib import Path
+from unittest.mock import patch
+from benchmarks.server import StandInServer
+from soundclouddownloader.main import SoundCloudDownloader
+from soundclouddownloader.renditions import (
+    Rendition,
+    encode_renditions,
+    fanout_command,
+    parse_renditions,
+)
+
+
+def fake_ffmpeg(command, **kwargs):
+    """Write every output of a fan-out command, as FFmpeg would."""
+    for arg in command[7:]:
+        if "/" in arg:
+            Path(arg).write_bytes(b"encoded")
+    return subprocess.CompletedProcess(command, 0, "", "")
+
+
+class TestRendition(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Rendition.parse("MP3@320"), Rendition("mp3", "320"))
+        self.assertEqual(Rendition.parse("flac"), Rendition("flac"))
+        self.assertEqual(Rendition.parse("opus@128").name, "opus-128")
+        self.assertEqual(
+            Rendition.parse("opus@128").output_path(Path("out/Mix"), "Intro"),
+            Path("out/Mix/opus-128/Intro.opus"),
+        )
+        for spec in ("ogg@128", "mp3", "mp3@high"):
+            with self.assertRaises(ValueError):
+                Rendition.parse(spec)
+
+    def test_parse_renditions_drops_duplicates(self):
+        self.assertEqual(
+            parse_renditions(["mp3@192", "opus@128", "MP3@192"]),
+            [Rendition("mp3", "192"), Rendition("opus", "128")],
+        )
+
+    def test_fanout_command_decodes_once(self):
+        outputs = {
+            Rendition("mp3", "192"): Path("a/mp3-192/t.mp3"),
+            Rendition("mp3", "320"): Path("a/mp3-320/t.mp3"),
+            Rendition("flac"): Path("a/flac/t.flac"),
+        }
+        command = fanout_command("ffmpeg", Path("a/t.m4a"), outputs)
+        self.assertEqual(command.count("-i"), 1)
+        self.assertEqual(command.count("-c:a"), 3)
+        self.assertEqual(command.count("-b:a"), 2)
+        self.assertEqual(command[-1], "a/flac/t.flac")
+
+    def test_failed_encode_removes_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = {
+                Rendition("mp3", "192"): Path(tmp) / "mp3-192" / "t.mp3",
+                Rendition("opus", "128"): Path(tmp) / "opus-128" / "t.opus",
+            }
+
+            def failing_ffmpeg(command, **kwargs):
+                fake_ffmpeg(command)
+                return subprocess.CompletedProcess(command, 1, "", "Encoder failed\n")
+
+            with patch("soundclouddownloader.renditions.subprocess.run", failing_ffmpeg):
+                with self.assertRaisesRegex(RuntimeError, "Encoder failed"):
+                    encode_renditions(Path(tmp) / "t.m4a", outputs, ffmpeg="ffmpeg")
+            self.assertFalse(any(path.exists() for path in outputs.values()))
+
+
+class TestRenditionDownloads(unittest.TestCase):
+    def test_download_playlist_fans_out_every_track(self):
+        with tempfile.TemporaryDirectory() as tmp, StandInServer(
+            Path(tmp) / "server", tracks=3, track_size=16 * 1024
+        ) as server:
+            downloader = SoundCloudDownloader(
+                requests_per_second=1000,
+                burst=10,
+                output_policy="native",
+                renditions=["mp3@192", "opus@128"],
+            )
+            downloader.ydl_opts["noprogress"] = True
+            with patch("soundclouddownloader.renditions.shutil.which", return_value="ffmpeg"), patch(
+                "soundclouddownloader.renditions.subprocess.run", side_effect=fake_ffmpeg
+            ) as run:
+                try:
+                    downloaded = downloader.download_playlist(
+                        server.playlist_url, Path(tmp) / "out", max_workers=2, resume=False
+                    )
+                finally:
+                    downloader.close()
+
+            # One FFmpeg run per track produces both renditions
+            self.assertEqual(run.call_count, 3)
+            mp3 = sorted(path.stem for path in (downloaded / "mp3-192").glob("*.mp3"))
+            opus = sorted(path.stem for path in (downloaded / "opus-128").glob("*.opus"))
+            self.assertEqual(len(mp3), 3)
+            self.assertEqual(mp3, opus)
+            # The downloaded sources are removed once encoded
+            self.assertEqual(list(downloaded.glob("*.mp3")), [])
+            self.assertEqual(
+                downloader.last_report.to_dict()["tracks"][0]["path"].rsplit("/", 2)[1], "mp3-192"
+            )
+
+    def test_zip_is_rejected(self):
+        downloader = SoundCloudDownloader(renditions=["mp3@192"])
+        self.addCleanup(downloader.close)
+        with self.assertRaises(ValueError):
+            downloader.open_run([], "out", should_zip=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest, io
+from unittest.mock import patch
+from yt_dlp.networking import Response
+from yt_dlp.networking.exceptions import HTTPError
+from yt_dlp.utils import DownloadError, ExtractorError, GeoRestrictedError
+from soundclouddownloader.dataclass import Track
+from soundclouddownloader.metrics import TrackMetrics
+from soundclouddownloader.retry import RetryPolicy, RetryQueue, classify_error
+
+
+def http_error(status):
+    response = Response(io.BytesIO(b""), "https://api-v2.soundcloud.com", {}, status=status)
+    return HTTPError(response)
+
+
+def make_track(n):
+    return Track(id=str(n), title=f"Track {n}", artist="A", url=f"https://soundcloud.com/{n}")
+
+
+class TestClassifyError(unittest.TestCase):
+    def test_classes(self):
+        server_error = DownloadError("ERROR: Unable to download", (None, http_error(503), None))
+        throttled = ExtractorError("HTTP Error 429", cause=http_error(429))
+        self.assertEqual(classify_error(server_error), "transient")
+        self.assertEqual(classify_error(throttled), "throttled")
+        self.assertEqual(classify_error(DownloadError("ERROR: Read timed out.")), "transient")
+        self.assertEqual(classify_error(ConnectionResetError()), "transient")
+        self.assertEqual(classify_error(GeoRestrictedError("Not available")), "geo-restricted")
+        not_found = DownloadError("ERROR: HTTP Error 404: Not Found")
+        self.assertEqual(classify_error(not_found), "permanent")
+
+
+class TestRetryQueue(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch("soundclouddownloader.retry.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_transient_failures_are_deferred_with_backoff(self):
+        retries = RetryQueue(RetryPolicy(max_retries=2, base_delay=10))
+        track = make_track(1)
+        track.info = {"url": "https://expired"}
+        metrics = TrackMetrics("1", "Track 1", error="HTTP Error 503", failure="transient")
+
+        self.assertTrue(retries.defer(track, metrics))
+        self.assertEqual((metrics.retries, metrics.error, track.info), (1, None, None))
+        self.assertEqual(retries.due(), [])
+        self.assertLessEqual(retries.wait_time(), 10)
+        self.now += 10
+        self.assertEqual(retries.due(), [track])
+
+        metrics.failure = "transient"
+        self.assertTrue(retries.defer(track, metrics))
+        # The second delay is between 10 and 20 seconds
+        self.assertGreaterEqual(retries.wait_time(), 10)
+        metrics.failure = "transient"
+        self.assertFalse(retries.defer(track, metrics))
+
+    def test_permanent_failures_and_spent_budget_are_not_retried(self):
+        retries = RetryQueue(RetryPolicy(budget=1))
+        permanent = TrackMetrics("1", "Track 1", error="HTTP Error 404", failure="permanent")
+        self.assertFalse(retries.defer(make_track(1), permanent))
+
+        for n in (2, 3):
+            metrics = TrackMetrics(str(n), f"Track {n}", failure="throttled")
+            deferred = retries.defer(make_track(n), metrics)
+        self.assertTrue(len(retries) == 1 and not deferred)
+
+    def test_drain_takes_tracks_not_due_yet(self):
+        retries = RetryQueue()
+        tracks = [make_track(n) for n in (1, 2)]
+        for n, track in enumerate(tracks):
+            retries.defer(track, TrackMetrics(str(n), track.title, failure="transient"))
+        self.assertEqual(retries.due(), [])
+        self.assertCountEqual(retries.drain(), tracks)
+        self.assertEqual(len(retries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
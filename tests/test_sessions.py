@@ -0,0 +1,52 @@
+import unittest, threading
+from unittest.mock import patch, MagicMock
+from soundclouddownloader.sessions import YoutubeDLSessionPool
+
+
+@patch("yt_dlp.YoutubeDL", side_effect=lambda opts: MagicMock(params=opts))
+class TestYoutubeDLSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = YoutubeDLSessionPool()
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_instance_is_reused_per_thread_and_name(self, mock_ydl):
+        first = self.pool.get("fetch", {"quiet": True})
+        self.assertIs(self.pool.get("fetch", {"quiet": True}), first)
+        self.assertIsNot(self.pool.get("playlist", {}), first)
+
+        other_thread = []
+        thread = threading.Thread(
+            target=lambda: other_thread.append(self.pool.get("fetch", {}))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other_thread[0], first)
+        self.assertEqual(mock_ydl.call_count, 3)
+
+    def test_instance_is_recreated_after_an_error(self, mock_ydl):
+        with self.assertRaises(RuntimeError):
+            with self.pool.session("fetch", {}) as ydl:
+                raise RuntimeError("connection reset")
+        ydl.close.assert_called_once()
+
+        with self.pool.session("fetch", {}) as fresh:
+            self.assertIsNot(fresh, ydl)
+
+    def test_prune_closes_sessions_of_exited_threads(self, mock_ydl):
+        created = []
+        thread = threading.Thread(target=lambda: created.append(self.pool.get("fetch", {})))
+        thread.start()
+        thread.join()
+        mine = self.pool.get("fetch", {})
+
+        self.pool.prune()
+
+        created[0].close.assert_called_once()
+        mine.close.assert_not_called()
+        self.assertEqual(len(self.pool), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
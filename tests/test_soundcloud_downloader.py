@@ -1,12 +1,33 @@
-import tempfile, shutil, os
+import tempfile, shutil, os, zipfile
 from pathlib import Path
 from soundclouddownloader import SoundCloudDownloader
-from soundclouddownloader import Track, Playlist
+from soundclouddownloader import Track, Playlist, FetchedTrack, TrackStore, PlaylistCache
+from soundclouddownloader import WorkQueue, RetryPolicy
 
 import unittest
 from unittest.mock import patch, MagicMock
 
 
+def fake_fetch_track(track, output_dir):
+    filepath = output_dir / f"{track.title}.mp3"
+    filepath.write_bytes(b"audio")
+    return FetchedTrack(track=track, info={"id": track.id}, path=filepath)
+
+
+def fake_transcode_track(fetched):
+    return fetched.path
+
+
+def simulate_download(mock_ydl_instance, filepath):
+    # Stand in for yt-dlp writing the file and recording where it went
+    def process_ie_result(info, download=True):
+        filepath.touch()
+        info["requested_downloads"] = [{"filepath": str(filepath)}]
+        return info
+
+    mock_ydl_instance.process_ie_result.side_effect = process_ie_result
+
+
 class TestSoundCloudDownloader(unittest.TestCase):
     def setUp(self):
         self.test_dir = Path(os.getcwd()) / "tests" / "temp_test_dir"
@@ -20,7 +41,7 @@ class TestSoundCloudDownloader(unittest.TestCase):
     @patch("yt_dlp.YoutubeDL")
     def test_download_track(self, mock_ydl):
         mock_ydl_instance = MagicMock()
-        mock_ydl.return_value.__enter__.return_value = mock_ydl_instance
+        mock_ydl.return_value = mock_ydl_instance
 
         mock_ydl_instance.extract_info.return_value = {
             "title": "Test Track",
@@ -28,9 +49,10 @@ class TestSoundCloudDownloader(unittest.TestCase):
         }
 
         expected_filename = "Test_Track.mp3"
-        mock_ydl_instance.prepare_filename.return_value = expected_filename
+        mock_ydl_instance.prepare_filename.return_value = "Test_Track"
 
-        mock_ydl_instance.download.return_value = 0  # Simulate successful download
+        # Simulate successful download
+        simulate_download(mock_ydl_instance, self.temp_dir / expected_filename)
 
         track = Track(
             id="track1",
@@ -39,23 +61,225 @@ class TestSoundCloudDownloader(unittest.TestCase):
             url="https://soundcloud.com/user/track",
         )
 
-        # Create a mock file to simulate successful download
-        mock_file = self.temp_dir / expected_filename
-        mock_file.touch()
-
-        with patch("time.sleep"):  # Mock sleep to speed up test
-            result = self.downloader.download_track(track, self.temp_dir)
+        result = self.downloader.download_track(track, self.temp_dir)
 
         self.assertIsNotNone(result)
         expected_path = self.temp_dir / expected_filename
         self.assertEqual(result, expected_path)
-        mock_ydl_instance.download.assert_called()
+        # The metrics of a single track are not held after it finished
+        self.assertEqual(self.downloader.metrics._tracks, {})
+        mock_ydl_instance.extract_info.assert_called_once()
+        mock_ydl_instance.process_ie_result.assert_called_once_with(
+            mock_ydl_instance.extract_info.return_value, download=True
+        )
+        mock_ydl_instance.download.assert_not_called()
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_download_track_reuses_playlist_info(self, mock_ydl):
+        mock_ydl_instance = MagicMock()
+        mock_ydl.return_value = mock_ydl_instance
+        mock_ydl_instance.prepare_filename.return_value = "Test_Track"
+        simulate_download(mock_ydl_instance, self.temp_dir / "Test_Track.mp3")
+
+        info = {"id": "track1", "title": "Test Track", "ext": "mp3"}
+        track = Track(
+            id="track1",
+            title="Test Track",
+            artist="Test Artist",
+            url="https://soundcloud.com/user/track",
+            info=info,
+        )
+
+        result = self.downloader.download_track(track, self.temp_dir)
+
+        self.assertEqual(result, self.temp_dir / "Test_Track.mp3")
+        mock_ydl_instance.extract_info.assert_not_called()
+        mock_ydl_instance.process_ie_result.assert_called_once_with(
+            info, download=True
+        )
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_stale_info_is_re_extracted_without_using_a_retry(self, mock_ydl):
+        import yt_dlp
+
+        mock_ydl_instance = MagicMock()
+        mock_ydl.return_value = mock_ydl_instance
+        mock_ydl_instance.prepare_filename.return_value = "Test_Track"
+        mock_ydl_instance.process_ie_result.side_effect = yt_dlp.utils.DownloadError("HTTP Error 403")
+        filepath = self.temp_dir / "Test_Track.mp3"
+
+        def extract_info(url, download):
+            filepath.touch()
+            return {"requested_downloads": [{"filepath": str(filepath)}]}
+
+        mock_ydl_instance.extract_info.side_effect = extract_info
+        track = Track(
+            id="track1",
+            title="Test Track",
+            artist="",
+            url="https://soundcloud.com/user/track",
+            info={"id": "track1", "title": "Test Track", "ext": "mp3"},
+        )
+
+        fetched = self.downloader.fetch_track(track, self.temp_dir)
+
+        self.assertEqual(fetched.path, filepath)
+        metrics = self.downloader.metrics.finish(track, fetched.path)
+        self.assertEqual((metrics.retries, metrics.reextracts), (0, 1))
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_download_track_reuses_session_across_tracks(self, mock_ydl):
+        mock_ydl_instance = MagicMock()
+        mock_ydl.return_value = mock_ydl_instance
+        mock_ydl_instance.extract_info.side_effect = lambda url, download: {
+            "title": url.rsplit("/", 1)[-1],
+            "ext": "mp3",
+        }
+        mock_ydl_instance.prepare_filename.side_effect = lambda info, outtmpl: info["title"]
+
+        def process_ie_result(info, download=True):
+            filepath = self.temp_dir / f"{info['title']}.mp3"
+            filepath.touch()
+            info["requested_downloads"] = [{"filepath": str(filepath)}]
+            return info
+
+        mock_ydl_instance.process_ie_result.side_effect = process_ie_result
+
+        for n in range(3):
+            track = Track(
+                id=f"track{n}",
+                title=f"Track {n}",
+                artist="",
+                url=f"https://soundcloud.com/user/track{n}",
+            )
+            result = self.downloader.download_track(track, self.temp_dir)
+            self.assertEqual(result, self.temp_dir / f"track{n}.mp3")
+
+        self.assertEqual(mock_ydl.call_count, 1)
+        mock_ydl_instance.close.assert_not_called()
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_long_hls_track_is_fetched_over_several_connections(self, mock_ydl):
+        mock_ydl_instance = MagicMock()
+        mock_ydl_instance.params = {"outtmpl": {"default": "%(title)s"}}
+        mock_ydl.return_value = mock_ydl_instance
+        mock_ydl_instance.prepare_filename.return_value = "Mix"
+        connections = []
+
+        def process_ie_result(info, download=True):
+            connections.append(mock_ydl_instance.params["concurrent_fragment_downloads"])
+            filepath = self.temp_dir / "Mix.mp3"
+            filepath.touch()
+            info["requested_downloads"] = [{"filepath": str(filepath)}]
+            return info
+
+        mock_ydl_instance.process_ie_result.side_effect = process_ie_result
+        downloader = SoundCloudDownloader(fragment_connections=4, connection_budget=2)
+        track = Track(
+            id="mix",
+            title="Mix",
+            artist="",
+            url="https://soundcloud.com/user/mix",
+            info={"title": "Mix", "duration": 7200, "protocol": "m3u8_native"},
+        )
+
+        downloader.fetch_track(track, self.temp_dir)
+
+        # One connection of its own plus the whole extra budget
+        self.assertEqual(connections, [3])
+        self.assertEqual(downloader.connections.in_use, 0)
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_download_track_uses_track_store(self, mock_ydl):
+        mock_ydl_instance = MagicMock()
+        mock_ydl.return_value = mock_ydl_instance
+        mock_ydl_instance.prepare_filename.return_value = "Test_Track"
+        simulate_download(mock_ydl_instance, self.temp_dir / "Test_Track.mp3")
+
+        store = TrackStore(self.temp_dir / "store")
+        self.addCleanup(store.close)
+        downloader = SoundCloudDownloader(store=store)
+        track = Track(
+            id="track1",
+            title="Test Track",
+            artist="Test Artist",
+            url="https://soundcloud.com/user/track",
+            info={"title": "Test Track", "ext": "mp3"},
+        )
+
+        downloader.download_track(track, self.temp_dir)
+        other_dir = self.temp_dir / "Other Playlist"
+        other_dir.mkdir()
+        result = downloader.download_track(track, other_dir)
+
+        self.assertEqual(result, other_dir / "Test_Track.mp3")
+        self.assertTrue(result.samefile(self.temp_dir / "Test_Track.mp3"))
+        mock_ydl_instance.process_ie_result.assert_called_once()
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_transcode_track_follows_output_policy(self, mock_ydl):
+        mock_ydl_instance = MagicMock()
+        mock_ydl.return_value = mock_ydl_instance
+        track = Track(id="track1", title="Test Track", artist="", url="")
+        source = self.temp_dir / "Test_Track.opus"
+        source.touch()
+        fetched = FetchedTrack(track=track, info={"ext": "opus"}, path=source)
+
+        native = SoundCloudDownloader(output_policy="native")
+        self.assertEqual(native.transcode_track(fetched), source)
+        mock_ydl_instance.post_process.assert_not_called()
+
+        def post_process(filename, info):
+            # A sibling sharing the title prefix must not be picked up
+            (self.temp_dir / "Test_Track (Remix).mp3").touch()
+            (self.temp_dir / "Test_Track.mp3").touch()
+            return dict(info, filepath=str(self.temp_dir / "Test_Track.mp3"))
+
+        mock_ydl_instance.post_process.side_effect = post_process
+        with patch("time.sleep") as mock_sleep:
+            result = self.downloader.transcode_track(fetched)
+        self.assertEqual(result, self.temp_dir / "Test_Track.mp3")
+        mock_sleep.assert_not_called()
+        postprocessors = mock_ydl.call_args.args[0]["postprocessors"]
+        self.assertEqual(postprocessors[0]["preferredcodec"], "mp3")
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_remux_sessions_follow_the_source_codec(self, mock_ydl):
+        mappings = []
+
+        def make_session(opts):
+            codec = opts["postprocessors"][0]["preferredcodec"]
+
+            def post_process(filename, info):
+                mappings.append((info["ext"], codec))
+                return dict(info, filepath=filename)
+
+            return MagicMock(post_process=post_process)
+
+        mock_ydl.side_effect = make_session
+        downloader = SoundCloudDownloader(output_policy="remux")
+        self.addCleanup(downloader.close)
+        for ext in ("aac", "webm", "aac"):
+            source = self.temp_dir / f"Track.{ext}"
+            source.touch()
+            track = Track(id=ext, title="Track", artist="", url="")
+            downloader.transcode_track(FetchedTrack(track=track, info={"ext": ext}, path=source))
+
+        # The webm track is not re-encoded to AAC by the session of the first track
+        self.assertEqual(mappings, [("aac", "aac"), ("webm", "best"), ("aac", "aac")])
+        self.assertEqual(mock_ydl.call_count, 2)
+
+    def test_transcode_if_different_prefers_target_codec(self):
+        downloader = SoundCloudDownloader(output_policy="transcode-if-different")
+        self.assertTrue(downloader.ydl_opts["format"].startswith("bestaudio[ext=mp3]"))
+        with self.assertRaises(ValueError):
+            SoundCloudDownloader(output_policy="lossless-please")
 
     @patch("yt_dlp.YoutubeDL")
     def test_get_playlist_info(self, mock_yt_dlp):
         # Mock the yt_dlp behavior
         mock_ydl = MagicMock()
-        mock_yt_dlp.return_value.__enter__.return_value = mock_ydl
+        mock_yt_dlp.return_value = mock_ydl
         mock_ydl.extract_info.return_value = {
             "id": "playlist123",
             "title": "Test Playlist",
@@ -85,6 +309,7 @@ class TestSoundCloudDownloader(unittest.TestCase):
         self.assertEqual(len(result.tracks), 2)
         self.assertEqual(result.tracks[0].title, "Track 1")
         self.assertEqual(result.tracks[1].artist, "Artist 2")
+        self.assertEqual(result.tracks[0].info["id"], "track1")
 
     @patch("yt_dlp.YoutubeDL")
     def test_get_playlist_info_skips_unextractable_entries(self, mock_yt_dlp):
@@ -92,7 +317,7 @@ class TestSoundCloudDownloader(unittest.TestCase):
         # it couldn't extract (e.g. upstream 404 / DRM-protected tracks).
         # We should skip those and return the rest, not crash.
         mock_ydl = MagicMock()
-        mock_yt_dlp.return_value.__enter__.return_value = mock_ydl
+        mock_yt_dlp.return_value = mock_ydl
         mock_ydl.extract_info.return_value = {
             "id": "playlist123",
             "title": "Mixed Playlist",
@@ -122,9 +347,37 @@ class TestSoundCloudDownloader(unittest.TestCase):
         self.assertEqual(result.tracks[0].id, "track1")
         self.assertEqual(result.tracks[1].id, "track3")
 
+    @patch("soundclouddownloader.SoundCloudDownloader.iter_playlist_tracks")
+    @patch("soundclouddownloader.SoundCloudDownloader._resolve_playlist")
+    def test_get_playlist_info_uses_playlist_cache(
+        self, mock_resolve_playlist, mock_iter_playlist_tracks
+    ):
+        url = "https://soundcloud.com/test_playlist"
+        tracks = [Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1")]
+        playlist = Playlist(id="playlist123", title="Test Playlist", tracks=tracks)
+        mock_resolve_playlist.return_value = (playlist, 1)
+        mock_iter_playlist_tracks.return_value = (playlist, iter(tracks))
+
+        cache = PlaylistCache(self.temp_dir / "playlists.sqlite", ttl=0)
+        self.addCleanup(cache.close)
+        downloader = SoundCloudDownloader(playlist_cache=cache)
+
+        self.assertEqual(downloader.get_playlist_info(url), playlist)
+        # The expired entry is revalidated with a flat enumeration
+        self.assertEqual(downloader.get_playlist_info(url), playlist)
+
+        mock_resolve_playlist.assert_called_once_with(url)
+        mock_iter_playlist_tracks.assert_called_once_with(url)
+
     @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
-    @patch("soundclouddownloader.SoundCloudDownloader.download_track")
-    def test_download_playlist(self, mock_download_track, mock_get_playlist_info):
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.fetch_track")
+    def test_download_playlist(
+        self, mock_fetch_track, mock_transcode_track, mock_get_playlist_info
+    ):
         mock_get_playlist_info.return_value = Playlist(
             id="playlist123",
             title="Test Playlist",
@@ -144,10 +397,7 @@ class TestSoundCloudDownloader(unittest.TestCase):
             ],
         )
 
-        mock_download_track.side_effect = [
-            self.temp_dir / "Track 1.mp3",
-            self.temp_dir / "Track 2.mp3",
-        ]
+        mock_fetch_track.side_effect = fake_fetch_track
 
         result = self.downloader.download_playlist(
             "https://soundcloud.com/test_playlist", self.temp_dir
@@ -155,4 +405,431 @@ class TestSoundCloudDownloader(unittest.TestCase):
 
         self.assertIsNotNone(result)
         self.assertEqual(result, self.temp_dir / "Test Playlist")
-        self.assertEqual(mock_download_track.call_count, 2)
+        self.assertEqual(mock_fetch_track.call_count, 2)
+        self.assertEqual(mock_transcode_track.call_count, 2)
+
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    def test_download_playlist_writes_report(
+        self, mock_get_playlist_info, mock_fetch_track, mock_transcode_track
+    ):
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1"),
+            ],
+        )
+        events = []
+        downloader = SoundCloudDownloader(
+            progress_callback=lambda metrics, event: events.append((metrics.track_id, event)),
+            report_dir=self.temp_dir / "reports",
+        )
+
+        downloader.download_playlist("https://soundcloud.com/test_playlist", self.temp_dir)
+
+        self.assertIn(("track1", "completed"), events)
+        self.assertEqual(downloader.last_report.tracks[0].status, "completed")
+        self.assertTrue((self.temp_dir / "reports" / "Test Playlist.report.json").exists())
+        self.assertTrue((self.temp_dir / "reports" / "Test Playlist.prom").exists())
+
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    def test_download_playlist_delays_are_deprecated(
+        self, mock_get_playlist_info, mock_fetch_track, mock_transcode_track
+    ):
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1"),
+            ],
+        )
+
+        with self.assertWarns(DeprecationWarning):
+            result = self.downloader.download_playlist(
+                "https://soundcloud.com/test_playlist", self.temp_dir, min_delay=3, max_delay=10
+            )
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist")
+        self.assertEqual(mock_fetch_track.call_count, 1)
+
+        # Baseline callers passing everything by position still zip
+        with self.assertWarns(DeprecationWarning):
+            result = self.downloader.download_playlist(
+                "https://soundcloud.com/test_playlist", self.temp_dir, 3, 3, 10, True
+            )
+        self.assertEqual(result, self.temp_dir / "Test Playlist.zip")
+        with self.assertRaises(TypeError):
+            self.downloader.download_playlist(
+                "https://soundcloud.com/test_playlist", self.temp_dir, 3, 3, 10, True, True
+            )
+
+    @patch("yt_dlp.YoutubeDL")
+    def test_iter_playlist_tracks(self, mock_yt_dlp):
+        mock_ydl = mock_yt_dlp.return_value
+
+        def entries():
+            yield {"id": "track1", "url": "https://soundcloud.com/track1"}
+            yield {
+                "id": "track2",
+                "title": "Track 2",
+                "url": "https://soundcloud.com/track2",
+            }
+
+        mock_ydl.extract_info.return_value = {
+            "_type": "playlist",
+            "id": "playlist123",
+            "title": "Test Playlist",
+            "entries": entries(),
+        }
+
+        playlist, tracks = self.downloader.iter_playlist_tracks(
+            "https://soundcloud.com/test_playlist"
+        )
+
+        mock_ydl.extract_info.assert_called_once_with(
+            "https://soundcloud.com/test_playlist", download=False, process=False
+        )
+        self.assertEqual(playlist.title, "Test Playlist")
+        mock_ydl.close.assert_not_called()
+
+        tracks = list(tracks)
+        self.assertEqual([t.id for t in tracks], ["track1", "track2"])
+        self.assertEqual(tracks[1].title, "Track 2")
+        self.assertIsNone(tracks[0].info)
+        mock_ydl.close.assert_called_once()
+
+    @patch("soundclouddownloader.SoundCloudDownloader.iter_playlist_tracks")
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    def test_download_playlist_flat(
+        self,
+        mock_fetch_track,
+        mock_transcode_track,
+        mock_get_playlist_info,
+        mock_iter_playlist_tracks,
+    ):
+        tracks = [
+            Track(id="track1", title="track1", artist="", url="https://soundcloud.com/track1"),
+            Track(id="track2", title="track2", artist="", url="https://soundcloud.com/track2"),
+        ]
+        mock_iter_playlist_tracks.return_value = (
+            Playlist(id="playlist123", title="Test Playlist", tracks=[]),
+            iter(tracks),
+        )
+
+        result = self.downloader.download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir, flat=True
+        )
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist")
+        mock_get_playlist_info.assert_not_called()
+        self.assertEqual(mock_fetch_track.call_count, 2)
+
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.fetch_track")
+    def test_download_playlist_retries_transient_failures(
+        self, mock_fetch_track, mock_transcode_track, mock_get_playlist_info
+    ):
+        downloader = SoundCloudDownloader(retry_policy=RetryPolicy(base_delay=0.01))
+        attempts = []
+
+        def fetch_track(track, output_dir):
+            attempts.append(track.id)
+            if track.id == "flaky" and attempts.count("flaky") == 1:
+                downloader.metrics.fail(track, "HTTP Error 503", "transient")
+                return None
+            if track.id == "gone":
+                downloader.metrics.fail(track, "HTTP Error 404", "permanent")
+                return None
+            return fake_fetch_track(track, output_dir)
+
+        mock_fetch_track.side_effect = fetch_track
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(
+                    id=track_id,
+                    title=track_id,
+                    artist="",
+                    url=f"https://soundcloud.com/{track_id}",
+                )
+                for track_id in ("flaky", "gone")
+            ],
+        )
+
+        result = downloader.download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir
+        )
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist")
+        self.assertEqual(sorted(attempts), ["flaky", "flaky", "gone"])
+        report = downloader.last_report.to_dict()
+        self.assertEqual(report["summary"]["completed"], 1)
+        self.assertEqual(report["summary"]["retries"], 1)
+        self.assertEqual(
+            report["failures"],
+            [
+                {
+                    "track_id": "gone",
+                    "title": "gone",
+                    "failure": "permanent",
+                    "error": "HTTP Error 404",
+                }
+            ],
+        )
+
+    @patch("soundclouddownloader.SoundCloudDownloader.iter_playlist_tracks")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    def test_iter_download_playlist_bounds_tracks_in_flight(
+        self, mock_fetch_track, mock_transcode_track, mock_iter_playlist_tracks
+    ):
+        enumerated = []
+
+        def tracks():
+            for n in range(50):
+                enumerated.append(n)
+                yield Track(
+                    id=f"track{n}",
+                    title=f"track{n}",
+                    artist="",
+                    url=f"https://soundcloud.com/track{n}",
+                )
+
+        mock_iter_playlist_tracks.return_value = (
+            Playlist(id="playlist123", title="Test Playlist", tracks=[]),
+            tracks(),
+        )
+
+        results = []
+        for track, filepath in self.downloader.iter_download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir, max_workers=2, window=4
+        ):
+            results.append(filepath)
+            self.assertLessEqual(len(enumerated) - len(results), 4)
+
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(results))
+        report = self.downloader.last_report
+        self.assertEqual(report.count("completed"), 50)
+        self.assertEqual(report.tracks, [])
+        self.assertEqual(report.result, str(self.temp_dir / "Test Playlist"))
+
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.fetch_track")
+    def test_workers_download_published_playlist(
+        self, mock_fetch_track, mock_transcode_track, mock_get_playlist_info
+    ):
+        def fetch_track(track, output_dir):
+            if track.id == "track2":
+                self.downloader.metrics.fail(track, "HTTP Error 503", "transient")
+                return None
+            return fake_fetch_track(track, output_dir)
+
+        mock_fetch_track.side_effect = fetch_track
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(
+                    id=f"track{n}",
+                    title=f"track{n}",
+                    artist="",
+                    url=f"https://soundcloud.com/track{n}",
+                )
+                for n in range(4)
+            ],
+        )
+        queue = WorkQueue(self.temp_dir / "queue.sqlite", max_attempts=2)
+        self.addCleanup(queue.close)
+        self.downloader = SoundCloudDownloader(retry_policy=RetryPolicy(base_delay=0.01))
+
+        self.downloader.publish_playlist("https://soundcloud.com/test_playlist", queue)
+        outcomes = self.downloader.work(
+            queue, self.temp_dir, worker_id="worker-a", poll_interval=0.01
+        )
+
+        # The transient failure is retried once, after a delay, before the track is given up
+        self.assertEqual(outcomes, {"completed": 3, "failed": 2})
+        self.assertEqual(queue.counts()["completed"], 3)
+        self.assertEqual(queue.counts()["failed"], 1)
+        self.assertTrue((self.temp_dir / "Test Playlist" / "track0.mp3").exists())
+
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    def test_download_playlist_skips_tracks_completed_by_previous_run(
+        self, mock_fetch_track, mock_transcode_track, mock_get_playlist_info
+    ):
+        tracks = [
+            Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1"),
+            Track(id="track2", title="Track 2", artist="", url="https://soundcloud.com/track2"),
+        ]
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123", title="Test Playlist", tracks=tracks[:1]
+        )
+
+        self.downloader.download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir
+        )
+        # The playlist gained a track since the last sync
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123", title="Test Playlist", tracks=tracks
+        )
+        result = self.downloader.download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir
+        )
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist")
+        downloaded = [c.args[0].id for c in mock_fetch_track.call_args_list]
+        self.assertEqual(downloaded, ["track1", "track2"])
+
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    def test_download_playlist_zip(
+        self, mock_fetch_track, mock_transcode_track, mock_get_playlist_info
+    ):
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123",
+            title="Test Playlist",
+            tracks=[
+                Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1"),
+                Track(id="track2", title="Track 2", artist="", url="https://soundcloud.com/track2"),
+            ],
+        )
+
+        result = self.downloader.download_playlist(
+            "https://soundcloud.com/test_playlist", self.temp_dir, should_zip=True
+        )
+
+        self.assertEqual(result, self.temp_dir / "Test Playlist.zip")
+        self.assertFalse((self.temp_dir / "Test Playlist").exists())
+        with zipfile.ZipFile(result) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ["Track 1.mp3", "Track 2.mp3"])
+
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    def test_download_playlist_zip_resumes_from_archive(
+        self, mock_get_playlist_info, mock_fetch_track, mock_transcode_track
+    ):
+        tracks = [
+            Track(id="track1", title="Track 1", artist="", url="https://soundcloud.com/track1"),
+            Track(id="track2", title="Track 2", artist="", url="https://soundcloud.com/track2"),
+        ]
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123", title="Test Playlist", tracks=tracks[:1]
+        )
+        url = "https://soundcloud.com/test_playlist"
+        self.downloader.download_playlist(url, self.temp_dir, should_zip=True)
+
+        # The playlist gained a track since the last sync
+        mock_get_playlist_info.return_value = Playlist(
+            id="playlist123", title="Test Playlist", tracks=tracks
+        )
+        result = self.downloader.download_playlist(url, self.temp_dir, should_zip=True)
+
+        downloaded = [c.args[0].id for c in mock_fetch_track.call_args_list]
+        self.assertEqual(downloaded, ["track1", "track2"])
+        with zipfile.ZipFile(result) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ["Track 1.mp3", "Track 2.mp3"])
+
+        # Tracks missing from the archive are downloaded again
+        result.write_bytes(b"not a zip")
+        result = self.downloader.download_playlist(url, self.temp_dir, should_zip=True)
+        self.assertEqual(mock_fetch_track.call_count, 4)
+        with zipfile.ZipFile(result) as zipf:
+            self.assertEqual(sorted(zipf.namelist()), ["Track 1.mp3", "Track 2.mp3"])
+
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.transcode_track",
+        side_effect=fake_transcode_track,
+    )
+    @patch(
+        "soundclouddownloader.SoundCloudDownloader.fetch_track",
+        side_effect=fake_fetch_track,
+    )
+    @patch("soundclouddownloader.SoundCloudDownloader.get_playlist_info")
+    def test_download_playlists_downloads_shared_tracks_once(
+        self, mock_get_playlist_info, mock_fetch_track, mock_transcode_track
+    ):
+        shared = Track(id="shared", title="Shared", artist="", url="https://soundcloud.com/shared")
+        only_a = Track(id="a", title="Only A", artist="", url="https://soundcloud.com/a")
+        only_b = Track(id="b", title="Only B", artist="", url="https://soundcloud.com/b")
+        playlists = {
+            "https://soundcloud.com/sets/a": Playlist(id="a", title="A", tracks=[shared, only_a]),
+            "https://soundcloud.com/sets/b": Playlist(id="b", title="B", tracks=[only_b, shared]),
+        }
+        mock_get_playlist_info.side_effect = playlists.get
+
+        results = self.downloader.download_playlists(list(playlists), self.temp_dir)
+
+        self.assertEqual(
+            results,
+            {
+                "https://soundcloud.com/sets/a": self.temp_dir / "A",
+                "https://soundcloud.com/sets/b": self.temp_dir / "B",
+            },
+        )
+        self.assertEqual(mock_fetch_track.call_count, 3)
+        self.assertTrue(
+            (self.temp_dir / "A" / "Shared.mp3").samefile(self.temp_dir / "B" / "Shared.mp3")
+        )
+        self.assertTrue((self.temp_dir / "B" / "Only B.mp3").exists())
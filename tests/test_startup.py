@@ -0,0 +1,49 @@
+import os, subprocess, sys, tempfile, time, unittest
+from pathlib import Path
+
+# Seconds `cli_entry --help` may take, generous enough for slow CI runners
+STARTUP_BUDGET = 1.5
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.cwd = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cwd.cleanup)
+        self.env = dict(os.environ, PYTHONPATH=str(PACKAGE_ROOT))
+
+    def run_python(self, *args):
+        return subprocess.run(
+            [sys.executable, *args],
+            cwd=self.cwd.name,
+            env=self.env,
+            capture_output=True,
+            text=True,
+        )
+
+    def test_import_has_no_side_effects(self):
+        result = self.run_python(
+            "-c",
+            "import sys, soundclouddownloader; print('yt_dlp' in sys.modules)",
+        )
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+        self.assertEqual(os.listdir(self.cwd.name), [])
+
+    def test_cli_help_within_budget(self):
+        # The first run warms the bytecode cache
+        self.run_python("-m", "soundclouddownloader.cli_entry", "--help")
+        start = time.perf_counter()
+        result = self.run_python("-m", "soundclouddownloader.cli_entry", "--help")
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("--url", result.stdout)
+        self.assertLess(elapsed, STARTUP_BUDGET)
+        self.assertEqual(os.listdir(self.cwd.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
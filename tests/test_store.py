@@ -0,0 +1,76 @@
+import unittest, tempfile, shutil, os
+from pathlib import Path
+from unittest.mock import patch
+from soundclouddownloader.store import TrackStore, store_key
+
+
+class TestTrackStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = TrackStore(self.temp_dir / "store", max_size=10)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_file(self, name, size):
+        path = self.temp_dir / name
+        path.write_bytes(b"x" * size)
+        return path
+
+    def test_put_and_materialise(self):
+        key = store_key("track1", "transcode-mp3-192")
+        track_file = self.make_file("Track 1.mp3", 4)
+        self.store.put(key, track_file)
+
+        playlist_dir = self.temp_dir / "Playlist"
+        playlist_dir.mkdir()
+        linked = self.store.materialise(key, playlist_dir)
+
+        self.assertEqual(linked, playlist_dir / "Track 1.mp3")
+        self.assertTrue(linked.samefile(track_file))
+        self.assertIsNone(self.store.get(store_key("track1", "native-mp3-192")))
+
+    def test_evicts_least_recently_used(self):
+        first = store_key("first", "mp3")
+        second = store_key("second", "mp3")
+        self.store.put(first, self.make_file("first.mp3", 4))
+        self.store.put(second, self.make_file("second.mp3", 4))
+        # Using the first entry makes the second one the eviction candidate
+        self.store.get(first)
+        self.store.put(store_key("third", "mp3"), self.make_file("third.mp3", 4))
+
+        self.assertIsNotNone(self.store.get(first))
+        self.assertIsNone(self.store.get(second))
+        self.assertLessEqual(self.store.size(), 10)
+
+    def test_new_entry_is_never_evicted(self):
+        old = store_key("old", "mp3")
+        new = store_key("new", "mp3")
+        self.store.put(old, self.make_file("old.mp3", 4))
+        # A clock step back makes the new entry the least recently used one
+        with patch("soundclouddownloader.store.time.time", return_value=0):
+            self.store.put(new, self.make_file("new.mp3", 8))
+
+        self.assertIsNone(self.store.get(old))
+        self.assertIsNotNone(self.store.get(new))
+
+    def test_file_larger_than_the_store_is_skipped(self):
+        kept = store_key("kept", "mp3")
+        self.store.put(kept, self.make_file("kept.mp3", 4))
+
+        self.assertIsNone(self.store.put(store_key("huge", "mp3"), self.make_file("huge.mp3", 11)))
+        self.assertIsNone(self.store.get(store_key("huge", "mp3")))
+        self.assertIsNotNone(self.store.get(kept))
+
+    def test_stale_entry_is_dropped(self):
+        key = store_key("track1", "mp3")
+        stored = self.store.put(key, self.make_file("track1.mp3", 4))
+        os.unlink(stored)
+
+        self.assertIsNone(self.store.get(key))
+        self.assertEqual(self.store.size(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
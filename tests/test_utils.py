@@ -1,7 +1,13 @@
 import unittest, tempfile, os, shutil
 from pathlib import Path
 from unittest.mock import patch, call
-from soundclouddownloader.utils import validate_url, clean_filename, create_zip
+from soundclouddownloader.utils import (
+    validate_url,
+    clean_filename,
+    create_zip,
+    link_file,
+    read_url_file,
+)
 
 
 class TestUtils(unittest.TestCase):
@@ -26,6 +32,23 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(clean_filename("Tést Fíle.mp3"), "Test_File.mp3")
         self.assertEqual(clean_filename("a" * 300 + ".mp3"), "a" * 251 + ".mp3")
 
+    def test_link_file(self):
+        destination = self.temp_dir / "sub"
+        destination.mkdir()
+        linked = link_file(self.file1, destination / "file1.mp3")
+        self.assertTrue(linked.samefile(self.file1))
+        # Linking again is a no-op
+        self.assertEqual(link_file(self.file1, linked), linked)
+
+    def test_read_url_file(self):
+        url_file = self.temp_dir / "urls.txt"
+        url_file.write_text(
+            "# playlists\nhttps://soundcloud.com/a\n\nnot a url\n  https://soundcloud.com/b  \n"
+        )
+        self.assertEqual(
+            read_url_file(url_file), ["https://soundcloud.com/a", "https://soundcloud.com/b"]
+        )
+
     @patch("zipfile.ZipFile")
     def test_create_zip(self, mock_zipfile):
         # Execute the function to create a zip file
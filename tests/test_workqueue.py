@@ -0,0 +1,88 @@
+import unittest, tempfile, shutil, time
+from pathlib import Path
+from unittest.mock import patch
+from soundclouddownloader.dataclass import Track, Playlist
+from soundclouddownloader.workqueue import WorkQueue
+
+
+def make_playlist(count):
+    return Playlist(
+        id="playlist123",
+        title="Test Playlist",
+        tracks=[
+            Track(id=str(n), title=f"Track {n}", artist="A", url=f"https://soundcloud.com/{n}")
+            for n in range(count)
+        ],
+    )
+
+
+class TestWorkQueue(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "queue.sqlite"
+        self.queue = WorkQueue(self.path, lease_timeout=60, max_attempts=2)
+
+    def tearDown(self):
+        self.queue.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_workers_never_share_tracks(self):
+        self.assertEqual(self.queue.publish(make_playlist(5)), 5)
+        other = WorkQueue(self.path, lease_timeout=60)
+        self.addCleanup(other.close)
+
+        first = self.queue.lease("worker-a", 3)
+        second = other.lease("worker-b", 3)
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({job.track.id for job in first} & {job.track.id for job in second})
+        self.assertEqual(first[0].track.title, "Track 0")
+
+        self.queue.complete(first[0], "worker-a", Path("Track 0.mp3"))
+        self.assertEqual(self.queue.counts()["completed"], 1)
+        # Completed tracks are not queued again when the playlist is republished
+        self.assertEqual(self.queue.publish(make_playlist(5)), 0)
+
+    def test_expired_lease_is_reissued(self):
+        self.queue.publish(make_playlist(1))
+        job = self.queue.lease("worker-a")[0]
+
+        with patch("soundclouddownloader.workqueue.time.time", return_value=time.time() + 120):
+            reissued = self.queue.lease("worker-b")
+        self.assertEqual([j.track.id for j in reissued], [job.track.id])
+        self.assertEqual(reissued[0].attempts, 2)
+
+        # The first worker lost its lease, so its failure is not recorded
+        self.queue.fail(job, "worker-a", "stalled")
+        self.assertEqual(self.queue.counts()["leased"], 1)
+
+    def test_failed_track_is_retried_then_given_up(self):
+        self.queue.publish(make_playlist(1))
+        self.queue.fail(self.queue.lease("worker-a")[0], "worker-a", "HTTP Error 500")
+        self.assertEqual(self.queue.counts()["queued"], 1)
+
+        self.queue.fail(self.queue.lease("worker-a")[0], "worker-a", "HTTP Error 500")
+        self.assertEqual(self.queue.counts()["failed"], 1)
+        self.assertEqual(self.queue.remaining(), 0)
+        self.assertEqual(self.queue.lease("worker-a"), [])
+
+    def test_failed_track_is_retried_after_its_delay(self):
+        self.queue.publish(make_playlist(1))
+        self.queue.fail(self.queue.lease("worker-a")[0], "worker-a", "HTTP Error 503", delay=30)
+
+        self.assertEqual(self.queue.lease("worker-a"), [])
+        self.assertEqual(self.queue.remaining(), 1)
+        with patch("soundclouddownloader.workqueue.time.time", return_value=time.time() + 31):
+            self.assertEqual(len(self.queue.lease("worker-a")), 1)
+
+    def test_release_returns_tracks_without_using_an_attempt(self):
+        self.queue.publish(make_playlist(2))
+        self.queue.lease("worker-a", 2)
+
+        self.assertEqual(self.queue.release("worker-a"), 2)
+        self.assertTrue(all(job.attempts == 1 for job in self.queue.lease("worker-b", 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()